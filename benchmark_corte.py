@@ -0,0 +1,386 @@
+"""
+Benchmark do OtimizadorCorte: tempo, memória e qualidade dos métodos.
+
+Gera pedidos de três tipos (uniforme, tripletos de Falkenauer e listas de
+corte de janelas Maxim-Ar), roda cada método em tamanhos de 10 a 100 mil
+peças e guarda o resultado num histórico JSON. O comando 'comparar' mostra
+o que ficou mais lento, gastou mais memória ou usou mais barras entre duas
+execuções.
+
+    python benchmark_corte.py rodar --rotulo "antes da mudança"
+    python benchmark_corte.py rodar --tamanhos 10 100 1000 --geradores janelas
+    python benchmark_corte.py comparar            # últimas duas execuções
+    python benchmark_corte.py comparar 0 -1 --tolerancia 0.2
+    python benchmark_corte.py listar
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from otimizador_corte import OtimizadorCorte, UNIDADES_POR_CM, para_unidades
+
+
+CAMINHO_HISTORICO = os.path.join(os.path.expanduser('~'), '.otimizador_corte', 'benchmark.json')
+
+TAMANHOS = [10, 100, 1000, 10000, 100000]
+
+# Configuração dos pedidos gerados (cm)
+TAMANHO_BARRA = 600
+ESPESSURA_CORTE = 0.3
+LIMITE_TRANSPORTE = 300
+
+# Descontos (mm) de cada peça cortada da Maxim-Ar em relação ao vão:
+# (perfil, 'largura' ou 'altura', desconto, quantidade). Aproximados da
+# planilha; o vidro não é cortado de barra e fica de fora.
+PECAS_MAXIM_AR = [
+    ('SU079', 'largura', 0, 2),    # quadro, larguras S e I (corte 45°)
+    ('SU079', 'altura', 0, 2),     # quadro, alturas E e D
+    ('SU082', 'largura', 38, 1),   # folha, largura S
+    ('SU200', 'largura', 38, 1),   # folha, largura I
+    ('SU200', 'altura', 45, 2),    # folha, alturas E e D
+]
+
+
+# ---------------------------------------------------------------------------
+# Geradores de pedidos: n peças em cm, sempre as mesmas para a mesma semente
+# ---------------------------------------------------------------------------
+
+def gerar_uniforme(n: int, semente: int = 1) -> List[float]:
+    """Medidas uniformes entre 20cm e metade da barra, em milímetros inteiros"""
+    aleatorio = random.Random(semente * 1_000_003 + n)
+    return [aleatorio.randint(200, TAMANHO_BARRA * 5) / 10 for _ in range(n)]
+
+
+def gerar_tripletos(n: int, semente: int = 1) -> List[float]:
+    """
+    Tripletos de Falkenauer: grupos de 3 peças (entre 1/4 e 1/2 da barra)
+    que enchem uma barra exatamente, já contando a espessura dos 3 cortes.
+    Com n múltiplo de 3 o ótimo é conhecido: n/3 barras (nenhuma barra
+    comporta 4 peças); senão as peças que faltam saem de um tripleto a mais.
+    """
+    aleatorio = random.Random(semente * 1_000_003 + n)
+    util = para_unidades(TAMANHO_BARRA) - 3 * para_unidades(ESPESSURA_CORTE)
+    pecas = []
+    while len(pecas) < n:
+        primeira = aleatorio.randint(int(util * 0.38), int(util * 0.49))
+        segunda = aleatorio.randint(util // 4 + 1, (util - primeira) // 2)
+        terceira = util - primeira - segunda
+        pecas.extend(p / UNIDADES_POR_CM for p in (primeira, segunda, terceira))
+    return pecas[:n]
+
+
+def gerar_janelas(n: int, semente: int = 1) -> List[float]:
+    """
+    Lista de corte de uma obra de janelas Maxim-Ar: vãos sorteados (múltiplos
+    de 5mm) e as peças de quadro e folha de cada janela (PECAS_MAXIM_AR).
+    Todos os perfis entram no mesmo pedido: o que interessa aqui é a
+    distribuição de medidas, com muita repetição, e não o perfil.
+    """
+    aleatorio = random.Random(semente * 1_000_003 + n)
+    pecas = []
+    while len(pecas) < n:
+        vao = {'largura': aleatorio.randrange(400, 2005, 5), 'altura': aleatorio.randrange(400, 1505, 5)}
+        # Obras repetem o mesmo vão em várias janelas
+        for _ in range(aleatorio.choice([1, 1, 2, 4, 8])):
+            for _, lado, desconto, qtd in PECAS_MAXIM_AR:
+                pecas.extend([(vao[lado] - desconto) / 10] * qtd)
+    return pecas[:n]
+
+
+GERADORES: Dict[str, Callable[[int, int], List[float]]] = {
+    'uniforme': gerar_uniforme,
+    'tripletos': gerar_tripletos,
+    'janelas': gerar_janelas,
+}
+
+
+# ---------------------------------------------------------------------------
+# Métodos medidos: cada um recebe (otimizador, entrada) e retorna as barras;
+# a entrada é a cópia das peças ou o que PREPARACAO montar antes de medir
+# ---------------------------------------------------------------------------
+
+def _plano_ffd(otimizador: OtimizadorCorte, pecas: List[float]) -> List[List[float]]:
+    return otimizador.calcular_cortes_demanda(_contar(pecas))
+
+
+def _transporte(otimizador: OtimizadorCorte, barras: List[List[float]]) -> List[List[float]]:
+    """calcular_corte_transporte em cada barra de um plano pronto (sem o LRU de cortes_transporte)"""
+    for barra in barras:
+        otimizador.calcular_corte_transporte(barra)
+    return barras
+
+
+def _contar(pecas: List[float]) -> Dict[float, int]:
+    contagem = {}
+    for p in pecas:
+        contagem[p] = contagem.get(p, 0) + 1
+    return contagem
+
+
+METODOS: Dict[str, Callable[[OtimizadorCorte, List[float]], List[List[float]]]] = {
+    'greedy': lambda o, p: o.calcular_cortes_greedy(p),
+    'greedy_indexado': lambda o, p: o.calcular_cortes_greedy_indexado(p),
+    'best_fit': lambda o, p: o.calcular_cortes_best_fit(p),
+    'best_fit_indexado': lambda o, p: o.calcular_cortes_best_fit_indexado(p),
+    'maiores_sobras': lambda o, p: o.otimizar_para_maiores_sobras(p),
+    'transporte': _transporte,
+}
+
+# Entrada de cada método, montada fora do tempo e da memória medidos
+PREPARACAO: Dict[str, Callable[[OtimizadorCorte, List[float]], list]] = {
+    'transporte': _plano_ffd,  # só a divisão para transporte é medida, não o FFD
+}
+
+
+# Execução que passa disso não é repetida: o ruído já é pequeno perto do tempo
+TEMPO_SEM_REPETIR = 1.0
+
+
+def medir(metodo: str, pecas: List[float], repeticoes: int = 1, com_memoria: bool = True) -> dict:
+    """
+    Roda o método: menor tempo de até 'repeticoes' execuções e, numa execução
+    à parte (tracemalloc deixa tudo mais lento), o pico de memória.
+    """
+    otimizador = OtimizadorCorte(TAMANHO_BARRA, ESPESSURA_CORTE, LIMITE_TRANSPORTE)
+    funcao = METODOS[metodo]
+    preparar = PREPARACAO.get(metodo, lambda _, p: list(p))
+    tempos = []
+    for _ in range(repeticoes):
+        entrada = preparar(otimizador, pecas)
+        inicio = time.perf_counter()
+        barras = funcao(otimizador, entrada)
+        tempos.append(time.perf_counter() - inicio)
+        if tempos[-1] > TEMPO_SEM_REPETIR:
+            break
+
+    memoria_kb = None
+    if com_memoria:
+        entrada = preparar(otimizador, pecas)
+        tracemalloc.start()
+        try:
+            funcao(otimizador, entrada)
+            memoria_kb = tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+
+    limite = otimizador.limite_inferior(_contar(pecas))
+    return {
+        'tempo_s': min(tempos),
+        'memoria_pico_kb': round(memoria_kb, 1) if memoria_kb is not None else None,
+        'barras': len(barras),
+        'limite_inferior': limite,
+        'gap': len(barras) - limite,
+    }
+
+
+def rodar(geradores: List[str], metodos: List[str], tamanhos: List[int], semente: int = 1,
+          repeticoes: int = 1, com_memoria: bool = True, tempo_max: float = 30.0,
+          saida=sys.stdout) -> List[dict]:
+    """
+    Roda todas as combinações e retorna uma linha por medição. O tempo de
+    cada tamanho é estimado pelo crescimento observado nos dois anteriores
+    (FFD e BFD simples são O(n·barras), os indexados O(n log n)); se a
+    estimativa passa de 'tempo_max' segundos, esse tamanho e os maiores são
+    pulados.
+    """
+    resultados = []
+    for gerador in geradores:
+        for metodo in metodos:
+            medidos = []  # (n, tempo) já medidos deste método
+            pular = False
+            for n in sorted(tamanhos):
+                linha = {'gerador': gerador, 'metodo': metodo, 'n': n}
+                estimativa = _estimar_tempo(medidos, n)
+                if pular or estimativa > tempo_max:
+                    pular = True
+                    linha.update(pulado=True, estimativa_s=round(estimativa, 1))
+                else:
+                    linha.update(medir(metodo, GERADORES[gerador](n, semente), repeticoes, com_memoria))
+                    medidos.append((n, linha['tempo_s']))
+                resultados.append(linha)
+                print(_formatar_linha(linha), file=saida, flush=True)
+    return resultados
+
+
+def _estimar_tempo(medidos: List[tuple], n: int) -> float:
+    """Tempo previsto para n peças, pela lei de potência dos dois últimos tamanhos"""
+    if not medidos:
+        return 0.0
+    n2, t2 = medidos[-1]
+    expoente = 2.0  # sem dois pontos, supõe o pior caso dos métodos simples
+    if len(medidos) >= 2:
+        n1, t1 = medidos[-2]
+        # Tempos muito curtos são só ruído; o expoente fica entre 1 e 2
+        if t1 > 0.001 and t2 > 0.001:
+            expoente = min(2.0, max(1.0, math.log(t2 / t1) / math.log(n2 / n1)))
+    return t2 * (n / n2) ** expoente
+
+
+def _formatar_linha(linha: dict) -> str:
+    inicio = f"{linha['gerador']:<10} {linha['metodo']:<18} {linha['n']:>7}"
+    if linha.get('pulado'):
+        return f"{inicio}  (pulado: estimativa de {linha['estimativa_s']:.0f}s passa do tempo máximo)"
+    memoria = f"{linha['memoria_pico_kb']:>10.0f}" if linha['memoria_pico_kb'] is not None else f"{'-':>10}"
+    return (f"{inicio} {linha['tempo_s']:>9.4f} {memoria} {linha['barras']:>7} "
+            f"{linha['limite_inferior']:>7} {linha['gap']:>4}")
+
+
+def _cabecalho() -> str:
+    return (f"{'Gerador':<10} {'Método':<18} {'Peças':>7} {'Tempo(s)':>9} {'Mem(KB)':>10} "
+            f"{'Barras':>7} {'Limite':>7} {'Gap':>4}")
+
+
+# ---------------------------------------------------------------------------
+# Histórico
+# ---------------------------------------------------------------------------
+
+def ler_historico(caminho: str) -> List[dict]:
+    if not os.path.exists(caminho):
+        return []
+    with open(caminho, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def gravar_historico(caminho: str, historico: List[dict]):
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(historico, f, ensure_ascii=False, indent=1)
+    os.replace(temporario, caminho)
+
+
+def _versao_codigo() -> str:
+    """Commit atual do git, se houver"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ''
+
+
+def comparar(base: dict, atual: dict, tolerancia: float = 0.20,
+             tempo_minimo: float = 0.005) -> List[dict]:
+    """
+    Compara duas execuções do histórico, medição a medição. Marca:
+    - 'tempo': ficou mais de 'tolerancia' mais lento (e a diferença passa de
+      tempo_minimo segundos, para não acusar ruído em medições de microssegundos)
+    - 'memoria': pico de memória mais de 'tolerancia' maior
+    - 'barras': usou mais barras no mesmo pedido
+    Retorna uma linha por medição em comum, com a lista 'regressoes'.
+    """
+    anteriores = {(r['gerador'], r['metodo'], r['n']): r for r in base['resultados'] if not r.get('pulado')}
+    linhas = []
+    for r in atual['resultados']:
+        antes = anteriores.get((r['gerador'], r['metodo'], r['n']))
+        if antes is None or r.get('pulado'):
+            continue
+        regressoes = []
+        if (r['tempo_s'] > antes['tempo_s'] * (1 + tolerancia)
+                and r['tempo_s'] - antes['tempo_s'] > tempo_minimo):
+            regressoes.append('tempo')
+        if (r['memoria_pico_kb'] is not None and antes['memoria_pico_kb']
+                and r['memoria_pico_kb'] > antes['memoria_pico_kb'] * (1 + tolerancia)):
+            regressoes.append('memoria')
+        if r['barras'] > antes['barras']:
+            regressoes.append('barras')
+        linhas.append({'antes': antes, 'depois': r, 'regressoes': regressoes})
+    return linhas
+
+
+def _relatorio_comparacao(linhas: List[dict]) -> str:
+    texto = [f"{'Gerador':<10} {'Método':<18} {'Peças':>7} {'Tempo':>19} {'Mem(KB)':>22} "
+             f"{'Barras':>12}  Regressão"]
+    for linha in linhas:
+        a, d = linha['antes'], linha['depois']
+        razao = d['tempo_s'] / a['tempo_s'] if a['tempo_s'] > 0 else 1.0
+        memoria = (f"{a['memoria_pico_kb'] or 0:>9.0f} -> {d['memoria_pico_kb'] or 0:<9.0f}")
+        texto.append(
+            f"{d['gerador']:<10} {d['metodo']:<18} {d['n']:>7} "
+            f"{d['tempo_s']:>9.4f}s ({razao:>5.2f}x) {memoria} {a['barras']:>5}->{d['barras']:<5}  "
+            f"{', '.join(linha['regressoes']).upper() if linha['regressoes'] else 'ok'}")
+    return '\n'.join(texto)
+
+
+def _escolher(historico: List[dict], indice: int) -> dict:
+    try:
+        return historico[indice]
+    except IndexError:
+        raise SystemExit(f"Execução {indice} não existe (o histórico tem {len(historico)})")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark dos métodos do OtimizadorCorte.")
+    parser.add_argument('--historico', default=CAMINHO_HISTORICO, help="arquivo JSON do histórico")
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    p_rodar = comandos.add_parser('rodar', help="roda o benchmark e grava no histórico")
+    p_rodar.add_argument('--geradores', nargs='+', choices=list(GERADORES), default=list(GERADORES))
+    p_rodar.add_argument('--metodos', nargs='+', choices=list(METODOS), default=list(METODOS))
+    p_rodar.add_argument('--tamanhos', nargs='+', type=int, default=TAMANHOS)
+    p_rodar.add_argument('--semente', type=int, default=1)
+    p_rodar.add_argument('--repeticoes', type=int, default=3, help="fica o menor tempo [3]")
+    p_rodar.add_argument('--tempo-max', type=float, default=30.0,
+                         help="passou disso num tamanho, pula os maiores do método [30s]")
+    p_rodar.add_argument('--sem-memoria', action='store_true', help="não mede o pico com tracemalloc")
+    p_rodar.add_argument('--rotulo', default='', help="nome da execução no histórico")
+    p_rodar.add_argument('--nao-gravar', action='store_true')
+
+    p_comparar = comandos.add_parser('comparar', help="compara duas execuções do histórico")
+    p_comparar.add_argument('base', nargs='?', type=int, default=-2, help="índice da execução base [-2]")
+    p_comparar.add_argument('atual', nargs='?', type=int, default=-1, help="índice da execução nova [-1]")
+    p_comparar.add_argument('--tolerancia', type=float, default=0.20, help="folga relativa [0.20]")
+
+    comandos.add_parser('listar', help="lista as execuções do histórico")
+    args = parser.parse_args(argv)
+
+    historico = ler_historico(args.historico)
+
+    if args.comando == 'listar':
+        for i, execucao in enumerate(historico):
+            print(f"{i:>3}  {execucao['quando']}  {execucao.get('versao') or '-':<9} "
+                  f"{len(execucao['resultados']):>4} medições  {execucao.get('rotulo', '')}")
+        return 0
+
+    if args.comando == 'comparar':
+        if len(historico) < 2:
+            print("O histórico precisa de pelo menos duas execuções.", file=sys.stderr)
+            return 2
+        base, atual = _escolher(historico, args.base), _escolher(historico, args.atual)
+        linhas = comparar(base, atual, args.tolerancia)
+        print(f"Base:  {base['quando']} {base.get('versao', '')} {base.get('rotulo', '')}")
+        print(f"Atual: {atual['quando']} {atual.get('versao', '')} {atual.get('rotulo', '')}\n")
+        print(_relatorio_comparacao(linhas))
+        regressoes = sum(1 for linha in linhas if linha['regressoes'])
+        print(f"\n{regressoes} regressão(ões) em {len(linhas)} medições")
+        return 1 if regressoes else 0
+
+    print(_cabecalho())
+    resultados = rodar(args.geradores, args.metodos, args.tamanhos, args.semente,
+                       args.repeticoes, not args.sem_memoria, args.tempo_max)
+    if not args.nao_gravar:
+        historico.append({
+            'quando': datetime.now().isoformat(timespec='seconds'),
+            'versao': _versao_codigo(),
+            'rotulo': args.rotulo,
+            'python': platform.python_version(),
+            'semente': args.semente,
+            'resultados': resultados,
+        })
+        gravar_historico(args.historico, historico)
+        print(f"\nGravado em {args.historico} (execução {len(historico) - 1})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
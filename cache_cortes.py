@@ -0,0 +1,161 @@
+"""
+Cache persistente de planos de corte já calculados.
+Duas camadas: LRU em memória e SQLite em disco (com limite de tamanho),
+para que recalcular o mesmo pedido volte na hora, inclusive entre sessões.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+
+CAMINHO_PADRAO = os.path.join(os.path.expanduser('~'), '.otimizador_corte', 'cache.sqlite3')
+
+
+def chave_trabalho(tamanho_barra: float, espessura_corte: float, limite_transporte: Optional[float],
+                   demanda: Union[Dict[float, int], Iterable[Tuple[float, int]]]) -> str:
+    """
+    Hash canônico de um pedido: configuração + multiconjunto ordenado das peças.
+    A ordem em que as peças foram digitadas não muda a chave.
+    """
+    itens = demanda.items() if isinstance(demanda, dict) else demanda
+    contagem = {}
+    for medida, qtd in itens:
+        if qtd > 0:
+            contagem[float(medida)] = contagem.get(float(medida), 0) + int(qtd)
+    canonico = json.dumps([
+        float(tamanho_barra),
+        float(espessura_corte),
+        float(limite_transporte) if limite_transporte else None,
+        sorted(contagem.items()),
+    ], separators=(',', ':'))
+    return hashlib.sha256(canonico.encode('utf-8')).hexdigest()
+
+
+class CacheCortes:
+    """
+    Cache de resultados em duas camadas:
+    - memória: OrderedDict com no máximo 'max_memoria' itens (LRU)
+    - disco: tabela SQLite em 'caminho'; quando passa de 'max_bytes' os itens
+      acessados há mais tempo são apagados
+
+    Os valores são dicts serializáveis em JSON. Com caminho=None só a camada
+    em memória é usada.
+    """
+
+    def __init__(self, caminho: Optional[str] = CAMINHO_PADRAO, max_memoria: int = 128,
+                 max_bytes: int = 50 * 1024 * 1024):
+        self.caminho = caminho
+        self.max_memoria = max_memoria
+        self.max_bytes = max_bytes
+        self._memoria = OrderedDict()
+        self._trava = threading.Lock()
+
+        self.acertos_memoria = 0
+        self.acertos_disco = 0
+        self.falhas = 0
+
+        self._conexao = None
+        if caminho:
+            pasta = os.path.dirname(caminho)
+            if pasta:
+                os.makedirs(pasta, exist_ok=True)
+            self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS planos ("
+                " chave TEXT PRIMARY KEY,"
+                " valor TEXT NOT NULL,"
+                " tamanho INTEGER NOT NULL,"
+                " acesso REAL NOT NULL)"
+            )
+            self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_planos_acesso ON planos (acesso)")
+            self._conexao.commit()
+
+    @property
+    def acertos(self) -> int:
+        return self.acertos_memoria + self.acertos_disco
+
+    def obter(self, chave: str) -> Optional[dict]:
+        with self._trava:
+            if chave in self._memoria:
+                self._memoria.move_to_end(chave)
+                self.acertos_memoria += 1
+                return self._memoria[chave]
+
+            if self._conexao is not None:
+                linha = self._conexao.execute(
+                    "SELECT valor FROM planos WHERE chave = ?", (chave,)).fetchone()
+                if linha is not None:
+                    self._conexao.execute(
+                        "UPDATE planos SET acesso = ? WHERE chave = ?", (time.time(), chave))
+                    self._conexao.commit()
+                    valor = json.loads(linha[0])
+                    self._guardar_memoria(chave, valor)
+                    self.acertos_disco += 1
+                    return valor
+
+            self.falhas += 1
+            return None
+
+    def guardar(self, chave: str, valor: dict):
+        with self._trava:
+            self._guardar_memoria(chave, valor)
+            if self._conexao is None:
+                return
+            texto = json.dumps(valor, separators=(',', ':'))
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO planos (chave, valor, tamanho, acesso) VALUES (?, ?, ?, ?)",
+                (chave, texto, len(texto), time.time()))
+            self._despejar_disco()
+            self._conexao.commit()
+
+    def _guardar_memoria(self, chave: str, valor: dict):
+        self._memoria[chave] = valor
+        self._memoria.move_to_end(chave)
+        while len(self._memoria) > self.max_memoria:
+            self._memoria.popitem(last=False)
+
+    def _despejar_disco(self):
+        """Apaga os itens menos usados até o banco ficar abaixo de max_bytes"""
+        total = self._conexao.execute("SELECT COALESCE(SUM(tamanho), 0) FROM planos").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        apagar = []
+        for chave, tamanho in self._conexao.execute("SELECT chave, tamanho FROM planos ORDER BY acesso"):
+            if total <= self.max_bytes:
+                break
+            apagar.append((chave,))
+            total -= tamanho
+        self._conexao.executemany("DELETE FROM planos WHERE chave = ?", apagar)
+
+    def estatisticas(self) -> dict:
+        with self._trava:
+            itens_disco, bytes_disco = 0, 0
+            if self._conexao is not None:
+                itens_disco, bytes_disco = self._conexao.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM planos").fetchone()
+            return {
+                'acertos_memoria': self.acertos_memoria,
+                'acertos_disco': self.acertos_disco,
+                'falhas': self.falhas,
+                'itens_memoria': len(self._memoria),
+                'itens_disco': itens_disco,
+                'bytes_disco': bytes_disco,
+            }
+
+    def limpar(self):
+        with self._trava:
+            self._memoria.clear()
+            if self._conexao is not None:
+                self._conexao.execute("DELETE FROM planos")
+                self._conexao.commit()
+
+    def fechar(self):
+        with self._trava:
+            if self._conexao is not None:
+                self._conexao.close()
+                self._conexao = None
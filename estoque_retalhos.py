@@ -0,0 +1,133 @@
+"""
+Estoque persistente de retalhos (sobras de barras guardadas na prateleira).
+SQLite indexado por (perfil, comprimento): achar o menor retalho que serve
+para uma peça é uma busca no índice, rápida mesmo com milhares de retalhos.
+"""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+CAMINHO_PADRAO = os.path.join(os.path.expanduser('~'), '.otimizador_corte', 'retalhos.sqlite3')
+
+# Diferença abaixo da qual dois comprimentos (cm) são o mesmo retalho
+TOLERANCIA = 0.005
+
+
+class EstoqueRetalhos:
+    """
+    Retalhos em estoque, por perfil. Só sobras com pelo menos
+    'comprimento_minimo' cm voltam para o estoque; as menores são descarte.
+
+    Dentro de simulacao() as retiradas não são gravadas: o otimizador usa
+    isso para planejar com o estoque sem dar baixa antes da hora.
+    """
+
+    def __init__(self, caminho: Optional[str] = CAMINHO_PADRAO, comprimento_minimo: float = 30.0):
+        self.caminho = caminho or ':memory:'
+        self.comprimento_minimo = comprimento_minimo
+        self._trava = threading.RLock()
+        self._simulando = False
+
+        if caminho:
+            pasta = os.path.dirname(caminho)
+            if pasta:
+                os.makedirs(pasta, exist_ok=True)
+        self._conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS retalhos ("
+            " id INTEGER PRIMARY KEY,"
+            " perfil TEXT NOT NULL,"
+            " comprimento REAL NOT NULL,"
+            " criado REAL NOT NULL)"
+        )
+        self._conexao.execute(
+            "CREATE INDEX IF NOT EXISTS idx_retalhos_perfil_comprimento ON retalhos (perfil, comprimento)")
+        self._conexao.commit()
+
+    def _gravar(self):
+        if not self._simulando:
+            self._conexao.commit()
+
+    def adicionar(self, perfil: str, comprimento: float) -> int:
+        """Guarda um retalho e retorna seu id"""
+        with self._trava:
+            cursor = self._conexao.execute(
+                "INSERT INTO retalhos (perfil, comprimento, criado) VALUES (?, ?, ?)",
+                (perfil, float(comprimento), time.time()))
+            self._gravar()
+            return cursor.lastrowid
+
+    def melhor_encaixe(self, perfil: str, minimo: float) -> Optional[Tuple[int, float]]:
+        """Menor retalho do perfil com pelo menos 'minimo' cm: (id, comprimento) ou None"""
+        with self._trava:
+            return self._conexao.execute(
+                "SELECT id, comprimento FROM retalhos WHERE perfil = ? AND comprimento >= ?"
+                " ORDER BY comprimento LIMIT 1", (perfil, minimo - TOLERANCIA)).fetchone()
+
+    def retirar(self, id_retalho: int):
+        with self._trava:
+            self._conexao.execute("DELETE FROM retalhos WHERE id = ?", (id_retalho,))
+            self._gravar()
+
+    def dar_baixa(self, perfil: str, usados: Iterable[float], sobras: Iterable[float]) -> int:
+        """
+        Aplica um plano já calculado: retira um retalho de cada comprimento em
+        'usados' e guarda as sobras úteis. Retorna quantas sobras entraram.
+        """
+        with self._trava:
+            for comprimento in usados:
+                linha = self._conexao.execute(
+                    "SELECT id FROM retalhos WHERE perfil = ? AND comprimento BETWEEN ? AND ? LIMIT 1",
+                    (perfil, comprimento - TOLERANCIA, comprimento + TOLERANCIA)).fetchone()
+                if linha is not None:
+                    self._conexao.execute("DELETE FROM retalhos WHERE id = ?", linha)
+            uteis = [s for s in sobras if s >= self.comprimento_minimo]
+            agora = time.time()
+            self._conexao.executemany(
+                "INSERT INTO retalhos (perfil, comprimento, criado) VALUES (?, ?, ?)",
+                [(perfil, float(s), agora) for s in uteis])
+            self._gravar()
+            return len(uteis)
+
+    @contextmanager
+    def simulacao(self):
+        """Tudo que for retirado ou guardado dentro do bloco é desfeito no fim"""
+        with self._trava:
+            self._conexao.commit()
+            self._simulando = True
+            try:
+                yield self
+            finally:
+                self._simulando = False
+                self._conexao.rollback()
+
+    def listar(self, perfil: Optional[str] = None) -> List[Tuple[int, str, float]]:
+        """(id, perfil, comprimento) do estoque, do maior retalho para o menor"""
+        with self._trava:
+            if perfil is None:
+                return self._conexao.execute(
+                    "SELECT id, perfil, comprimento FROM retalhos ORDER BY perfil, comprimento DESC").fetchall()
+            return self._conexao.execute(
+                "SELECT id, perfil, comprimento FROM retalhos WHERE perfil = ? ORDER BY comprimento DESC",
+                (perfil,)).fetchall()
+
+    def resumo(self) -> Dict[str, Tuple[int, float]]:
+        """perfil -> (quantidade de retalhos, soma dos comprimentos)"""
+        with self._trava:
+            return {perfil: (qtd, total) for perfil, qtd, total in self._conexao.execute(
+                "SELECT perfil, COUNT(*), SUM(comprimento) FROM retalhos GROUP BY perfil")}
+
+    def limpar(self):
+        with self._trava:
+            self._conexao.execute("DELETE FROM retalhos")
+            self._gravar()
+
+    def fechar(self):
+        with self._trava:
+            if self._conexao is not None:
+                self._conexao.close()
+                self._conexao = None
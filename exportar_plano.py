@@ -0,0 +1,168 @@
+"""
+Exportação do plano de corte para outros programas, barra por barra.
+
+Cada exportador recebe o resultado de OtimizadorCorte.analisar_resultado
+(ou de resolver*) e um arquivo de texto já aberto, e escreve cada barra
+assim que a lê do PlanoCorte: nada do arquivo é montado em memória, então o
+uso de memória não cresce com o tamanho do plano. Não dependem da
+interface gráfica.
+
+    with open('plano.jsonl', 'w', encoding='utf-8') as f:
+        exportar_jsonl(resultado, f, metodo=nome, limite_transporte=300)
+
+Formatos:
+- CSV (';', ponto decimal): uma linha por barra, colunas em snake_case
+- JSON Lines: uma linha de cabeçalho {"tipo": "plano", ...} com a
+  configuração e os totais, depois uma {"tipo": "barra", ...} por barra
+- Lista da serra: texto com um registro por linha, medidas em mm, na
+  ordem em que a serra corta a barra a partir da ponta:
+      B;<barra>;<comprimento>;<N = nova | R = retalho>
+      P;<sequência>;<medida>;<posição do fim do corte>
+      T;<posição>       corte para transporte (separa os pedaços)
+      S;<sobra>
+  Com corte para transporte, as peças saem na ordem dos pedaços e cada T
+  vem depois do último P do pedaço, mais a espessura do próprio corte de
+  transporte: as posições são as mesmas de 'pontos_corte'.
+"""
+import csv
+import json
+import os
+from typing import Callable, Dict, Iterator, List, Optional, TextIO
+
+from otimizador_corte import UNIDADES_POR_CM, PlanoCorte, para_unidades
+
+
+def _corte_da_barra(resultado: dict, indice: int) -> Optional[Dict]:
+    cortes = resultado.get('cortes_transporte')
+    return cortes[indice] if cortes else None
+
+
+def _pontos_transporte(corte: Optional[Dict]) -> List[float]:
+    if not corte or not corte.get('precisa_corte'):
+        return []
+    if 'pontos_corte' in corte:
+        return corte['pontos_corte']
+    return [corte['ponto_corte']] if 'ponto_corte' in corte else []
+
+
+def _pecas_dos_pedacos(corte: Dict, plano: PlanoCorte, indice: int) -> List[List[float]]:
+    """
+    Peças de cada pedaço do corte para transporte. Um corte sem 'pedacos'
+    (formato antigo, só 'pedaco_1'/'pedaco_2', ou nenhum dos dois) não
+    derruba a exportação: sem a divisão, a barra inteira vira um pedaço só.
+    """
+    if 'pedacos' in corte:
+        return [p['pecas'] for p in corte['pedacos']]
+    if 'pedaco_1' in corte:
+        return [corte['pedaco_1'], corte.get('pedaco_2', [])]
+    return [plano.pecas_barra(indice)]
+
+
+def barras_do_plano(resultado: dict) -> Iterator[dict]:
+    """Gera um dict por barra (número a partir de 1), lendo o PlanoCorte sob demanda"""
+    plano: PlanoCorte = resultado['barras']
+    for i in range(len(plano)):
+        corte = _corte_da_barra(resultado, i)
+        pontos = _pontos_transporte(corte)
+        yield {
+            'barra': i + 1,
+            'tamanho': plano.tamanho(i),
+            'retalho': bool(plano.retalho[i]),
+            'pecas': plano.pecas_barra(i),
+            'usado': plano.usado_barra(i),
+            'sobra': round(plano.sobra(i), 2),
+            'cortes_transporte': pontos,
+            'pedacos': _pecas_dos_pedacos(corte, plano, i) if pontos else None,
+        }
+
+
+def exportar_csv(resultado: dict, destino: TextIO, **_info) -> int:
+    """Uma linha por barra; retorna quantas barras foram escritas"""
+    writer = csv.writer(destino, delimiter=';')
+    writer.writerow(['barra', 'tamanho_cm', 'retalho', 'qtd_pecas', 'pecas_cm', 'usado_cm', 'sobra_cm',
+                     'cortes_transporte_cm'])
+    escritas = 0
+    for barra in barras_do_plano(resultado):
+        writer.writerow([barra['barra'], barra['tamanho'], int(barra['retalho']), len(barra['pecas']),
+                         ' + '.join(str(p) for p in barra['pecas']), barra['usado'], f"{barra['sobra']:.2f}",
+                         ' e '.join(f"{p:.1f}" for p in barra['cortes_transporte'])])
+        escritas += 1
+    return escritas
+
+
+def exportar_jsonl(resultado: dict, destino: TextIO, **info) -> int:
+    """
+    Cabeçalho com a configuração, os totais e o que vier em 'info' (método,
+    id do pedido, limite_transporte...), depois uma linha por barra.
+    """
+    plano: PlanoCorte = resultado['barras']
+    cabecalho = {
+        'tipo': 'plano',
+        'tamanho_barra': plano.tamanho_barra,
+        'espessura_corte': plano.espessura_corte,
+        **info,
+        'num_barras': resultado['num_barras'],
+        'num_padroes': len(resultado['padroes']) if resultado.get('padroes') else None,
+        'sobra_total': resultado['sobra_total'],
+        'eficiencia': resultado['eficiencia'],
+        'limite_inferior': resultado['limite_inferior'],
+        'gap': resultado['gap'],
+    }
+    destino.write(json.dumps(cabecalho, ensure_ascii=False) + '\n')
+    escritas = 0
+    for barra in barras_do_plano(resultado):
+        destino.write(json.dumps({'tipo': 'barra', **barra}, ensure_ascii=False) + '\n')
+        escritas += 1
+    return escritas
+
+
+def _mm(unidades: int) -> str:
+    return f"{unidades * 10 / UNIDADES_POR_CM:.1f}"
+
+
+def exportar_lista_serra(resultado: dict, destino: TextIO, **_info) -> int:
+    """Lista de cortes para a serra (formato no docstring do módulo)"""
+    plano: PlanoCorte = resultado['barras']
+    corte = para_unidades(plano.espessura_corte)
+    destino.write("# B;barra;comprimento_mm;N|R  P;seq;medida_mm;posicao_mm  T;posicao_mm  S;sobra_mm\n")
+    for i in range(len(plano)):
+        tamanho = para_unidades(plano.tamanho(i))
+        destino.write(f"B;{i + 1};{_mm(tamanho)};{'R' if plano.retalho[i] else 'N'}\n")
+
+        transporte = _corte_da_barra(resultado, i)
+        if _pontos_transporte(transporte):
+            pedacos = _pecas_dos_pedacos(transporte, plano, i)
+        else:
+            pedacos = [plano.pecas_barra(i)]
+
+        posicao = seq = 0
+        for j, pecas in enumerate(pedacos):
+            for peca in pecas:
+                seq += 1
+                posicao += para_unidades(peca) + corte
+                destino.write(f"P;{seq};{_mm(para_unidades(peca))};{_mm(posicao)}\n")
+            if j < len(pedacos) - 1:
+                posicao += corte
+                destino.write(f"T;{_mm(posicao)}\n")
+        destino.write(f"S;{_mm(max(tamanho - posicao, 0))}\n")
+    return len(plano)
+
+
+# formato -> (exportador, extensão)
+FORMATOS: Dict[str, tuple] = {
+    'csv': (exportar_csv, '.csv'),
+    'jsonl': (exportar_jsonl, '.jsonl'),
+    'serra': (exportar_lista_serra, '.txt'),
+}
+
+
+def formato_do_caminho(caminho: str) -> str:
+    """Formato pela extensão do arquivo (.csv, .jsonl; qualquer outra = lista da serra)"""
+    return {'.csv': 'csv', '.jsonl': 'jsonl'}.get(os.path.splitext(caminho)[1].lower(), 'serra')
+
+
+def exportar_arquivo(resultado: dict, caminho: str, formato: Optional[str] = None, **info) -> int:
+    """Abre 'caminho' e exporta no 'formato' (ou o da extensão); retorna quantas barras"""
+    exportador: Callable = FORMATOS[formato or formato_do_caminho(caminho)][0]
+    with open(caminho, 'w', newline='', encoding='utf-8') as destino:
+        return exportador(resultado, destino, **info)
@@ -0,0 +1,322 @@
+"""
+Cálculo em lote: resolve muitos pedidos sem perguntar nada.
+
+Lê um arquivo JSON ou CSV (ou uma pasta com vários) com os pedidos do dia,
+resolve cada um com OtimizadorCorte.resolver_portfolio() em até N processos,
+com um tempo máximo por pedido, e escreve uma linha JSON por pedido, à medida
+que ficam prontos.
+
+    python lote_corte.py pedidos.json
+    python lote_corte.py pedidos.csv -o resultado.jsonl -j 4
+    python lote_corte.py pasta_do_erp/ --barra 600 --espessura 3 --transporte 300
+    python lote_corte.py pedidos.json --orcamento 30
+
+JSON: lista de pedidos (ou {"pedidos": [...]}), cada um assim:
+
+    {"id": "1234", "tamanho_barra": 600, "espessura_mm": 3, "limite_transporte": 300,
+     "pecas": [{"medida": 75, "quantidade": 4}, [120.5, 2]]}
+
+"pecas" também pode ser {"75": 4, "120.5": 2}. O que faltar vem das opções
+da linha de comando.
+
+CSV: uma linha por medida, com cabeçalho; separador ';' ou ',' e vírgula
+decimal aceita. Colunas: pedido, medida, quantidade e, opcionais,
+tamanho_barra, espessura_mm, limite_transporte.
+
+Cada linha de saída é o resultado_para_dict() do melhor método mais "id",
+"origem" e "tempo_s"; "padroes" traz as barras iguais agrupadas, com a
+quantidade de cada padrão. Um pedido com erro sai como {"id", "origem",
+"erro"} e não interrompe o lote.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from cache_cortes import CacheCortes
+from otimizador_corte import OtimizadorCorte, resultado_para_dict
+
+
+# Pedidos enviados ao pool por processo; limita a memória em arquivos enormes
+PEDIDOS_POR_PROCESSO = 2
+
+
+class Pedido:
+    """Um pedido do lote: configuração da barra + peças (medida -> quantidade)"""
+
+    def __init__(self, id_pedido: str, origem: str, tamanho_barra: float = 0, espessura_mm: float = 0,
+                 limite_transporte: Optional[float] = None, pecas: Optional[Counter] = None,
+                 erro: Optional[str] = None):
+        self.id = id_pedido
+        self.origem = origem
+        self.tamanho_barra = tamanho_barra
+        self.espessura_mm = espessura_mm
+        self.limite_transporte = limite_transporte
+        self.pecas = pecas or Counter()
+        self.erro = erro  # pedido que não pôde ser lido
+
+    @property
+    def config(self) -> Tuple[float, float, Optional[float]]:
+        """Argumentos de OtimizadorCorte (espessura em cm)"""
+        return self.tamanho_barra, self.espessura_mm / 10, self.limite_transporte
+
+    def validar(self):
+        if self.erro:
+            raise ValueError(self.erro)
+        if self.tamanho_barra <= 0:
+            raise ValueError("tamanho_barra deve ser maior que zero")
+        if self.espessura_mm < 0:
+            raise ValueError("espessura_mm não pode ser negativa")
+        if not self.pecas:
+            raise ValueError("pedido sem peças")
+        for medida, quantidade in self.pecas.items():
+            if medida <= 0 or quantidade <= 0:
+                raise ValueError(f"peça inválida: {medida}cm x {quantidade}")
+            if medida > self.tamanho_barra:
+                raise ValueError(f"peça de {medida}cm não cabe na barra de {self.tamanho_barra}cm")
+
+
+def _numero(valor) -> float:
+    """Número de JSON ou CSV; aceita vírgula decimal"""
+    if isinstance(valor, str):
+        valor = valor.strip().replace(',', '.')
+    return float(valor)
+
+
+def _opcional(valor) -> Optional[float]:
+    if valor is None or (isinstance(valor, str) and not valor.strip()):
+        return None
+    return _numero(valor) or None
+
+
+def _somar_peca(pecas: Counter, medida, quantidade):
+    quantidade = _numero(quantidade)
+    if quantidade != int(quantidade):
+        raise ValueError(f"quantidade não inteira: {quantidade}")
+    pecas[_numero(medida)] += int(quantidade)
+
+
+def _pecas_json(dados) -> Counter:
+    pecas = Counter()
+    itens = dados.items() if isinstance(dados, dict) else dados
+    for item in itens:
+        if isinstance(item, dict):
+            _somar_peca(pecas, item['medida'], item.get('quantidade', 1))
+        else:
+            _somar_peca(pecas, item[0], item[1] if len(item) > 1 else 1)
+    return pecas
+
+
+def _criar_pedido(dados: dict, id_padrao: str, origem: str, padrao: dict) -> Pedido:
+    """Pedido a partir do dict lido; se algo estiver errado, um Pedido com 'erro'"""
+    def campo(nome):
+        return dados[nome] if dados.get(nome) not in (None, '') else padrao[nome]
+
+    id_pedido = str(dados.get('id', id_padrao))
+    try:
+        pecas = dados['pecas']
+        if not isinstance(pecas, Counter):
+            pecas = _pecas_json(pecas)
+        return Pedido(id_pedido, origem, _numero(campo('tamanho_barra')), _numero(campo('espessura_mm')),
+                      _opcional(campo('limite_transporte')), pecas)
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        return Pedido(id_pedido, origem, erro=f"pedido inválido: {type(e).__name__}: {e}")
+
+
+def ler_json(caminho: str, padrao: dict) -> Iterator[Pedido]:
+    with open(caminho, encoding='utf-8') as f:
+        dados = json.load(f)
+    if isinstance(dados, dict):
+        dados = dados.get('pedidos', [dados])
+    if not isinstance(dados, list):
+        # Ex.: um número, um texto ou 'pedidos' que não é lista
+        raise ValueError(f"{caminho}: esperado um pedido, uma lista de pedidos ou {{'pedidos': [...]}}")
+    for n, pedido in enumerate(dados, 1):
+        if not isinstance(pedido, dict):
+            yield Pedido(str(n), caminho, erro="pedido inválido: esperado um objeto JSON")
+            continue
+        yield _criar_pedido(pedido, str(n), caminho, padrao)
+
+
+def ler_csv(caminho: str, padrao: dict) -> Iterator[Pedido]:
+    with open(caminho, newline='', encoding='utf-8-sig') as f:
+        cabecalho = f.readline()
+        f.seek(0)
+        leitor = csv.DictReader(f, delimiter=';' if ';' in cabecalho else ',')
+        leitor.fieldnames = [nome.strip().lower() for nome in leitor.fieldnames or []]
+        if 'medida' not in leitor.fieldnames:
+            raise ValueError(f"{caminho}: falta a coluna 'medida'")
+
+        pedidos = OrderedDict()  # pedido -> dados, na ordem do arquivo
+        for linha in leitor:
+            if not (linha.get('medida') or '').strip():
+                continue
+            id_pedido = (linha.get('pedido') or '1').strip()
+            dados = pedidos.setdefault(id_pedido, {'id': id_pedido, 'pecas': Counter()})
+            for nome in ('tamanho_barra', 'espessura_mm', 'limite_transporte'):
+                if (linha.get(nome) or '').strip():
+                    dados[nome] = linha[nome]
+            try:
+                _somar_peca(dados['pecas'], linha['medida'], linha.get('quantidade') or 1)
+            except ValueError as e:
+                dados['erro'] = f"linha {leitor.line_num}: {e}"
+
+    for id_pedido, dados in pedidos.items():
+        if 'erro' in dados:
+            yield Pedido(id_pedido, caminho, erro=dados['erro'])
+        else:
+            yield _criar_pedido(dados, id_pedido, caminho, padrao)
+
+
+def ler_pedidos(caminho: str, padrao: dict) -> Iterator[Pedido]:
+    """Pedidos de um arquivo .json/.csv ou de todos os arquivos de uma pasta"""
+    if os.path.isdir(caminho):
+        arquivos = sorted(os.path.join(caminho, nome) for nome in os.listdir(caminho)
+                          if nome.lower().endswith(('.json', '.csv')))
+    else:
+        arquivos = [caminho]
+    for arquivo in arquivos:
+        leitor = ler_csv if arquivo.lower().endswith('.csv') else ler_json
+        try:
+            yield from leitor(arquivo, padrao)
+        except (OSError, ValueError, csv.Error) as e:
+            # Arquivo ilegível: vira uma linha de erro e o lote segue
+            yield Pedido('', arquivo, erro=f"{type(e).__name__}: {e}")
+
+
+def _resolver_pedido(config: Tuple, pecas: Dict[float, int], orcamento_s: float) -> Tuple[dict, float]:
+    """
+    Ponto de entrada dos processos: (resultado_para_dict, tempo em s). Os
+    métodos mais caros rodam num processo auxiliar, encerrado ao fim do
+    orçamento, então o pedido não prende o processo do lote por mais tempo.
+    """
+    inicio = time.perf_counter()
+    nome, resultado = OtimizadorCorte(*config).resolver_portfolio(pecas, orcamento_s, max_processos=1)
+    return resultado_para_dict(nome, resultado), time.perf_counter() - inicio
+
+
+def _do_cache(cache: CacheCortes, pedido: Pedido) -> Tuple[str, Optional[dict]]:
+    """(chave, resultado salvo com o transporte recalculado, ou None)"""
+    chave, salvo = OtimizadorCorte(*pedido.config, cache).consultar_cache(pedido.pecas)
+    return chave, resultado_para_dict(*salvo) if salvo is not None else None
+
+
+def processar_lote(pedidos: Iterator[Pedido], saida, processos: int = 1,
+                   cache: Optional[CacheCortes] = None, orcamento_s: float = 10.0) -> dict:
+    """
+    Resolve os pedidos em até 'processos' processos, cada um com até
+    'orcamento_s' segundos, e escreve em 'saida' uma linha JSON por pedido
+    assim que ele termina (a ordem é a de término).
+    Pedidos já resolvidos antes saem do cache sem ir para o pool; o cache só
+    é lido e gravado neste processo. Retorna um resumo do lote.
+    """
+    resumo = {'pedidos': 0, 'erros': 0, 'do_cache': 0, 'num_barras': 0}
+    inicio = time.perf_counter()
+
+    def escrever(linha: dict):
+        resumo['pedidos'] += 1
+        if 'erro' in linha:
+            resumo['erros'] += 1
+        else:
+            resumo['num_barras'] += linha['num_barras']
+        saida.write(json.dumps(linha, ensure_ascii=False) + '\n')
+        saida.flush()
+
+    def erro(pedido_id: str, origem: str, mensagem: str):
+        escrever({'id': pedido_id, 'origem': origem, 'erro': mensagem})
+
+    executor = ProcessPoolExecutor(max_workers=processos)
+    pendentes = {}  # futuro -> (pedido, chave do cache)
+
+    def receber(prontos):
+        for futuro in prontos:
+            pedido, chave = pendentes.pop(futuro)
+            try:
+                dados, tempo = futuro.result()
+            except Exception as e:
+                erro(pedido.id, pedido.origem, f"{type(e).__name__}: {e}")
+                continue
+            if cache is not None:
+                cache.guardar(chave, dados)
+            escrever(dict(dados, id=pedido.id, origem=pedido.origem, tempo_s=round(tempo, 3)))
+
+    try:
+        for pedido in pedidos:
+            try:
+                pedido.validar()
+            except ValueError as e:
+                erro(pedido.id, pedido.origem, str(e))
+                continue
+
+            chave = None
+            if cache is not None:
+                chave, dados = _do_cache(cache, pedido)
+                if dados is not None:
+                    resumo['do_cache'] += 1
+                    escrever(dict(dados, id=pedido.id, origem=pedido.origem, tempo_s=0.0))
+                    continue
+
+            if len(pendentes) >= processos * PEDIDOS_POR_PROCESSO:
+                prontos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                receber(prontos)
+            futuro = executor.submit(_resolver_pedido, pedido.config, dict(pedido.pecas), orcamento_s)
+            pendentes[futuro] = (pedido, chave)
+
+        while pendentes:
+            prontos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+            receber(prontos)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    resumo['tempo_s'] = round(time.perf_counter() - inicio, 3)
+    return resumo
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Resolve um lote de pedidos de corte e escreve um JSON por pedido (JSON Lines).")
+    parser.add_argument('entrada', help="arquivo .json/.csv ou pasta com vários")
+    parser.add_argument('-o', '--saida', help="arquivo .jsonl de saída (padrão: tela)")
+    parser.add_argument('-j', '--processos', type=int, default=os.cpu_count() or 1,
+                        help="pedidos resolvidos ao mesmo tempo (padrão: nº de CPUs)")
+    parser.add_argument('--barra', type=float, default=600, help="tamanho da barra em cm [600]")
+    parser.add_argument('--espessura', type=float, default=3, help="espessura do corte em mm [3]")
+    parser.add_argument('--transporte', type=float, default=None, help="limite do carro em cm")
+    parser.add_argument('--orcamento', type=float, default=10,
+                        help="tempo máximo de cálculo por pedido em s [10]")
+    parser.add_argument('--sem-cache', action='store_true', help="não usa o cache de planos")
+    args = parser.parse_args(argv)
+
+    if args.processos < 1:
+        parser.error("--processos deve ser pelo menos 1")
+    if args.orcamento <= 0:
+        parser.error("--orcamento deve ser maior que zero")
+    if not os.path.exists(args.entrada):
+        parser.error(f"não encontrado: {args.entrada}")
+
+    padrao = {'tamanho_barra': args.barra, 'espessura_mm': args.espessura,
+              'limite_transporte': args.transporte}
+    cache = None if args.sem_cache else CacheCortes()
+    saida = open(args.saida, 'w', encoding='utf-8') if args.saida else sys.stdout
+    try:
+        resumo = processar_lote(ler_pedidos(args.entrada, padrao), saida, args.processos, cache,
+                                args.orcamento)
+    finally:
+        if args.saida:
+            saida.close()
+        if cache is not None:
+            cache.fechar()
+
+    print(f"{resumo['pedidos']} pedidos, {resumo['num_barras']} barras, "
+          f"{resumo['do_cache']} do cache, {resumo['erros']} com erro, {resumo['tempo_s']:.1f}s",
+          file=sys.stderr)
+    return 1 if resumo['erros'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,277 +6,2297 @@ Objetivo: Minimizar desperdício e maximizar sobras úteis
 
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from typing import List, Tuple, Dict
-from collections import Counter
+from typing import List, Tuple, Dict, Iterable, Union, Optional, Callable
+from collections import Counter, OrderedDict
 from datetime import datetime
+from bisect import bisect_left, insort
+from array import array
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+import argparse
+import cProfile
 import csv
+import functools
+import importlib.util
+import io
+import math
+import os
+import pstats
+import queue
+import random
+import threading
+import time
+
+from cache_cortes import CacheCortes, chave_trabalho
+from estoque_retalhos import EstoqueRetalhos
+
+
+UNIDADES_POR_CM = 100  # medidas inteiras em décimos de milímetro
+
+# NumPy é opcional: só a geração de colunas usa, e ele só é importado quando
+# ela roda. Sem ele a geração de colunas devolve o plano de Maiores Sobras
+TEM_NUMPY = importlib.util.find_spec('numpy') is not None
+
+Demanda = Union[Dict[float, int], Iterable[Tuple[float, int]]]
+
+
+# Perfis que não são cortados de barras (vidro vem na medida)
+PERFIS_SEM_CORTE = {'Vidro'}
+
+# Tipo de barra à venda: (comprimento em cm, custo por metro, quantidade
+# disponível ou None se não tem limite)
+TipoBarra = Tuple[float, float, Optional[int]]
+
+
+def para_unidades(valor_cm: float) -> int:
+    """Converte uma medida em cm para unidades inteiras (décimos de mm)"""
+    return int(round(valor_cm * UNIDADES_POR_CM))
+
+
+def chave_selecao(resultado: dict) -> Tuple[int, float]:
+    """Critério de escolha entre métodos: menos barras, depois maior sobra"""
+    return (resultado['num_barras'], -max(resultado['sobras'], default=0))
+
+
+def ler_tipos_barra(texto: str) -> List[TipoBarra]:
+    """
+    Lê tipos de barra no formato "600:45, 500:40:10, 300:38"
+    (comprimento:custo por metro[:quantidade]). Texto vazio = lista vazia.
+    """
+    tipos = []
+    for item in texto.replace(';', ',').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        partes = item.split(':')
+        if len(partes) not in (2, 3):
+            raise ValueError(f"Tipo de barra inválido: {item}")
+        comprimento, custo = float(partes[0]), float(partes[1])
+        disponivel = int(partes[2]) if len(partes) == 3 else None
+        if comprimento <= 0 or custo < 0 or (disponivel is not None and disponivel < 0):
+            raise ValueError(f"Tipo de barra inválido: {item}")
+        tipos.append((comprimento, custo, disponivel))
+    return tipos
+
+
+def custo_barra(comprimento: float, custo_por_metro: float) -> float:
+    return comprimento / 100 * custo_por_metro
+
+
+def expandir_demanda(demanda: Demanda) -> List[float]:
+    """Expande pares (medida, quantidade) em uma peça por item"""
+    itens = demanda.items() if isinstance(demanda, dict) else demanda
+    pecas = []
+    for medida, qtd in itens:
+        pecas.extend([medida] * qtd)
+    return pecas
+
+
+class Instrumentacao:
+    """
+    Tempos por método e contadores dos laços internos de um OtimizadorCorte
+    (OtimizadorCorte(..., instrumentacao=Instrumentacao())). Desligada, que é
+    o padrão, cada método só testa 'instrumentacao is None' uma vez por
+    chamada; os laços somam em variáveis locais e só passam os totais no fim.
+
+    Os tempos incluem as chamadas internas (geração de colunas chama
+    otimizar_para_maiores_sobras, por exemplo). Com perfilar=True também
+    guarda um cProfile do que roda dentro de perfilando(); métodos rodados
+    em outros processos (portfólio) entram nos tempos e contadores, mas não
+    no cProfile.
+    """
+
+    def __init__(self, perfilar: bool = False):
+        self.tempos = {}  # método -> [chamadas, segundos]
+        self.contadores = Counter()
+        self.perfil = cProfile.Profile() if perfilar else None
+
+    @contextmanager
+    def medir(self, nome: str):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            tempo = self.tempos.setdefault(nome, [0, 0.0])
+            tempo[0] += 1
+            tempo[1] += time.perf_counter() - inicio
+
+    def contar(self, **valores: int):
+        self.contadores.update(valores)
+
+    @contextmanager
+    def perfilando(self):
+        """Liga o cProfile (se perfilar=True) durante o bloco"""
+        if self.perfil is None:
+            yield
+            return
+        self.perfil.enable()
+        try:
+            yield
+        finally:
+            self.perfil.disable()
+
+    def para_dict(self) -> dict:
+        return {'tempos': {nome: list(v) for nome, v in self.tempos.items()},
+                'contadores': dict(self.contadores)}
+
+    def juntar(self, dados: dict):
+        """Soma os tempos e contadores de outra instrumentação (ver para_dict)"""
+        for nome, (chamadas, segundos) in dados['tempos'].items():
+            tempo = self.tempos.setdefault(nome, [0, 0.0])
+            tempo[0] += chamadas
+            tempo[1] += segundos
+        self.contadores.update(dados['contadores'])
+
+    def relatorio(self) -> str:
+        linhas = [f"{'Método':<40} {'Chamadas':>9} {'Tempo (s)':>10}", "-" * 61]
+        for nome, (chamadas, segundos) in sorted(self.tempos.items(), key=lambda x: -x[1][1]):
+            linhas.append(f"{nome:<40} {chamadas:>9} {segundos:>10.4f}")
+        linhas += ["", f"{'Contador':<40} {'Total':>20}", "-" * 61]
+        for nome, total in sorted(self.contadores.items()):
+            linhas.append(f"{nome:<40} {total:>20}")
+        return "\n".join(linhas)
+
+    def gravar(self, caminho_base: str) -> List[str]:
+        """
+        Grava caminho_base + '_perfil.txt' (relatório e as funções mais caras
+        do cProfile) e, se houver cProfile, caminho_base + '.prof' (abre com
+        pstats ou snakeviz). Retorna os arquivos gravados.
+        """
+        texto = self.relatorio()
+        arquivos = []
+        if self.perfil is not None:
+            self.perfil.dump_stats(caminho_base + '.prof')
+            arquivos.append(caminho_base + '.prof')
+            saida = io.StringIO()
+            pstats.Stats(self.perfil, stream=saida).sort_stats('cumulative').print_stats(30)
+            texto += "\n\n" + saida.getvalue()
+        with open(caminho_base + '_perfil.txt', 'w', encoding='utf-8') as f:
+            f.write(texto + "\n")
+        return [caminho_base + '_perfil.txt'] + arquivos
+
+
+@contextmanager
+def _sem_perfil():
+    """Bloco vazio, no lugar de Instrumentacao.perfilando() quando não há instrumentação"""
+    yield
+
+
+def _instrumentado(metodo):
+    """Mede o tempo do método em self.instrumentacao, quando ela existe"""
+    nome = metodo.__name__
+
+    @functools.wraps(metodo)
+    def medido(self, *args, **kwargs):
+        if self.instrumentacao is None:
+            return metodo(self, *args, **kwargs)
+        with self.instrumentacao.medir(nome):
+            return metodo(self, *args, **kwargs)
+    return medido
+
+
+class _IndiceResiduos:
+    """
+    Barras abertas ordenadas por espaço livre (residual, índice da barra).
+    Permite achar por bisseção a barra mais justa onde uma peça cabe.
+    """
+
+    def __init__(self):
+        self._chaves = []
+
+    def __len__(self):
+        return len(self._chaves)
+
+    def inserir(self, residuo: float, indice: int):
+        insort(self._chaves, (residuo, indice))
+
+    def remover(self, residuo: float, indice: int):
+        pos = bisect_left(self._chaves, (residuo, indice))
+        del self._chaves[pos]
+
+    def posicao_minima(self, espaco: float) -> int:
+        """Posição da primeira barra com residual >= espaco (len se nenhuma)"""
+        return bisect_left(self._chaves, (espaco, -1))
+
+    def chave(self, pos: int) -> Tuple[float, int]:
+        return self._chaves[pos]
+
+
+class _ArvoreUsoMinimo:
+    """
+    Árvore de segmentos com o menor espaço usado em cada faixa de barras
+    (equivale a guardar o maior residual). Responde em O(log m) qual é a
+    barra mais à esquerda onde uma peça ainda cabe.
+    """
+
+    def __init__(self, capacidade: int):
+        self._tamanho = 1
+        while self._tamanho < max(1, capacidade):
+            self._tamanho *= 2
+        # Barras ainda não abertas ficam com uso infinito
+        self._arvore = [float('inf')] * (2 * self._tamanho)
+
+    def atualizar(self, barra: int, usado: float):
+        no = barra + self._tamanho
+        self._arvore[no] = usado
+        no //= 2
+        while no:
+            self._arvore[no] = min(self._arvore[2 * no], self._arvore[2 * no + 1])
+            no //= 2
+
+    def primeira_que_cabe(self, espaco: float, limite: float) -> int:
+        """Índice da primeira barra com usado + espaco <= limite, ou -1"""
+        arvore = self._arvore
+        if arvore[1] + espaco > limite:
+            return -1
+        no = 1
+        while no < self._tamanho:
+            no *= 2
+            if arvore[no] + espaco > limite:
+                no += 1
+        return no - self._tamanho
+
+
+class PlanoCorte:
+    """
+    Plano de corte compacto, guardado em arrays planos:
+    - comprimentos: medida de cada peça, agrupadas por barra (maior primeiro)
+    - barra_da_peca: índice da barra de cada peça
+    - usado: soma das peças de cada barra em unidades inteiras (calculada uma vez)
+    - tamanhos: comprimento de cada barra (tamanho_barra, ou o do retalho)
+    - retalho: 1 se a barra saiu do estoque de retalhos
+
+    Também se comporta como a antiga List[List[float]]: len(plano),
+    plano[i] e iteração devolvem as peças de cada barra.
+    """
+
+    def __init__(self, tamanho_barra: float, espessura_corte: float = 0):
+        self.tamanho_barra = tamanho_barra
+        self.espessura_corte = espessura_corte
+        self.comprimentos = array('d')
+        self.barra_da_peca = array('I')
+        self.usado = array('q')
+        self.tamanhos = array('d')
+        self.retalho = array('b')
+        self._inicio = array('I', [0])  # posição da primeira peça de cada barra
+
+    @classmethod
+    def de_barras(cls, barras: List[List[float]], tamanho_barra: float,
+                  espessura_corte: float = 0, tamanhos: Optional[List[float]] = None,
+                  retalhos: Optional[List[bool]] = None) -> 'PlanoCorte':
+        plano = cls(tamanho_barra, espessura_corte)
+        for i, barra in enumerate(barras):
+            plano.adicionar_barra(barra, tamanhos[i] if tamanhos else None,
+                                  bool(retalhos and retalhos[i]))
+        return plano
+
+    def adicionar_barra(self, pecas: List[float], tamanho: Optional[float] = None,
+                        retalho: bool = False):
+        indice = len(self.usado)
+        ordenadas = sorted(pecas, reverse=True)
+        self.comprimentos.extend(ordenadas)
+        self.barra_da_peca.extend([indice] * len(ordenadas))
+        self.usado.append(sum(para_unidades(p) for p in ordenadas))
+        self.tamanhos.append(self.tamanho_barra if tamanho is None else tamanho)
+        self.retalho.append(1 if retalho else 0)
+        self._inicio.append(len(self.comprimentos))
+
+    def __len__(self):
+        return len(self.usado)
+
+    def __getitem__(self, i: int) -> List[float]:
+        return self.pecas_barra(i)
+
+    def __iter__(self):
+        for i in range(len(self.usado)):
+            yield self.pecas_barra(i)
+
+    @property
+    def num_barras(self) -> int:
+        return len(self.usado)
+
+    @property
+    def num_pecas(self) -> int:
+        return len(self.comprimentos)
+
+    def pecas_barra(self, i: int) -> List[float]:
+        """Peças da barra i, da maior para a menor"""
+        if i < 0:
+            i += len(self.usado)
+        return self.comprimentos[self._inicio[i]:self._inicio[i + 1]].tolist()
+
+    def quantidade_pecas(self, i: int) -> int:
+        return self._inicio[i + 1] - self._inicio[i]
+
+    def usado_barra(self, i: int) -> float:
+        """Soma das medidas das peças da barra i (sem espessura de corte)"""
+        return self.usado[i] / UNIDADES_POR_CM
+
+    def tamanho(self, i: int) -> float:
+        """Comprimento da barra i"""
+        return self.tamanhos[i]
+
+    def sobra(self, i: int) -> float:
+        """Sobra da barra i considerando a espessura do corte (conta exata em unidades)"""
+        return (para_unidades(self.tamanhos[i]) - self.usado[i]
+                - self.quantidade_pecas(i) * para_unidades(self.espessura_corte)) / UNIDADES_POR_CM
+
+    def sobras(self) -> List[float]:
+        return [self.sobra(i) for i in range(len(self.usado))]
+
+    def material_usado(self) -> float:
+        return sum(self.usado) / UNIDADES_POR_CM
+
+    def material_total(self) -> float:
+        return sum(self.tamanhos)
+
+    @property
+    def tem_retalhos(self) -> bool:
+        return any(self.retalho)
+
+    @property
+    def tamanho_unico(self) -> bool:
+        """Todas as barras são novas e de tamanho_barra"""
+        return not self.tem_retalhos and all(t == self.tamanho_barra for t in self.tamanhos)
+
+    def comprimentos_retalhos(self) -> List[float]:
+        """Comprimento de cada retalho do estoque usado no plano"""
+        return [t for t, r in zip(self.tamanhos, self.retalho) if r]
+
+    def contagem_tamanhos(self) -> Counter:
+        """Quantas barras novas (fora os retalhos) de cada comprimento"""
+        return Counter(t for t, r in zip(self.tamanhos, self.retalho) if not r)
+
+    def barras(self) -> List[List[float]]:
+        """Converte para o formato antigo List[List[float]]"""
+        return list(self)
+
+    def padroes(self) -> Dict[Tuple[float, bool, Tuple[float, ...]], List[int]]:
+        """
+        Barras iguais agrupadas: (tamanho, é retalho, peças) -> índices das
+        barras, na ordem em que o padrão aparece no plano
+        """
+        grupos = {}
+        for i in range(len(self.usado)):
+            chave = (self.tamanhos[i], bool(self.retalho[i]), tuple(self.pecas_barra(i)))
+            grupos.setdefault(chave, []).append(i)
+        return grupos
+
+
+def _subconjunto_mais_proximo(pesos: List[int], alvo: int,
+                              custo: Optional[Callable[[int], object]] = None) -> List[int]:
+    """
+    Índices de um subconjunto próprio e não vazio de 'pesos' (inteiros > 0)
+    com soma mais próxima de 'alvo', por soma de subconjuntos em bitset.
+    Só olha a soma alcançável logo abaixo e logo acima do alvo; 'custo'
+    (que deve crescer ao se afastar do alvo) decide entre as duas.
+    """
+    total = sum(pesos)
+    alcancavel = 1  # bit s ligado = soma s alcançável
+    historico = []
+    for peso in pesos:
+        historico.append(alcancavel)
+        alcancavel |= alcancavel << peso
+    # Exclui o conjunto vazio e o completo: os dois lados precisam ter peça
+    alcancavel &= ~1 & ~(1 << total)
+    if not alcancavel:
+        return []
+
+    candidatos = []
+    abaixo = alcancavel & ((1 << (max(alvo, -1) + 1)) - 1)
+    if abaixo:
+        candidatos.append(abaixo.bit_length() - 1)
+    acima = alcancavel >> max(alvo + 1, 0)
+    if acima:
+        candidatos.append((acima & -acima).bit_length() - 1 + max(alvo + 1, 0))
+    soma = min(candidatos, key=custo or (lambda g: abs(g - alvo)))
+
+    escolhidos = []
+    for i in range(len(pesos) - 1, -1, -1):
+        if not (historico[i] >> soma) & 1:
+            escolhidos.append(i)
+            soma -= pesos[i]
+    return escolhidos[::-1]
+
+
+class _MestreCobertura:
+    """
+    LP mestre da geração de colunas (Gilmore-Gomory), resolvido por um
+    simplex revisado simples com a inversa da base explícita (NumPy, importado
+    aqui dentro, ver TEM_NUMPY):
+        min sum(x_j)  s.a.  sum(a_ij * x_j) >= d_i,  x >= 0
+    A base inicial são os padrões homogêneos (uma medida só por barra), que já
+    é viável. Colunas novas entram sem perder a base atual (warm start).
+    """
+
+    EPS = 1e-9
+
+    def __init__(self, padroes_iniciais: List[List[int]], demanda: List[int]):
+        import numpy as np
+        self.m = len(demanda)
+        self.demanda = demanda
+        self.padroes = [list(p) for p in padroes_iniciais]
+        self.matriz = np.array(self.padroes, dtype=np.float64).reshape(-1, self.m)  # um padrão por linha
+        # Variáveis 0..P-1 são padrões; -1-i é a folga (excesso) da linha i
+        self.base = list(range(self.m))
+        diagonal = np.diag(self.matriz[:self.m])
+        self.inversa = np.diag(1.0 / diagonal)
+        self.valores = np.asarray(demanda, dtype=np.float64) / diagonal
+
+    def _coluna(self, var: int):
+        import numpy as np
+        if var >= 0:
+            return self.matriz[var]
+        coluna = np.zeros(self.m)
+        coluna[-1 - var] = -1.0
+        return coluna
+
+    def duais(self) -> List[float]:
+        import numpy as np
+        custos = np.array([1.0 if v >= 0 else 0.0 for v in self.base])
+        return (custos @ self.inversa).tolist()
+
+    def adicionar_coluna(self, padrao: List[int]):
+        import numpy as np
+        self.padroes.append(list(padrao))
+        self.matriz = np.vstack([self.matriz, np.asarray(padrao, dtype=np.float64)])
+
+    def otimizar(self, max_iteracoes: int = 10000) -> bool:
+        """
+        Pivota até nenhuma variável ter custo reduzido negativo. Retorna
+        False se parou antes disso (max_iteracoes): a base não é ótima e o
+        valor do mestre não é o do LP.
+        """
+        import numpy as np
+        na_base = set(self.base)
+        for _ in range(max_iteracoes):
+            y = np.array(self.duais())
+            reduzidos = 1.0 - self.matriz @ y
+            reduzidos[[v for v in na_base if v >= 0]] = np.inf
+            entra, menor = None, -self.EPS
+            j = int(np.argmin(reduzidos))
+            if reduzidos[j] < menor:
+                entra, menor = j, reduzidos[j]
+            for i, yi in enumerate(y):
+                if yi < menor and (-1 - i) not in na_base:
+                    entra, menor = -1 - i, yi
+            if entra is None:
+                return True
+
+            direcao = self.inversa @ self._coluna(entra)
+            positivos = direcao > self.EPS
+            if not positivos.any():
+                return False  # ilimitado: não acontece com custos não negativos
+            razoes = np.full(self.m, np.inf)
+            razoes[positivos] = self.valores[positivos] / direcao[positivos]
+            sai = int(np.argmax(razoes <= razoes.min() + self.EPS))
+
+            linha_piv = self.inversa[sai] / direcao[sai]
+            valor_piv = self.valores[sai] / direcao[sai]
+            self.inversa -= np.outer(direcao, linha_piv)
+            self.valores = np.maximum(0.0, self.valores - direcao * valor_piv)
+            self.inversa[sai] = linha_piv
+            self.valores[sai] = valor_piv
+            na_base.discard(self.base[sai])
+            na_base.add(entra)
+            self.base[sai] = entra
+        return False
+
+    def solucao(self) -> List[float]:
+        x = [0.0] * len(self.padroes)
+        for v, valor in zip(self.base, self.valores):
+            if v >= 0:
+                x[v] = float(valor)
+        return x
+
+
+def _mochila_limitada(valores: List[float], pesos: List[int], limites: List[int],
+                      capacidade: int) -> Tuple[float, List[int]]:
+    """
+    Mochila inteira limitada por programação dinâmica sobre a capacidade em
+    unidades inteiras: maximiza sum(valores * a) com sum(pesos * a) <= capacidade
+    e a <= limites. Como em _tabela_enchimento, cada medida vira itens de
+    1, 2, 4, ... cópias e os pesos são divididos pelo MDC, então o custo é
+    O(itens * capacidade), sem crescer exponencialmente com as medidas.
+    Retorna (valor, quantidades).
+    """
+    import numpy as np
+    quantidades = [0] * len(valores)
+    usar = [i for i in range(len(valores)) if valores[i] > 0 and limites[i] > 0 and pesos[i] <= capacidade]
+    if not usar:
+        return 0.0, quantidades
+    passo = 0
+    for i in usar:
+        passo = math.gcd(passo, pesos[i])
+    capacidade //= passo
+
+    melhor = np.zeros(capacidade + 1)  # melhor[c] = maior valor com peso <= c
+    itens, escolhas = [], []
+    for i in usar:
+        peso = pesos[i] // passo
+        qtd, bloco = min(limites[i], capacidade // peso), 1
+        while qtd > 0:
+            copias = min(bloco, qtd)
+            candidato = melhor[:capacidade + 1 - copias * peso] + copias * valores[i]
+            melhora = candidato > melhor[copias * peso:]
+            melhor[copias * peso:][melhora] = candidato[melhora]
+            itens.append((i, copias, copias * peso))
+            escolhas.append(melhora)
+            qtd -= copias
+            bloco *= 2
+
+    # Volta do último item para o primeiro, refazendo as escolhas
+    resto = capacidade
+    for (i, copias, peso), melhora in zip(reversed(itens), reversed(escolhas)):
+        if resto >= peso and melhora[resto - peso]:
+            quantidades[i] += copias
+            resto -= peso
+    return float(melhor[capacidade]), quantidades
+
+
+def pesos_em_unidades(medidas: Iterable[float]):
+    """Medidas em cm -> array de unidades inteiras (mesmo arredondamento de para_unidades)"""
+    import numpy as np
+    return np.rint(np.asarray(medidas, dtype=np.float64) * UNIDADES_POR_CM).astype(np.int64)
+
+
+def codificar_planos(planos: List[Union[PlanoCorte, List[List[float]]]]) -> Tuple:
+    """
+    Codifica planos do mesmo pedido para pontuar_planos: (barras K x n,
+    pesos n), arrays NumPy. As peças ficam em ordem crescente de medida,
+    igual para todos os planos, e barras[k, j] é a barra do plano k onde
+    está a peça j. ValueError se os planos não tiverem as mesmas peças.
+    """
+    import numpy as np
+    referencia = None
+    linhas = []
+    for plano in planos:
+        if isinstance(plano, PlanoCorte):
+            comprimentos = np.asarray(plano.comprimentos, dtype=np.float64)
+            barra_da_peca = np.asarray(plano.barra_da_peca, dtype=np.int64)
+        else:
+            comprimentos = np.array([p for barra in plano for p in barra], dtype=np.float64)
+            barra_da_peca = np.repeat(np.arange(len(plano), dtype=np.int64), [len(barra) for barra in plano])
+        ordem = np.argsort(comprimentos, kind='stable')
+        comprimentos = comprimentos[ordem]
+        if referencia is None:
+            referencia = comprimentos
+        elif not np.array_equal(comprimentos, referencia):
+            raise ValueError("Os planos não têm as mesmas peças")
+        linhas.append(barra_da_peca[ordem])
+
+    if referencia is None:
+        return np.zeros((0, 0), dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.vstack(linhas), pesos_em_unidades(referencia)
+
+
+def pontuar_planos(barras, pesos, capacidade: int, corte: int = 0) -> Dict:
+    """
+    Pontua K planos de uma vez (NumPy): uso, sobra e nº de peças de cada
+    barra saem de um único np.bincount sobre (plano, barra), sem montar
+    listas como analisar_resultado. 'barras' é K x n (ou um vetor, para um
+    plano) com índices de barra em 0..n-1, que não precisam ser contínuos;
+    'pesos' são as medidas em unidades, sem o corte, que é somado uma vez por
+    peça como em PlanoCorte.sobra; 'capacidade' e 'corte' em unidades.
+
+    Retorna arrays de tamanho K (medidas em cm):
+    - num_barras, sobra_total, maior_sobra, material_usado, material_total, eficiencia
+    - validos: nenhuma barra com mais de uma peça passa da capacidade (uma
+      peça maior que a barra sozinha é aceita, como nos métodos)
+    e as matrizes K x n 'sobras' (0 onde a barra não existe) e 'abertas'.
+    """
+    import numpy as np
+    barras = np.atleast_2d(np.asarray(barras, dtype=np.int64))
+    pesos = np.asarray(pesos, dtype=np.int64)
+    k, n = barras.shape
+    if pesos.shape != (n,):
+        raise ValueError(f"pesos deve ter {n} elementos, veio {pesos.shape}")
+    if n == 0:
+        zeros = np.zeros(k)
+        return {'num_barras': zeros.astype(np.int64), 'sobra_total': zeros, 'maior_sobra': zeros,
+                'material_usado': zeros, 'material_total': zeros, 'eficiencia': zeros,
+                'validos': np.ones(k, dtype=bool), 'sobras': np.zeros((k, 0)),
+                'abertas': np.zeros((k, 0), dtype=bool)}
+    if barras.min() < 0 or barras.max() >= n:
+        raise ValueError("Índice de barra fora de 0..n-1")
+
+    # Cada (plano, barra) vira uma posição única: plano * n + barra
+    posicoes = (barras + (np.arange(k, dtype=np.int64) * n)[:, None]).ravel()
+    usado = np.bincount(posicoes, weights=np.tile(pesos, k).astype(np.float64), minlength=k * n)
+    usado = np.rint(usado).astype(np.int64).reshape(k, n)
+    quantidade = np.bincount(posicoes, minlength=k * n).reshape(k, n)
+
+    abertas = quantidade > 0
+    sobras = np.where(abertas, capacidade - usado - quantidade * corte, 0)
+    num_barras = abertas.sum(axis=1)
+    maior_sobra = np.where(abertas, sobras, np.iinfo(np.int64).min).max(axis=1)
+    validos = ~((sobras < 0) & (quantidade > 1)).any(axis=1)
+
+    material_usado = np.full(k, pesos.sum() / UNIDADES_POR_CM)
+    material_total = num_barras * (capacidade / UNIDADES_POR_CM)
+    return {
+        'num_barras': num_barras,
+        'sobra_total': sobras.sum(axis=1) / UNIDADES_POR_CM,
+        'maior_sobra': maior_sobra / UNIDADES_POR_CM,
+        'material_usado': material_usado,
+        'material_total': material_total,
+        'eficiencia': np.divide(material_usado * 100, material_total,
+                                out=np.zeros(k), where=material_total > 0),
+        'validos': validos,
+        'sobras': sobras / UNIDADES_POR_CM,
+        'abertas': abertas,
+    }
+
+
+def ordem_selecao(pontos: Dict) -> List[int]:
+    """
+    Índices dos planos do melhor para o pior, pelo critério de chave_selecao
+    (menos barras, depois maior sobra); planos inválidos vão para o fim.
+    """
+    import numpy as np
+    return np.lexsort((-pontos['maior_sobra'], pontos['num_barras'], ~pontos['validos'])).tolist()
+
+
+def agrupar_por_perfil(pecas: Iterable, com_contramarco: bool = True) -> Dict[str, Counter]:
+    """
+    Separa peças marcadas com perfil em uma demanda (medida em cm -> qtd)
+    por perfil. Aceita, misturados:
+    - objetos com .perfil e .medida(com_contramarco) em mm, como
+      janela_maxim_ar_suprema.modelos.Peca
+    - tuplas (perfil, medida em cm) ou (perfil, medida em cm, quantidade)
+    Perfis em PERFIS_SEM_CORTE (vidro) ficam de fora.
+    """
+    demandas = {}
+    for peca in pecas:
+        if hasattr(peca, 'perfil'):
+            perfil, qtd = peca.perfil, 1
+            medida = peca.medida(com_contramarco) / 10
+        else:
+            perfil, medida = peca[0], peca[1]
+            qtd = peca[2] if len(peca) > 2 else 1
+        if perfil in PERFIS_SEM_CORTE or qtd <= 0:
+            continue
+        demandas.setdefault(perfil, Counter())[float(medida)] += qtd
+    return demandas
+
+
+def resumir_perfis(resultados: Dict[str, Tuple[str, dict]]) -> dict:
+    """
+    Junta os resultados de cada perfil: 'perfis' (perfil -> (método,
+    resultado), em ordem de perfil) e os totais do pedido inteiro.
+    """
+    perfis = {perfil: resultados[perfil] for perfil in sorted(resultados)}
+    analises = [resultado for _, resultado in perfis.values()]
+    material_usado = sum(r['material_usado'] for r in analises)
+    material_total = sum(r['material_total'] for r in analises)
+    return {
+        'perfis': perfis,
+        'num_barras': sum(r['num_barras'] for r in analises),
+        'sobra_total': sum(r['sobra_total'] for r in analises),
+        'material_usado': material_usado,
+        'material_total': material_total,
+        'eficiencia': (material_usado / material_total * 100) if material_total > 0 else 0,
+        'limite_inferior': sum(r['limite_inferior'] for r in analises),
+        'gap': sum(r['gap'] for r in analises),
+        'otimo': all(r['otimo'] for r in analises),
+    }
+
+
+def relatorio_perfis(resumo: dict) -> str:
+    """Texto do resumo de resumir_perfis: uma linha por perfil e o total"""
+    texto = f"{'Perfil':<10} {'Barras':>6} {'Limite':>6} {'Gap':>4} {'Eficiência':>10}  Método\n"
+    texto += "-" * 65 + "\n"
+    for perfil, (nome, r) in resumo['perfis'].items():
+        texto += (f"{perfil or '-':<10} {r['num_barras']:>6} {r['limite_inferior']:>6} {r['gap']:>4} "
+                  f"{r['eficiencia']:>9.1f}%  {nome}\n")
+    texto += "-" * 65 + "\n"
+    texto += (f"{'TOTAL':<10} {resumo['num_barras']:>6} {resumo['limite_inferior']:>6} {resumo['gap']:>4} "
+              f"{resumo['eficiencia']:>9.1f}%\n")
+    return texto
+
+
+def custo_plano(plano: 'PlanoCorte', tipos: List[TipoBarra]) -> float:
+    """Custo das barras novas do plano (retalhos não custam nada)"""
+    preco = {comprimento: custo for comprimento, custo, _ in tipos}
+    return sum(custo_barra(t, preco[t]) for t, r in zip(plano.tamanhos, plano.retalho) if not r)
+
+
+def padroes_do_plano(plano: 'PlanoCorte', cortes_transporte: Optional[List[Dict]] = None) -> List[dict]:
+    """
+    Camada de padrões do plano: barras iguais (mesmo tamanho, origem e
+    peças) viram um padrão com a quantidade, para a serra cortar em lote.
+    Cada padrão tem 'pecas' (maior primeiro), 'quantidade', 'tamanho',
+    'retalho', 'usado' e 'sobra' (de cada barra, em cm), 'barras' (índices
+    no plano) e 'corte_transporte' (igual para todas as barras do padrão,
+    ou None). Na ordem em que aparecem no plano.
+    """
+    padroes = []
+    for (tamanho, retalho, pecas), indices in plano.padroes().items():
+        primeira = indices[0]
+        padroes.append({
+            'pecas': list(pecas),
+            'quantidade': len(indices),
+            'tamanho': tamanho,
+            'retalho': retalho,
+            'usado': plano.usado_barra(primeira),
+            'sobra': plano.sobra(primeira),
+            'barras': indices,
+            'corte_transporte': cortes_transporte[primeira] if cortes_transporte else None,
+        })
+    return padroes
+
+
+def faixas_barras(indices: List[int]) -> str:
+    """Índices de barra (a partir de 0) como números em faixas: [0, 1, 2, 5] -> '1-3, 6'"""
+    faixas = []
+    inicio = anterior = None
+    for i in indices:
+        if anterior is not None and i == anterior + 1:
+            anterior = i
+            continue
+        if inicio is not None:
+            faixas.append(f"{inicio + 1}-{anterior + 1}" if anterior > inicio else f"{inicio + 1}")
+        inicio = anterior = i
+    if inicio is not None:
+        faixas.append(f"{inicio + 1}-{anterior + 1}" if anterior > inicio else f"{inicio + 1}")
+    return ", ".join(faixas)
+
+
+def resultado_para_dict(nome: str, resultado: dict) -> dict:
+    """Converte (método, resultado) em dict serializável em JSON"""
+    plano = resultado['barras']
+    dados = dict(resultado)
+    dados['barras'] = plano.barras()
+    if plano.tem_retalhos or any(t != plano.tamanho_barra for t in plano.tamanhos):
+        dados['tamanhos'] = plano.tamanhos.tolist()
+        dados['retalhos'] = [bool(r) for r in plano.retalho]
+    dados['tamanho_barra'] = plano.tamanho_barra
+    dados['espessura_corte'] = plano.espessura_corte
+    dados['metodo'] = nome
+    return dados
+
+
+def resultado_de_dict(dados: dict) -> Tuple[str, dict]:
+    """Inverso de resultado_para_dict: retorna (método, resultado)"""
+    resultado = dict(dados)
+    nome = resultado.pop('metodo')
+    resultado['barras'] = PlanoCorte.de_barras(dados['barras'], resultado.pop('tamanho_barra'),
+                                               resultado.pop('espessura_corte'),
+                                               resultado.pop('tamanhos', None),
+                                               resultado.pop('retalhos', None))
+    return nome, resultado
+
+
+class CalculoCancelado(Exception):
+    """O callback de progresso do OtimizadorCorte pediu para parar"""
 
 
 class OtimizadorCorte:
     """Classe principal com algoritmos de otimização"""
 
+    MAX_CACHE_TRANSPORTE = 1024
+
+    # De quanto em quanto tempo (s) a espera pelos processos do portfólio
+    # acorda para avisar o progresso e ver se o cálculo foi cancelado
+    INTERVALO_AVISO = 0.1
+
+    # Estoque variável: a partir de quantas barras de material restante a
+    # escolha do tipo de barra passa a olhar o plano até o fim
+    BARRAS_PILOTO = 12
+
+    # Métodos comparados em resolver(), do mais barato para o mais caro
+    METODOS = [
+        ('First Fit Decreasing', 'calcular_cortes_demanda'),
+        ('Best Fit Decreasing', 'calcular_cortes_best_fit_indexado'),
+        ('Otimizado p/ Maiores Sobras', 'otimizar_para_maiores_sobras'),
+        ('Geração de Colunas (LP)', 'calcular_cortes_geracao_colunas'),
+    ]
+
     def __init__(self, tamanho_barra: float = 600, espessura_corte: float = 0,
-                 limite_transporte: float = None):
+                 limite_transporte: float = None, cache: CacheCortes = None,
+                 instrumentacao: Optional[Instrumentacao] = None,
+                 progresso: Optional[Callable[[dict], bool]] = None):
         self.tamanho_barra = tamanho_barra
         self.espessura_corte = espessura_corte
         self.limite_transporte = limite_transporte  # Ex: 300cm para Spin
-
+        self.cache = cache  # Pedidos repetidos saem do cache em resolver()
+        self.instrumentacao = instrumentacao  # Tempos e contadores; None = desligado
+        # progresso(dict) recebe 'etapa', 'feitos' e 'total' durante os
+        # cálculos longos; se retornar False o cálculo para com CalculoCancelado
+        self.progresso = progresso
+        # Divisão para transporte por padrão de barra (LRU), ver cortes_transporte()
+        self._cache_transporte = OrderedDict()
+
+    # Os algoritmos trabalham em unidades inteiras (ver para_unidades): as
+    # medidas em cm são convertidas uma vez na entrada de cada método e as
+    # comparações de "cabe / não cabe" são exatas
+
+    @property
+    def capacidade(self) -> int:
+        """tamanho_barra em unidades"""
+        return para_unidades(self.tamanho_barra)
+
+    @property
+    def corte(self) -> int:
+        """espessura_corte em unidades"""
+        return para_unidades(self.espessura_corte)
+
+    def _avisar(self, etapa: str, feitos: int, total: int):
+        """Passa o progresso para self.progresso; CalculoCancelado se ele retornar False"""
+        if self.progresso is not None and self.progresso(
+                {'etapa': etapa, 'feitos': feitos, 'total': total}) is False:
+            raise CalculoCancelado(etapa)
+
+    def _concluidos(self, futuros: Iterable, prazo: float, etapa: str, feitos: int, total: int):
+        """
+        Como as_completed até o prazo (time.monotonic), mas acorda a cada
+        INTERVALO_AVISO para chamar _avisar; no fim do prazo só para de gerar.
+        """
+        pendentes = set(futuros)
+        while pendentes:
+            self._avisar(etapa, feitos, total)
+            restante = prazo - time.monotonic()
+            if restante <= 0:
+                return
+            prontos, pendentes = wait(pendentes, timeout=min(restante, self.INTERVALO_AVISO),
+                                      return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                feitos += 1
+                yield futuro
+
+    def _pesos(self, medidas: Iterable[float]) -> Dict[float, int]:
+        """Espaço de cada medida na barra, em unidades: peça + um corte"""
+        corte = self.corte
+        return {medida: para_unidades(medida) + corte for medida in set(medidas)}
+
+    @_instrumentado
     def calcular_cortes_greedy(self, pecas: List[float]) -> List[List[float]]:
         """
         Algoritmo guloso: First Fit Decreasing (FFD)
         Coloca as maiores peças primeiro em cada barra
         """
+        capacidade, pesos = self.capacidade, self._pesos(pecas)
         pecas_ordenadas = sorted(pecas, reverse=True)
         barras = []
+        usados = []  # espaço usado de cada barra, em unidades
 
+        varridas = 0
         for peca in pecas_ordenadas:
+            espaco_necessario = pesos[peca]
             colocada = False
-            for i, barra in enumerate(barras):
-                espaco_usado = sum(barra) + len(barra) * self.espessura_corte
-                espaco_necessario = peca + self.espessura_corte
-                if espaco_usado + espaco_necessario <= self.tamanho_barra:
+            for i, espaco_usado in enumerate(usados):
+                if espaco_usado + espaco_necessario <= capacidade:
                     barras[i].append(peca)
+                    usados[i] += espaco_necessario
                     colocada = True
                     break
 
-            if not colocada:
+            if colocada:
+                varridas += i + 1
+            else:
+                varridas += len(usados)
                 barras.append([peca])
+                usados.append(espaco_necessario)
 
+        if self.instrumentacao is not None:
+            self.instrumentacao.contar(barras_varridas=varridas, encaixes_testados=varridas)
         return barras
 
+    @_instrumentado
+    def calcular_cortes_greedy_indexado(self, pecas: List[float]) -> List[List[float]]:
+        """
+        First Fit Decreasing em O(n log n): o uso de cada barra fica numa árvore
+        de segmentos, então "primeira barra onde a peça cabe" sai em O(log m)
+        sem varrer nem somar as barras. Mesmo plano que calcular_cortes_greedy.
+        """
+        capacidade, pesos = self.capacidade, self._pesos(pecas)
+        pecas_ordenadas = sorted(pecas, reverse=True)
+        barras = []
+        usados = []  # espaço usado de cada barra, em unidades
+        arvore = _ArvoreUsoMinimo(len(pecas_ordenadas))
+
+        for peca in pecas_ordenadas:
+            espaco_necessario = pesos[peca]
+            i = arvore.primeira_que_cabe(espaco_necessario, capacidade)
+
+            if i >= 0:
+                barras[i].append(peca)
+                usados[i] += espaco_necessario
+            else:
+                i = len(barras)
+                barras.append([peca])
+                usados.append(espaco_necessario)
+
+            arvore.atualizar(i, usados[i])
+
+        if self.instrumentacao is not None:
+            self.instrumentacao.contar(buscas_indice=len(pecas_ordenadas))
+        return barras
+
+    @_instrumentado
+    def calcular_cortes_demanda(self, demanda: Demanda) -> List[List[float]]:
+        """
+        First Fit Decreasing trabalhando direto com pares (medida, quantidade).
+        Peças iguais são colocadas em bloco: calcula quantas cópias cabem na
+        barra e repete barras idênticas como um grupo (padrão x multiplicidade).
+        O tempo cresce com o número de medidas distintas, não com o total de peças.
+        Gera o mesmo plano que calcular_cortes_greedy.
+        """
+        itens = demanda.items() if isinstance(demanda, dict) else demanda
+        totais = Counter()
+        for medida, qtd in itens:
+            if qtd > 0:
+                totais[medida] += qtd
+        capacidade, pesos = self.capacidade, self._pesos(totais)
+
+        # Cada grupo: [padrão (lista de (medida, cópias)), nº de barras, espaço usado]
+        grupos = []
+        varridos = 0
+        for medida, qtd in sorted(totais.items(), reverse=True):
+            espaco_peca = pesos[medida]
+            novos_grupos = []
+            varridos += len(grupos)
+
+            for padrao, mult, usado in grupos:
+                copias = self._copias_que_cabem(usado, espaco_peca, qtd, capacidade) if qtd else 0
+                if copias == 0:
+                    novos_grupos.append([padrao, mult, usado])
+                    continue
+
+                # Barras do grupo recebem 'copias' peças cada, em ordem
+                cheias = min(mult, qtd // copias)
+                if cheias:
+                    novos_grupos.append([padrao + [(medida, copias)], cheias,
+                                         usado + copias * espaco_peca])
+                    qtd -= cheias * copias
+                    mult -= cheias
+
+                # Uma barra recebe o resto, as demais ficam como estavam
+                if mult and qtd:
+                    novos_grupos.append([padrao + [(medida, qtd)], 1, usado + qtd * espaco_peca])
+                    qtd = 0
+                    mult -= 1
+                if mult:
+                    novos_grupos.append([padrao, mult, usado])
+
+            # O que sobrou abre barras novas
+            if qtd:
+                por_barra = max(1, self._copias_que_cabem(0, espaco_peca, qtd, capacidade))
+                cheias = qtd // por_barra
+                if cheias:
+                    novos_grupos.append([[(medida, por_barra)], cheias, por_barra * espaco_peca])
+                resto = qtd - cheias * por_barra
+                if resto:
+                    novos_grupos.append([[(medida, resto)], 1, resto * espaco_peca])
+
+            grupos = novos_grupos
+
+        if self.instrumentacao is not None:
+            self.instrumentacao.contar(grupos_varridos=varridos, encaixes_testados=varridos)
+
+        barras = []
+        for padrao, mult, _ in grupos:
+            pecas_barra = expandir_demanda(padrao)
+            barras.extend(list(pecas_barra) for _ in range(mult))
+        return barras
+
+    @staticmethod
+    def _copias_que_cabem(usado: int, espaco_peca: int, limite: int, capacidade: int) -> int:
+        """Quantas peças de espaco_peca cabem numa barra com 'usado' ocupado (em unidades)"""
+        if espaco_peca <= 0:
+            return limite
+        return min(limite, max(0, (capacidade - usado) // espaco_peca))
+
+    @_instrumentado
     def calcular_cortes_best_fit(self, pecas: List[float]) -> List[List[float]]:
         """
         Best Fit Decreasing: coloca cada peça na barra onde sobra menos espaço
         """
+        capacidade, pesos = self.capacidade, self._pesos(pecas)
         pecas_ordenadas = sorted(pecas, reverse=True)
         barras = []
+        usados = []  # espaço usado de cada barra, em unidades
+        varridas = 0
 
         for peca in pecas_ordenadas:
+            espaco_necessario = pesos[peca]
             melhor_barra = -1
-            menor_sobra = self.tamanho_barra + 1
+            menor_sobra = capacidade + 1
 
-            for i, barra in enumerate(barras):
-                espaco_usado = sum(barra) + len(barra) * self.espessura_corte
-                espaco_necessario = peca + self.espessura_corte
-                sobra = self.tamanho_barra - espaco_usado - espaco_necessario
+            for i, espaco_usado in enumerate(usados):
+                sobra = capacidade - espaco_usado - espaco_necessario
                 if sobra >= 0 and sobra < menor_sobra:
                     melhor_barra = i
                     menor_sobra = sobra
 
+            varridas += len(usados)
             if melhor_barra >= 0:
                 barras[melhor_barra].append(peca)
+                usados[melhor_barra] += espaco_necessario
             else:
                 barras.append([peca])
+                usados.append(espaco_necessario)
 
+        if self.instrumentacao is not None:
+            self.instrumentacao.contar(barras_varridas=varridas, encaixes_testados=varridas)
         return barras
 
-    def otimizar_para_maiores_sobras(self, pecas: List[float]) -> List[List[float]]:
+    @_instrumentado
+    def calcular_cortes_best_fit_indexado(self, pecas: List[float]) -> List[List[float]]:
         """
-        Tenta agrupar peças de forma que as sobras sejam as maiores possíveis
+        Best Fit Decreasing em O(n log n): as barras abertas ficam num índice
+        ordenado pelo espaço livre e cada barra guarda o próprio uso, então a
+        barra mais justa é achada por bisseção em vez de varrer todas.
+        Gera exatamente o mesmo plano que calcular_cortes_best_fit.
         """
+        capacidade, pesos = self.capacidade, self._pesos(pecas)
         pecas_ordenadas = sorted(pecas, reverse=True)
         barras = []
-        pecas_restantes = pecas_ordenadas.copy()
-
-        while pecas_restantes:
-            melhor_combo = None
-            melhor_uso = 0
-
-            for i, peca in enumerate(pecas_restantes):
-                combo = [peca]
-                uso = peca + self.espessura_corte
-                restantes_temp = pecas_restantes[:i] + pecas_restantes[i+1:]
-
-                for p in restantes_temp:
-                    novo_uso = uso + p + self.espessura_corte
-                    if novo_uso <= self.tamanho_barra:
-                        combo.append(p)
-                        uso = novo_uso
-
-                if uso > melhor_uso:
-                    melhor_uso = uso
-                    melhor_combo = combo
-
-            if melhor_combo:
-                barras.append(melhor_combo)
-                for p in melhor_combo:
-                    pecas_restantes.remove(p)
+        residuos = []  # espaço livre de cada barra, em unidades
+        indice = _IndiceResiduos()
+
+        for peca in pecas_ordenadas:
+            espaco_necessario = pesos[peca]
+            pos = indice.posicao_minima(espaco_necessario)
+
+            if pos < len(indice):
+                # Em empate de residual o índice já dá a barra de menor número,
+                # como no método original
+                residuo, melhor_barra = indice.chave(pos)
+                indice.remover(residuo, melhor_barra)
+                barras[melhor_barra].append(peca)
+                residuos[melhor_barra] -= espaco_necessario
             else:
+                melhor_barra = len(barras)
+                barras.append([peca])
+                residuos.append(capacidade - espaco_necessario)
+
+            indice.inserir(residuos[melhor_barra], melhor_barra)
+
+        if self.instrumentacao is not None:
+            self.instrumentacao.contar(buscas_indice=len(pecas_ordenadas))
+        return barras
+
+    @_instrumentado
+    def otimizar_para_maiores_sobras(self, pecas: List[float]) -> List[List[float]]:
+        """
+        Enche cada barra com o subconjunto de peças de maior uso possível,
+        deixando as sobras concentradas em poucas barras grandes.
+        O subconjunto sai de uma soma de subconjuntos em bitset (inteiro do
+        Python) sobre medidas inteiras, já contando a espessura de cada corte.
+        """
+        capacidade, corte = self.capacidade, self.corte
+        restantes = Counter(pecas)
+        barras = []
+
+        # Peça que não cabe sozinha vai numa barra própria, como nos outros métodos
+        for medida in sorted(restantes, reverse=True):
+            if para_unidades(medida) + corte > capacidade:
+                barras.extend([medida] for _ in range(restantes.pop(medida)))
+
+        total = len(pecas)
+        while restantes:
+            self._avisar('Maiores sobras', total - sum(restantes.values()), total)
+            # A maior peça restante sempre entra (ela precisa ir para alguma barra);
+            # o resto do espaço recebe o subconjunto de maior uso
+            maior = max(restantes)
+            restantes[maior] -= 1
+            padrao = self._melhor_enchimento(+restantes, capacidade - para_unidades(maior) - corte, corte)
+            restantes[maior] += 1
+            padrao[maior] += 1
+            # Se o padrão ainda cabe nas peças restantes ele continua sendo o de
+            # maior uso, então é repetido de uma vez
+            repeticoes = min(restantes[medida] // qtd for medida, qtd in padrao.items())
+            pecas_barra = sorted(expandir_demanda(padrao), reverse=True)
+            barras.extend(list(pecas_barra) for _ in range(repeticoes))
+            for medida, qtd in padrao.items():
+                restantes[medida] -= qtd * repeticoes
+            restantes = +restantes
+
+        return barras
+
+    def _melhor_enchimento(self, restantes: Dict[float, int], capacidade: int,
+                           corte: int) -> Counter:
+        """
+        Subconjunto de maior uso (em unidades inteiras) que cabe em 'capacidade'.
+        Quantidades repetidas viram itens 1, 2, 4, ... cópias, então o custo
+        cresce com o log da quantidade de cada medida.
+        """
+        tabela = self._tabela_enchimento(restantes, capacidade, corte)
+        if self.instrumentacao is not None:
+            self.instrumentacao.contar(tabelas_enchimento=1, itens_enchimento=len(tabela[0]))
+        return self._reconstruir_enchimento(tabela, capacidade)
+
+    @staticmethod
+    def _tabela_enchimento(restantes: Dict[float, int], capacidade: int, corte: int,
+                           alvos: Optional[List[int]] = None) -> Tuple:
+        """
+        Somas alcançáveis (bitset) até 'capacidade' com as peças restantes,
+        guardando o bitset antes de cada item para a reconstrução. Uma tabela
+        feita para a maior capacidade serve para qualquer capacidade menor.
+        Os pesos são divididos pelo seu MDC (medidas em mm com corte de 3mm
+        viram passos de 1mm), o que encurta o bitset sem mudar o resultado.
+
+        Com 'alvos', as peças entram da maior para a menor e a tabela para
+        assim que todos os alvos têm enchimento exato (ou são menores que a
+        menor peça): com muitas medidas diferentes isso acontece cedo e as
+        peças menores nem são olhadas.
+        """
+        medidas = sorted(restantes.items(), reverse=alvos is not None)
+        passo = 0
+        for medida, _ in medidas:
+            passo = math.gcd(passo, para_unidades(medida) + corte)
+        passo = passo or 1
+        capacidade //= passo
+
+        itens = []  # (medida, cópias, peso)
+        for medida, qtd in medidas:
+            peso = (para_unidades(medida) + corte) // passo
+            qtd = min(qtd, capacidade // peso) if peso > 0 else qtd
+            bloco = 1
+            while qtd > 0:
+                copias = min(bloco, qtd)
+                itens.append((medida, copias, copias * peso))
+                qtd -= copias
+                bloco *= 2
+
+        mascara = (1 << (capacidade + 1)) - 1
+        exatos = 0
+        if alvos and itens:
+            menor = min(peso for _, copias, peso in itens if copias == 1)
+            exatos = sum(1 << (alvo // passo) for alvo in alvos if menor <= alvo // passo <= capacidade)
+        alcancavel = 1  # bit s ligado = soma s alcançável
+        historico = []
+        for n, (_, _, peso) in enumerate(itens):
+            if exatos and alcancavel & exatos == exatos:
+                itens = itens[:n]
+                break
+            historico.append(alcancavel)
+            alcancavel = (alcancavel | (alcancavel << peso)) & mascara
+        return itens, historico, alcancavel, passo
+
+    @staticmethod
+    def _reconstruir_enchimento(tabela: Tuple, capacidade: int) -> Counter:
+        """Padrão de maior uso que cabe em 'capacidade', a partir de _tabela_enchimento"""
+        itens, historico, alcancavel, passo = tabela
+        if capacidade < 0:
+            return Counter()
+        capacidade //= passo
+        alcancavel &= (1 << (capacidade + 1)) - 1
+
+        # Reconstrói da maior peça para a menor, colocando as maiores sempre que
+        # o restante ainda for alcançável com as menores
+        total = alcancavel.bit_length() - 1
+        padrao = Counter()
+        for (medida, copias, peso), antes in zip(reversed(itens), reversed(historico)):
+            if peso <= total and (antes >> (total - peso)) & 1:
+                padrao[medida] += copias
+                total -= peso
+        return padrao
+
+    @_instrumentado
+    def calcular_cortes_geracao_colunas(self, pecas: List[float]) -> Tuple[List[List[float]], Optional[float], bool]:
+        """
+        Geração de colunas (Gilmore-Gomory) para pedidos com muita repetição.
+        Resolve a relaxação linear gerando padrões de corte por uma mochila
+        (pricing) e arredonda para um plano inteiro: padrões usados floor(x)
+        vezes e o resto da demanda vai para otimizar_para_maiores_sobras.
+
+        Retorna (barras, limite_lp, lp_exato): limite_lp é um limite inferior
+        para o número de barras de qualquer plano; com lp_exato ele é o valor
+        da relaxação linear, senão é o limite de Farley (o LP não convergiu).
+        Sem NumPy retorna o plano de otimizar_para_maiores_sobras e limite_lp None.
+        """
+        if not TEM_NUMPY:
+            return self.otimizar_para_maiores_sobras(pecas), None, False
+        capacidade, corte = self.capacidade, self.corte
+        demanda = Counter(pecas)
+        barras = []
+
+        # Peça que não cabe sozinha vai numa barra própria, como nos outros métodos
+        for medida in sorted(demanda, reverse=True):
+            if para_unidades(medida) + corte > capacidade:
+                barras.extend([medida] for _ in range(demanda.pop(medida)))
+        if not demanda:
+            return barras, float(len(barras)), True
+
+        medidas = sorted(demanda, reverse=True)
+        quantidades = [demanda[m] for m in medidas]
+        pesos = [para_unidades(m) + corte for m in medidas]
+        limites = [min(q, capacidade // w) for q, w in zip(quantidades, pesos)]
+
+        homogeneos = []
+        for i in range(len(medidas)):
+            padrao = [0] * len(medidas)
+            padrao[i] = limites[i]
+            homogeneos.append(padrao)
+        mestre = _MestreCobertura(homogeneos, quantidades)
+
+        conhecidos = {tuple(p) for p in homogeneos}
+        while True:
+            self._avisar('Geração de colunas', len(conhecidos) - len(homogeneos), 0)
+            convergiu = mestre.otimizar()
+            # Só interessa padrão com custo reduzido negativo (valor dual > 1)
+            duais = [max(y, 0.0) for y in mestre.duais()]
+            valor, padrao = _mochila_limitada(duais, pesos, limites, capacidade)
+            if valor <= 1 + 1e-9 or tuple(padrao) in conhecidos:
+                break
+            conhecidos.add(tuple(padrao))
+            mestre.adicionar_coluna(padrao)
+        if self.instrumentacao is not None:
+            self.instrumentacao.contar(colunas_geradas=len(conhecidos) - len(homogeneos))
+
+        # Limite de Farley: com y >= 0 e o padrão que mais vale valendo 'valor',
+        # y/valor é dual viável e y·d/valor é limite inferior. Quando o simplex
+        # convergiu e o pricing não acha coluna que compense é o próprio valor
+        # do LP; se o laço parou antes (coluna repetida, simplex no limite de
+        # iterações) o valor do mestre não prova nada, mas este limite vale.
+        limite_lp = sum(y * d for y, d in zip(duais, quantidades)) / max(valor, 1.0) + len(barras)
+        lp_exato = convergiu and valor <= 1 + 1e-9
+
+        # Arredondamento: cada padrão floor(x) vezes, sem passar da demanda
+        restante = Counter(demanda)
+        x = mestre.solucao()
+        for j in sorted(range(len(x)), key=lambda j: -x[j]):
+            for _ in range(int(x[j] + 1e-9)):
+                barra = []
+                for i, qtd in enumerate(mestre.padroes[j]):
+                    usar = min(qtd, restante[medidas[i]])
+                    barra.extend([medidas[i]] * usar)
+                    restante[medidas[i]] -= usar
+                if not barra:
+                    break
+                barras.append(barra)
+
+        barras.extend(self.otimizar_para_maiores_sobras(expandir_demanda(+restante)))
+        return barras, limite_lp, lp_exato
+
+    @_instrumentado
+    def limites_inferiores(self, demanda: Demanda) -> Dict[str, int]:
+        """
+        Limites inferiores rápidos para o número de barras:
+        - l1: ceil(comprimento total / tamanho da barra)
+        - l2: limite L2 de Martello-Toth
+        Ambos contam a espessura do corte em cada peça. Peça que não cabe numa
+        barra conta como uma barra inteira.
+        """
+        capacidade, corte = self.capacidade, self.corte
+        itens = demanda.items() if isinstance(demanda, dict) else demanda
+        contagem = Counter()
+        for medida, qtd in itens:
+            if qtd > 0:
+                contagem[min(para_unidades(medida) + corte, capacidade)] += qtd
+        if not contagem or capacidade <= 0:
+            return {'l1': 0, 'l2': 0}
+
+        pesos = sorted(contagem)  # crescente
+        qtd_acum = [0]
+        soma_acum = [0]
+        for w in pesos:
+            qtd_acum.append(qtd_acum[-1] + contagem[w])
+            soma_acum.append(soma_acum[-1] + w * contagem[w])
+        total_qtd, total_soma = qtd_acum[-1], soma_acum[-1]
+
+        l1 = -(-total_soma // capacidade)
+
+        def faixa(minimo_exclusivo, maximo_inclusivo):
+            """(quantidade, soma) das peças com minimo < w <= maximo"""
+            a = bisect_left(pesos, minimo_exclusivo + 1)
+            b = bisect_left(pesos, maximo_inclusivo + 1)
+            return qtd_acum[b] - qtd_acum[a], soma_acum[b] - soma_acum[a]
+
+        # L2: para cada alfa, J1 = w > C-alfa, J2 = C/2 < w <= C-alfa, J3 = alfa <= w <= C/2
+        metade = capacidade // 2
+        l2 = 0
+        for alfa in [0] + [w for w in pesos if w <= metade]:
+            n1, _ = faixa(capacidade - alfa, capacidade)
+            n2, s2 = faixa(metade, capacidade - alfa)
+            _, s3 = faixa(alfa - 1, metade)
+            espaco_livre_j2 = n2 * capacidade - s2
+            extra = max(0, -(-(s3 - espaco_livre_j2) // capacidade))
+            l2 = max(l2, n1 + n2 + extra)
+
+        return {'l1': l1, 'l2': max(l1, l2) if total_qtd else 0}
+
+    def limite_inferior(self, demanda: Demanda) -> int:
+        """Maior dos limites inferiores rápidos (L1 e L2)"""
+        return max(self.limites_inferiores(demanda).values())
+
+    def executar_metodo(self, metodo: str, demanda: Demanda) -> Tuple[List[List[float]], Optional[float], bool]:
+        """Roda um dos METODOS pelo nome; retorna (barras, limite_lp ou None, lp_exato)"""
+        if metodo == 'calcular_cortes_demanda':
+            return self.calcular_cortes_demanda(demanda), None, False
+        resultado = getattr(self, metodo)(expandir_demanda(demanda))
+        if isinstance(resultado, tuple):
+            return resultado
+        return resultado, None, False
+
+    @_instrumentado
+    def resolver(self, demanda: Demanda) -> Tuple[str, dict]:
+        """
+        Compara os METODOS e retorna (nome, resultado) do melhor.
+        Calcula os limites inferiores antes e para assim que um método chega
+        neles, já que nenhum outro pode usar menos barras. O corte para
+        transporte só é calculado para o resultado escolhido.
+        Com self.cache, um pedido igual a um já resolvido volta direto do cache.
+        """
+        demanda = Counter(dict(demanda.items() if isinstance(demanda, dict) else demanda))
+        chave, salvo = self.consultar_cache(demanda)
+        if salvo is not None:
+            return salvo
+        limite = self.limite_inferior(demanda)
+        limite_lp, lp_exato = None, False
+
+        planos = []
+        for i, (nome, metodo) in enumerate(self.METODOS):
+            self._avisar('Comparando métodos', i, len(self.METODOS))
+            barras, lp, exato = self.executar_metodo(metodo, demanda)
+            if lp is not None:
+                limite_lp, lp_exato = lp, exato
+                limite = max(limite, math.ceil(lp - 1e-6))
+            planos.append((nome, barras))
+            if len(barras) <= limite:
                 break
 
+        return self._finalizar(planos, limite, limite_lp, lp_exato, chave)
+
+    @_instrumentado
+    def resolver_portfolio(self, demanda: Demanda, orcamento_s: float = 10.0,
+                           max_processos: Optional[int] = None) -> Tuple[str, dict]:
+        """
+        Como resolver(), mas roda os METODOS em paralelo num ProcessPoolExecutor
+        com um tempo máximo (orcamento_s). O que terminou dentro do prazo entra
+        na comparação; o que não começou é cancelado e o que está rodando para
+        sozinho no fim do prazo (ver _executar_metodo_processo). O primeiro
+        método (FFD, instantâneo) roda aqui mesmo, então sempre existe um
+        resultado. Se self.progresso cancelar, o retorno é imediato.
+        """
+        demanda = Counter(dict(demanda.items() if isinstance(demanda, dict) else demanda))
+        chave, salvo = self.consultar_cache(demanda)
+        if salvo is not None:
+            return salvo
+        limite = self.limite_inferior(demanda)
+        limite_lp, lp_exato = None, False
+        prazo = time.monotonic() + orcamento_s
+        prazo_processos = time.time() + orcamento_s
+
+        nome_base, metodo_base = self.METODOS[0]
+        self._avisar('Comparando métodos', 0, len(self.METODOS))
+        barras, _, _ = self.executar_metodo(metodo_base, demanda)
+        planos = [(nome_base, barras)]
+        if len(barras) <= limite or len(self.METODOS) == 1:
+            return self._finalizar(planos, limite, limite_lp, lp_exato, chave)
+
+        outros = self.METODOS[1:]
+        config = (self.tamanho_barra, self.espessura_corte, self.limite_transporte)
+        executor = ProcessPoolExecutor(max_workers=max_processos or min(len(outros), os.cpu_count() or 1))
+        try:
+            instrumentar = self.instrumentacao is not None
+            futuros = {executor.submit(_executar_metodo_processo, config, metodo, dict(demanda),
+                                       instrumentar, prazo_processos): nome
+                       for nome, metodo in outros}
+            for futuro in self._concluidos(futuros, prazo, 'Comparando métodos', 1, len(self.METODOS)):
+                resposta = futuro.result()
+                if resposta is None:
+                    continue
+                barras, lp, exato, medicoes = resposta
+                if medicoes is not None:
+                    self.instrumentacao.juntar(medicoes)
+                if lp is not None:
+                    limite_lp, lp_exato = lp, exato
+                    limite = max(limite, math.ceil(lp - 1e-6))
+                planos.append((futuros[futuro], barras))
+                if len(barras) <= limite:
+                    break
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return self._finalizar(planos, limite, limite_lp, lp_exato, chave)
+
+    @_instrumentado
+    def resolver_perfis(self, demandas: Dict[str, Demanda], orcamento_s: float = 10.0,
+                        max_processos: Optional[int] = None) -> dict:
+        """
+        Resolve um pedido com vários perfis (ver agrupar_por_perfil). Cada
+        perfil sai das suas próprias barras, então é um pedido separado, mas
+        todos dividem um só ProcessPoolExecutor: o FFD de cada perfil roda
+        aqui mesmo e os outros METODOS de todos os perfis viram tarefas no
+        pool (os métodos baratos primeiro, os perfis maiores antes), com o
+        mesmo tempo máximo de resolver_portfolio. Um perfil que chega no
+        limite inferior tem suas tarefas restantes canceladas. Perfis já
+        resolvidos antes saem do cache.
+
+        Retorna o resumo de resumir_perfis().
+        """
+        feitos = {}
+        estados = {}  # perfil -> [demanda, chave, limite, (limite_lp, lp_exato), planos]
+        nome_base, metodo_base = self.METODOS[0]
+        for perfil, demanda in demandas.items():
+            demanda = Counter(dict(demanda.items() if isinstance(demanda, dict) else demanda))
+            chave, salvo = self.consultar_cache(demanda)
+            if salvo is not None:
+                feitos[perfil] = salvo
+                continue
+            limite = self.limite_inferior(demanda)
+            barras, _, _ = self.executar_metodo(metodo_base, demanda)
+            estados[perfil] = [demanda, chave, limite, (None, False), [(nome_base, barras)]]
+
+        abertos = [perfil for perfil, estado in estados.items()
+                   if len(estado[4][0][1]) > estado[2]]
+        tarefas = sorted(((i, -sum(estados[perfil][0].values()), perfil, nome, metodo)
+                          for perfil in abertos
+                          for i, (nome, metodo) in enumerate(self.METODOS[1:])), key=lambda t: t[:2])
+        if tarefas:
+            prazo = time.monotonic() + orcamento_s
+            prazo_processos = time.time() + orcamento_s
+            config = (self.tamanho_barra, self.espessura_corte, self.limite_transporte)
+            executor = ProcessPoolExecutor(max_workers=max_processos or min(len(tarefas), os.cpu_count() or 1))
+            try:
+                instrumentar = self.instrumentacao is not None
+                futuros = {executor.submit(_executar_metodo_processo, config, metodo,
+                                           dict(estados[perfil][0]), instrumentar,
+                                           prazo_processos): (perfil, nome)
+                           for _, _, perfil, nome, metodo in tarefas}
+                for futuro in self._concluidos(futuros, prazo, 'Perfis', 0, len(futuros)):
+                    if futuro.cancelled() or futuro.result() is None:
+                        continue
+                    perfil, nome = futuros[futuro]
+                    estado = estados[perfil]
+                    barras, lp, exato, medicoes = futuro.result()
+                    if medicoes is not None:
+                        self.instrumentacao.juntar(medicoes)
+                    if lp is not None:
+                        estado[3] = (lp, exato)
+                        estado[2] = max(estado[2], math.ceil(lp - 1e-6))
+                    estado[4].append((nome, barras))
+                    if len(barras) <= estado[2]:
+                        for outro, (dono, _) in futuros.items():
+                            if dono == perfil:
+                                outro.cancel()
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        for perfil, (_, chave, limite, (limite_lp, lp_exato), planos) in estados.items():
+            feitos[perfil] = self._finalizar(planos, limite, limite_lp, lp_exato, chave)
+        return resumir_perfis(feitos)
+
+    def consultar_cache(self, demanda: Counter) -> Tuple[Optional[str], Optional[Tuple[str, dict]]]:
+        """Retorna (chave, (nome, resultado) salvo ou None); chave None sem cache"""
+        if self.cache is None:
+            return None, None
+        chave = chave_trabalho(self.tamanho_barra, self.espessura_corte,
+                               self.limite_transporte, demanda)
+        salvo = self.cache.obter(chave)
+        if salvo is None:
+            return chave, None
+        # O transporte é recalculado: é barato e acompanha mudanças no cálculo
+        nome, resultado = resultado_de_dict(salvo)
+        resultado.setdefault('lp_exato', False)  # entradas gravadas antes do campo existir
+        if self.limite_transporte:
+            resultado['cortes_transporte'] = self.cortes_transporte(resultado['barras'])
+        resultado['padroes'] = padroes_do_plano(resultado['barras'], resultado['cortes_transporte'])
+        return chave, (nome, resultado)
+
+    def _finalizar(self, planos: List[Tuple[str, List[List[float]]]], limite: int,
+                   limite_lp: Optional[float], lp_exato: bool, chave: Optional[str]) -> Tuple[str, dict]:
+        """
+        Escolhe o melhor plano, pontuando todos de uma vez com
+        pontuar_planos (mesmo critério de chave_selecao), e só ele passa
+        por analisar_resultado e pelo transporte; depois guarda no cache.
+        Sem NumPy a escolha é feita barra por barra, com o mesmo critério.
+        """
+        if TEM_NUMPY:
+            barras, pesos = codificar_planos([plano for _, plano in planos])
+            pontos = pontuar_planos(barras, pesos, self.capacidade, self.corte)
+            melhor_nome, melhor = planos[ordem_selecao(pontos)[0]]
+        else:
+            melhor_nome, melhor = min(planos, key=lambda plano: (
+                len(plano[1]), -max((self.calcular_sobra(b) for b in plano[1]), default=0)))
+        melhor = self.analisar_resultado(melhor, limite)
+        melhor['limite_lp'] = limite_lp
+        melhor['lp_exato'] = lp_exato
+        melhor['metodos_testados'] = [nome for nome, _ in planos]
+
+        if chave is not None:
+            self.cache.guardar(chave, resultado_para_dict(melhor_nome, melhor))
+        return melhor_nome, melhor
+
+    @_instrumentado
+    def preencher_retalhos(self, demanda: Demanda, estoque: EstoqueRetalhos,
+                           perfil: str = '') -> Tuple[List[Tuple[float, List[float]]], Counter]:
+        """
+        Coloca peças nos retalhos do estoque antes de abrir barras novas.
+        A maior peça restante vai no menor retalho onde cabe (best fit pelo
+        índice do estoque) e o resto do retalho é enchido como em
+        otimizar_para_maiores_sobras. Os retalhos usados são retirados do
+        estoque; use estoque.simulacao() para só planejar.
+
+        Retorna ([(comprimento do retalho, peças)], demanda que sobrou).
+        """
+        corte = self.corte
+        restantes = Counter(dict(demanda.items() if isinstance(demanda, dict) else demanda))
+        usados = []
+        for medida in sorted(restantes, reverse=True):
+            while restantes[medida] > 0:
+                achado = estoque.melhor_encaixe(perfil, medida + self.espessura_corte)
+                if achado is None:
+                    break  # nenhum retalho serve para esta medida; tenta as menores
+                id_retalho, comprimento = achado
+                estoque.retirar(id_retalho)
+                restantes[medida] -= 1
+                espaco = para_unidades(comprimento) - para_unidades(medida) - corte
+                padrao = self._melhor_enchimento(+restantes, max(espaco, 0), corte)
+                restantes -= padrao
+                padrao[medida] += 1
+                usados.append((comprimento, expandir_demanda(padrao)))
+        return usados, +restantes
+
+    @_instrumentado
+    def resolver_com_retalhos(self, demanda: Demanda, estoque: EstoqueRetalhos, perfil: str = '',
+                              orcamento_s: float = 10.0,
+                              tipos: Optional[List[TipoBarra]] = None) -> Tuple[str, dict]:
+        """
+        Usa primeiro os retalhos do estoque (preencher_retalhos) e resolve o
+        que faltar com barras novas (resolver_portfolio, ou
+        resolver_estoque_variavel se vierem 'tipos'). Só planeja: o
+        estoque não muda até estoque.dar_baixa(perfil, plano.comprimentos_retalhos(),
+        plano.sobras()). O limite inferior e o gap se referem às barras novas.
+        """
+        with estoque.simulacao():
+            usados, restantes = self.preencher_retalhos(demanda, estoque, perfil)
+
+        nome, limite, limite_lp, lp_exato, metodos = 'Só Retalhos', 0, None, False, []
+        novas = PlanoCorte(self.tamanho_barra, self.espessura_corte)
+        if restantes:
+            if tipos:
+                nome, novo = self.resolver_estoque_variavel(restantes, tipos)
+            else:
+                nome, novo = self.resolver_portfolio(restantes, orcamento_s)
+            limite, limite_lp, lp_exato = novo['limite_inferior'], novo['limite_lp'], novo['lp_exato']
+            metodos, novas = novo['metodos_testados'], novo['barras']
+
+        plano = PlanoCorte(self.tamanho_barra, self.espessura_corte)
+        for comprimento, pecas in usados:
+            plano.adicionar_barra(pecas, comprimento, retalho=True)
+        for i, barra in enumerate(novas):
+            plano.adicionar_barra(barra, novas.tamanho(i))
+
+        resultado = self.analisar_resultado(plano, len(usados) + limite)
+        resultado['limite_lp'] = limite_lp
+        resultado['lp_exato'] = lp_exato
+        resultado['metodos_testados'] = metodos
+        if tipos:
+            resultado['custo_total'] = custo_plano(plano, tipos)
+            resultado['custo_minimo'] = novo['custo_minimo'] if restantes else 0.0
+        if usados and len(novas):
+            nome = f"{nome} + Retalhos"
+        return nome, resultado
+
+    @_instrumentado
+    def calcular_cortes_estoque_variavel(self, pecas: List[float],
+                                         tipos: List[TipoBarra]) -> List[Tuple[float, List[float]]]:
+        """
+        Corte com barras de vários comprimentos e preços (TipoBarra).
+        Como em otimizar_para_maiores_sobras, a maior peça restante sempre
+        entra e o resto do espaço recebe o subconjunto de maior uso; aqui isso
+        é feito para cada tipo de barra e fica o de menor custo por cm usado.
+        Perto do fim (material restante de até BARRAS_PILOTO barras), cada
+        candidato é avaliado completando o resto do plano por essa mesma regra
+        (método piloto), para não gastar as barras baratas cedo e acabar numa
+        barra grande quase vazia. A tabela de somas alcançáveis é montada uma vez por padrão,
+        para o maior comprimento, e serve para todos os tipos.
+
+        Retorna [(comprimento da barra, peças)]. ValueError se alguma peça
+        não cabe nas barras disponíveis.
+        """
+        corte = self.corte
+        custos = {comprimento: custo_barra(comprimento, custo) for comprimento, custo, _ in tipos}
+        disponivel = {comprimento: qtd for comprimento, _, qtd in tipos}
+        restantes = Counter(pecas)
+        barras = []
+
+        maior_barra = max(para_unidades(c) for c in custos)
+        total = len(pecas)
+        while restantes:
+            self._avisar('Estoque variável', total - sum(restantes.values()), total)
+            candidatos = self._padroes_por_tipo(restantes, disponivel, custos, corte)
+            escolhido = candidatos[0]
+            material = sum((para_unidades(medida) + corte) * qtd for medida, qtd in restantes.items())
+            if len(candidatos) > 1 and material <= self.BARRAS_PILOTO * maior_barra:
+                melhor_custo = None
+                for candidato in candidatos:
+                    copia, disp = Counter(restantes), dict(disponivel)
+                    _, comprimento, padrao = candidato
+                    custo = self._aplicar_padrao(copia, disp, comprimento, padrao) * custos[comprimento]
+                    try:
+                        custo += self._completar_estoque_variavel(copia, disp, custos, corte)
+                    except ValueError:
+                        continue  # por esse caminho o estoque acaba antes das peças
+                    if melhor_custo is None or custo < melhor_custo - 1e-9:
+                        melhor_custo, escolhido = custo, candidato
+
+            _, comprimento, padrao = escolhido
+            repeticoes = self._aplicar_padrao(restantes, disponivel, comprimento, padrao)
+            pecas_barra = sorted(expandir_demanda(padrao), reverse=True)
+            barras.extend((comprimento, list(pecas_barra)) for _ in range(repeticoes))
+
         return barras
 
+    def _padroes_por_tipo(self, restantes: Counter, disponivel: Dict[float, Optional[int]],
+                          custos: Dict[float, float], corte: int) -> List[Tuple]:
+        """
+        Para cada tipo de barra ainda disponível: a maior peça restante mais o
+        subconjunto de maior uso. Retorna [(chave, comprimento, padrão)] do
+        menor custo por cm usado para o maior.
+        """
+        maior = max(restantes)
+        ocupa = para_unidades(maior) + corte
+        opcoes = [c for c in custos
+                  if ocupa <= para_unidades(c) and (disponivel[c] is None or disponivel[c] > 0)]
+        if not opcoes:
+            raise ValueError(f"Peça de {maior}cm não cabe em nenhuma barra disponível")
+
+        espacos = [para_unidades(c) - ocupa for c in opcoes]
+        restantes[maior] -= 1
+        tabela = self._tabela_enchimento(+restantes, max(espacos), corte, alvos=espacos)
+        restantes[maior] += 1
+        candidatos = []
+        for comprimento in opcoes:
+            padrao = self._reconstruir_enchimento(tabela, para_unidades(comprimento) - ocupa)
+            padrao[maior] += 1
+            usado = sum(para_unidades(medida) * qtd for medida, qtd in padrao.items())
+            candidatos.append(((custos[comprimento] / usado, -usado), comprimento, padrao))
+        candidatos.sort(key=lambda c: c[0])
+        return candidatos
+
+    @staticmethod
+    def _aplicar_padrao(restantes: Counter, disponivel: Dict[float, Optional[int]],
+                        comprimento: float, padrao: Counter) -> int:
+        """Corta o padrão quantas vezes ele couber nas peças e no estoque; retorna quantas"""
+        repeticoes = min(restantes[medida] // qtd for medida, qtd in padrao.items())
+        if disponivel[comprimento] is not None:
+            repeticoes = min(repeticoes, disponivel[comprimento])
+            disponivel[comprimento] -= repeticoes
+        for medida, qtd in padrao.items():
+            restantes[medida] -= qtd * repeticoes
+            if restantes[medida] <= 0:
+                del restantes[medida]
+        return repeticoes
+
+    def _completar_estoque_variavel(self, restantes: Counter, disponivel: Dict[float, Optional[int]],
+                                    custos: Dict[float, float], corte: int) -> float:
+        """Custo de terminar o plano sempre pelo menor custo por cm usado"""
+        custo = 0.0
+        while restantes:
+            _, comprimento, padrao = self._padroes_por_tipo(restantes, disponivel, custos, corte)[0]
+            custo += self._aplicar_padrao(restantes, disponivel, comprimento, padrao) * custos[comprimento]
+        return custo
+
+    def resolver_estoque_variavel(self, demanda: Demanda, tipos: List[TipoBarra]) -> Tuple[str, dict]:
+        """
+        (nome, resultado) de calcular_cortes_estoque_variavel. O resultado traz
+        também 'custo_total' e 'custo_minimo' (todo o material das peças pelo
+        menor preço por metro, um limite inferior para o custo). O limite
+        inferior em barras é o do maior comprimento.
+        """
+        demanda = Counter(dict(demanda.items() if isinstance(demanda, dict) else demanda))
+        plano = PlanoCorte(self.tamanho_barra, self.espessura_corte)
+        for comprimento, pecas in self.calcular_cortes_estoque_variavel(expandir_demanda(demanda), tipos):
+            plano.adicionar_barra(pecas, comprimento)
+
+        maior = OtimizadorCorte(max(c for c, _, _ in tipos), self.espessura_corte)
+        resultado = self.analisar_resultado(plano, maior.limite_inferior(demanda))
+        resultado['limite_lp'] = None
+        resultado['lp_exato'] = False
+        resultado['metodos_testados'] = ['Estoque Variável']
+        resultado['custo_total'] = custo_plano(plano, tipos)
+        material = sum(peso * demanda[medida] for medida, peso in self._pesos(demanda).items())
+        resultado['custo_minimo'] = custo_barra(material / UNIDADES_POR_CM, min(custo for _, custo, _ in tipos))
+        return 'Estoque Variável (menor custo por metro usado)', resultado
+
+    @_instrumentado
+    def melhorar_plano(self, barras: List[List[float]], segundos: float,
+                       progresso: Optional[Callable[[dict], bool]] = None,
+                       semente: Optional[int] = None) -> List[List[float]]:
+        """
+        Busca local "anytime" sobre um plano pronto, por até 'segundos'.
+        Alterna dois movimentos, ambos avaliados só nas barras que mudam:
+        - ruína e recriação: esvazia a barra mais vazia (de uma amostra) e mais
+          uma ou duas ao acaso, e recoloca as peças por best fit
+        - troca de peças entre duas barras
+        Só aceita movimentos que não pioram (menos barras, depois barras mais
+        cheias = soma dos quadrados do uso maior), então o plano atual é
+        sempre o melhor encontrado.
+
+        progresso(dict) recebe 'barras', 'maior_sobra', 'iteracoes' e 'tempo'
+        algumas vezes por segundo; se retornar False a busca para.
+        """
+        if not barras:
+            return []
+        aleatorio = random.Random(semente)
+        capacidade, corte = self.capacidade, self.corte
+
+        medidas = [p for barra in barras for p in barra]
+        pesos = [para_unidades(p) + corte for p in medidas]
+        conteudo = []  # peças (índices) de cada barra; barra esvaziada vira []
+        usado = []
+        indice = _IndiceResiduos()
+        k = 0
+        for barra in barras:
+            conteudo.append(list(range(k, k + len(barra))))
+            usado.append(sum(pesos[k:k + len(barra)]))
+            k += len(barra)
+        ativas = [b for b in range(len(conteudo)) if usado[b] <= capacidade]
+        for b in ativas:
+            indice.inserir(capacidade - usado[b], b)
+        # Barras com peça maior que a barra ficam de fora da busca
+        fixas = [b for b in range(len(conteudo)) if usado[b] > capacidade]
+        num_ativas = len(ativas)
+
+        def colocar(peca, b):
+            indice.remover(capacidade - usado[b], b)
+            conteudo[b].append(peca)
+            usado[b] += pesos[peca]
+            indice.inserir(capacidade - usado[b], b)
+
+        def retirar(peca, b):
+            indice.remover(capacidade - usado[b], b)
+            conteudo[b].remove(peca)
+            usado[b] -= pesos[peca]
+            indice.inserir(capacidade - usado[b], b)
+
+        def sortear_barra():
+            return ativas[aleatorio.randrange(len(ativas))]
+
+        def maior_sobra():
+            return max((capacidade - usado[b] for b in ativas if conteudo[b]), default=0) / UNIDADES_POR_CM
+
+        inicio = time.monotonic()
+        prazo = inicio + segundos
+        proximo_aviso = inicio
+        iteracoes = 0
+        while num_ativas > 1 and time.monotonic() < prazo:
+            iteracoes += 1
+            if aleatorio.random() < 0.3:
+                # Ruína: a mais vazia de uma amostra + 1 ou 2 barras ao acaso
+                amostra = [sortear_barra() for _ in range(4)]
+                alvo = min((b for b in amostra if conteudo[b]), key=lambda b: usado[b], default=None)
+                if alvo is None:
+                    continue
+                arruinadas = {alvo}
+                for _ in range(aleatorio.randint(1, 2)):
+                    b = sortear_barra()
+                    if conteudo[b]:
+                        arruinadas.add(b)
+                antes = {b: list(conteudo[b]) for b in arruinadas}
+                quadrados_antes = sum(usado[b] ** 2 for b in arruinadas)
+                soltas = []
+                for b in arruinadas:
+                    indice.remover(capacidade - usado[b], b)
+                    soltas.extend(conteudo[b])
+                    conteudo[b] = []
+                    usado[b] = 0
+
+                # Recriação: best fit nas outras barras, reabrindo as arruinadas
+                # só se precisar
+                colocadas = []
+                reabertas = []
+                recolocadas = 0  # uma peça em barra reaberta também pode estar em 'colocadas'
+                livres = sorted(arruinadas, key=lambda b: b != alvo)
+                for peca in sorted(soltas, key=lambda i: -pesos[i]):
+                    pos = indice.posicao_minima(pesos[peca])
+                    if pos < len(indice):
+                        _, b = indice.chave(pos)
+                        colocar(peca, b)
+                        colocadas.append((peca, b))
+                    elif livres:
+                        b = livres.pop()
+                        reabertas.append(b)
+                        conteudo[b].append(peca)
+                        usado[b] = pesos[peca]
+                        indice.inserir(capacidade - usado[b], b)
+                    else:
+                        break
+                    recolocadas += 1
+
+                tocadas = {b for _, b in colocadas}
+                quadrados_depois = sum(usado[b] ** 2 for b in tocadas | arruinadas)
+                quadrados_antes += sum((usado[b] - sum(pesos[p] for p, bb in colocadas if bb == b)) ** 2
+                                       for b in tocadas - arruinadas)
+                fechadas = len(arruinadas) - len(reabertas)
+                completo = recolocadas == len(soltas)
+                if completo and (fechadas > 0 or quadrados_depois >= quadrados_antes):
+                    num_ativas -= fechadas
+                    for b in arruinadas:
+                        if not conteudo[b]:
+                            ativas.remove(b)
+                else:
+                    # Desfaz
+                    for peca, b in reversed(colocadas):
+                        retirar(peca, b)
+                    for b in reabertas:
+                        indice.remover(capacidade - usado[b], b)
+                    for b, pecas_b in antes.items():
+                        conteudo[b] = pecas_b
+                        usado[b] = sum(pesos[p] for p in pecas_b)
+                        indice.inserir(capacidade - usado[b], b)
+            else:
+                # Troca: peça i da barra a com peça j da barra b
+                a, b = sortear_barra(), sortear_barra()
+                if a == b or not conteudo[a] or not conteudo[b]:
+                    continue
+                i = conteudo[a][aleatorio.randrange(len(conteudo[a]))]
+                j = conteudo[b][aleatorio.randrange(len(conteudo[b]))]
+                diferenca = pesos[j] - pesos[i]
+                if diferenca == 0:
+                    continue
+                novo_a, novo_b = usado[a] + diferenca, usado[b] - diferenca
+                if novo_a > capacidade or novo_b > capacidade:
+                    continue
+                if novo_a ** 2 + novo_b ** 2 < usado[a] ** 2 + usado[b] ** 2:
+                    continue
+                retirar(i, a)
+                retirar(j, b)
+                colocar(j, a)
+                colocar(i, b)
+
+            agora = time.monotonic()
+            if progresso is not None and agora >= proximo_aviso:
+                proximo_aviso = agora + 0.2
+                continuar = progresso({'barras': num_ativas + len(fixas), 'maior_sobra': maior_sobra(),
+                                       'iteracoes': iteracoes, 'tempo': agora - inicio})
+                if continuar is False:
+                    break
+
+        if progresso is not None:
+            progresso({'barras': num_ativas + len(fixas), 'maior_sobra': maior_sobra(),
+                       'iteracoes': iteracoes, 'tempo': time.monotonic() - inicio})
+        if self.instrumentacao is not None:
+            self.instrumentacao.contar(iteracoes_busca_local=iteracoes)
+        return [[medidas[i] for i in conteudo[b]] for b in fixas + ativas if conteudo[b]]
+
     def calcular_sobra(self, barra: List[float]) -> float:
         """Calcula sobra considerando espessura do corte"""
-        if not barra:
-            return self.tamanho_barra
-        usado = sum(barra) + len(barra) * self.espessura_corte
-        return self.tamanho_barra - usado
+        corte = self.corte
+        usado = sum(para_unidades(p) + corte for p in barra)
+        return (self.capacidade - usado) / UNIDADES_POR_CM
 
-    def calcular_corte_transporte(self, barra: List[float]) -> Dict:
+    @_instrumentado
+    def calcular_corte_transporte(self, barra: List[float], tamanho: Optional[float] = None) -> Dict:
         """
         Calcula onde cortar a barra de 600cm para transporte no carro.
-        Objetivo: dividir em pedaços <= limite_transporte mantendo a sobra grande.
+        Objetivo: dividir em pedaços <= limite_transporte mantendo a sobra inteira
+        num pedaço só. Se nenhuma divisão cabe, fica a de menor excesso.
+
+        A divisão sai de uma soma de subconjuntos em bitset sobre medidas
+        inteiras (cada peça já com a espessura do corte), então barras com
+        muitas peças pequenas não explodem como a enumeração de 2^n grupos.
+        Barra maior que 2x o limite é dividida em 3 ou mais pedaços.
+        'tamanho' é o comprimento da barra quando não é tamanho_barra (retalho).
 
         Retorna dict com:
-        - ponto_corte: onde dar o corte na barra original
-        - pedaco_1: lista de peças que ficam no pedaço 1
-        - pedaco_2: lista de peças que ficam no pedaço 2
-        - tamanho_pedaco_1: tamanho do pedaço 1 após o corte
-        - tamanho_pedaco_2: tamanho do pedaço 2 após o corte
-        - sobra_fica_em: em qual pedaço fica a sobra
+        - pedacos: lista de {'pecas', 'tamanho', 'tem_sobra'}, a partir da ponta
+        - pontos_corte: onde dar cada corte, medido da ponta
+        - ponto_corte: o primeiro corte
+        - sobra_fica_em: em qual pedaço (1, 2, ...) fica a sobra
+        - pedaco_1 / pedaco_2 / tamanho_pedaco_1 / tamanho_pedaco_2: só na
+          divisão em dois pedaços
         """
         if not self.limite_transporte:
             return None
-
-        # Ordena peças por tamanho (maior primeiro)
-        pecas_ordenadas = sorted(barra, reverse=True)
-
-        # Calcula o uso total e sobra
-        uso_total = sum(barra) + len(barra) * self.espessura_corte
-        sobra = self.tamanho_barra - uso_total
+        if tamanho is None:
+            tamanho = self.tamanho_barra
 
         # IMPORTANTE: A barra inteira (600cm) precisa ser transportada!
         # Mesmo que as peças sejam pequenas, a sobra também vai no carro.
         # Só não precisa cortar se a BARRA INTEIRA couber no limite.
-        if self.tamanho_barra <= self.limite_transporte:
+        corte = self.corte
+        limite = para_unidades(self.limite_transporte)
+        if para_unidades(tamanho) <= limite:
             return {
                 'precisa_corte': False,
-                'motivo': f'Barra inteira cabe no limite ({self.tamanho_barra}cm <= {self.limite_transporte}cm)',
-                'pedaco_unico': self.tamanho_barra
+                'motivo': f'Barra inteira cabe no limite ({tamanho}cm <= {self.limite_transporte}cm)',
+                'pedaco_unico': tamanho
             }
 
-        # Estratégia: agrupa peças em dois pedaços, tentando:
-        # 1. Primeiro: encontrar divisão que cabe no limite
-        # 2. Se não encontrar: encontrar a melhor divisão possível (mesmo passando do limite)
-        # Em ambos os casos, maximiza a sobra em um dos pedaços
-
-        melhor_divisao_dentro_limite = None
-        melhor_divisao_geral = None
-        melhor_score_limite = -1  # Score para divisões dentro do limite
-        melhor_score_geral = float('inf')  # Score para melhor divisão geral (menor excesso)
-
-        # Gera todas as possíveis divisões das peças em dois grupos
-        n = len(pecas_ordenadas)
-
-        for mask in range(1, 2**n):  # Todas combinações exceto vazio
-            grupo1 = []
-            grupo2 = []
-
-            for i in range(n):
-                if mask & (1 << i):
-                    grupo1.append(pecas_ordenadas[i])
-                else:
-                    grupo2.append(pecas_ordenadas[i])
-
-            if not grupo1 or not grupo2:
-                continue
-
-            # Calcula tamanho de cada pedaço (peças + cortes entre elas)
-            tam_grupo1 = sum(grupo1) + len(grupo1) * self.espessura_corte
-            tam_grupo2 = sum(grupo2) + len(grupo2) * self.espessura_corte
+        pesos = [para_unidades(p) + corte for p in barra]
+        sobra = para_unidades(tamanho) - sum(pesos)
+        if len(barra) < 2:
+            # Uma peça só não tem o que dividir: corte no meio, ou logo depois
+            # da peça se ela passar do meio, e o segundo pedaço é só sobra
+            primeiro = max(sum(pesos) + corte, (para_unidades(tamanho) + corte) // 2)
+            tamanhos = [primeiro, para_unidades(tamanho) + corte - primeiro]
+            melhor = (max(0, max(tamanhos) - limite), [list(range(len(barra))), []], tamanhos)
+            return self._montar_divisao(barra, sobra, *melhor)
+
+        # Dois pedaços é o corte original. Barra maior que 2x o limite tenta
+        # também 3 ou mais, a partir do mínimo que pode caber: cada pedaço sem
+        # a sobra leva o corte de transporte, então o total é
+        # tamanho da barra + (partes - 1) * corte
+        opcoes = [2]
+        if para_unidades(tamanho) > 2 * limite:
+            minimo = 3
+            while minimo < len(barra) and minimo * limite < para_unidades(tamanho) + (minimo - 1) * corte:
+                minimo += 1
+            opcoes.extend(range(minimo, len(barra) + 1))
+
+        melhor = None
+        divisoes = buscas = 0
+        for partes in opcoes:
+            for encher in (False, True):
+                grupos = self._dividir_em_pedacos(pesos, sobra, corte, limite, partes, encher)
+                divisoes += 1
+                buscas += len(grupos) - 1  # uma soma de subconjuntos por pedaço separado
+                tamanhos = [sum(pesos[i] for i in g) + corte for g in grupos[:-1]]
+                tamanhos.append(sum(pesos[i] for i in grupos[-1]) + sobra)
+                excesso = max(0, max(tamanhos) - limite)
+                if melhor is None or excesso < melhor[0]:
+                    melhor = (excesso, grupos, tamanhos)
+                if partes == 2:
+                    break  # com dois pedaços a divisão já é exata
+            if melhor[0] == 0:
+                break
 
-            # Testa as duas opções de onde colocar a sobra
-            for sobra_em in [1, 2]:
-                if sobra_em == 1:
-                    tam_pedaco1 = tam_grupo1 + sobra
-                    tam_pedaco2 = tam_grupo2 + self.espessura_corte
-                    ponto = tam_grupo2 + self.espessura_corte
-                else:
-                    tam_pedaco1 = tam_grupo1 + self.espessura_corte
-                    tam_pedaco2 = tam_grupo2 + sobra
-                    ponto = tam_grupo1 + self.espessura_corte
-
-                # Calcula o maior pedaço (o que importa pro transporte)
-                maior_pedaco = max(tam_pedaco1, tam_pedaco2)
-                excesso = max(0, maior_pedaco - self.limite_transporte)
-
-                divisao = {
-                    'precisa_corte': True,
-                    'pedaco_1': grupo1.copy(),
-                    'pedaco_2': grupo2.copy(),
-                    'tamanho_pedaco_1': tam_pedaco1,
-                    'tamanho_pedaco_2': tam_pedaco2,
-                    'sobra_fica_em': sobra_em,
-                    'sobra': sobra,
-                    'ponto_corte': ponto,
-                    'excesso': excesso
-                }
-
-                # Se cabe no limite, guarda como melhor dentro do limite
-                if tam_pedaco1 <= self.limite_transporte and tam_pedaco2 <= self.limite_transporte:
-                    if sobra > melhor_score_limite:
-                        melhor_score_limite = sobra
-                        melhor_divisao_dentro_limite = divisao.copy()
-                        melhor_divisao_dentro_limite['cabe_no_limite'] = True
-
-                # Guarda a melhor divisão geral (menor excesso, depois maior sobra)
-                # Score: (excesso, -sobra) - menor excesso é melhor, depois maior sobra
-                score_atual = (excesso, -sobra)
-                score_melhor = (melhor_score_geral, float('inf'))
-                if melhor_divisao_geral:
-                    score_melhor = (melhor_divisao_geral.get('excesso', float('inf')), -melhor_divisao_geral.get('sobra', 0))
-
-                if score_atual < score_melhor:
-                    melhor_score_geral = excesso
-                    melhor_divisao_geral = divisao.copy()
-                    melhor_divisao_geral['cabe_no_limite'] = (excesso == 0)
-
-        # Retorna a divisão dentro do limite se existir, senão a melhor geral
-        if melhor_divisao_dentro_limite:
-            return melhor_divisao_dentro_limite
-
-        if melhor_divisao_geral:
-            return melhor_divisao_geral
-
-        # Fallback: corte no meio (não deveria chegar aqui)
-        return {
+        if self.instrumentacao is not None:
+            self.instrumentacao.contar(transporte_divisoes=divisoes, transporte_subconjuntos=buscas)
+        return self._montar_divisao(barra, sobra, *melhor)
+
+    @staticmethod
+    def _montar_divisao(barra: List[float], sobra: int, excesso: int, grupos: List[List[int]],
+                        tamanhos: List[int]) -> Dict:
+        """Dict de calcular_corte_transporte a partir dos grupos de peças e dos tamanhos (em unidades)"""
+        pedacos = [{
+            'pecas': sorted((barra[i] for i in grupo), reverse=True),
+            'tamanho': tamanho / UNIDADES_POR_CM,
+            'tem_sobra': j == len(grupos) - 1,
+        } for j, (grupo, tamanho) in enumerate(zip(grupos, tamanhos))]
+        pontos, posicao = [], 0
+        for tamanho in tamanhos[:-1]:
+            posicao += tamanho
+            pontos.append(posicao / UNIDADES_POR_CM)
+
+        divisao = {
             'precisa_corte': True,
-            'ponto_corte': self.tamanho_barra / 2,
-            'tamanho_pedaco_1': self.tamanho_barra / 2,
-            'tamanho_pedaco_2': self.tamanho_barra / 2 - self.espessura_corte,
-            'excesso': max(0, self.tamanho_barra / 2 - self.limite_transporte),
-            'cabe_no_limite': False
+            'pedacos': pedacos,
+            'pontos_corte': pontos,
+            'ponto_corte': pontos[0],
+            'sobra_fica_em': len(pedacos),
+            'sobra': sobra / UNIDADES_POR_CM,
+            'excesso': excesso / UNIDADES_POR_CM,
+            'cabe_no_limite': excesso == 0,
         }
+        if len(pedacos) == 2:
+            divisao.update({
+                'pedaco_1': pedacos[0]['pecas'],
+                'pedaco_2': pedacos[1]['pecas'],
+                'tamanho_pedaco_1': pedacos[0]['tamanho'],
+                'tamanho_pedaco_2': pedacos[1]['tamanho'],
+            })
+        return divisao
+
+    @staticmethod
+    def _dividir_em_pedacos(pesos: List[int], sobra: int, corte: int, limite: int,
+                            partes: int, encher: bool = False) -> List[List[int]]:
+        """
+        Divide os índices de 'pesos' em até 'partes' grupos não vazios; o último
+        grupo é o que leva a sobra. Os primeiros pedaços saem um a um o mais
+        perto possível da média do que falta dividir (ou, com encher=True, o
+        mais cheios possível sem passar do limite) e os dois últimos da
+        divisão que minimiza o maior pedaço.
+        """
+        restantes = list(range(len(pesos)))
+        grupos = []
+        while len(grupos) < partes - 2 and len(restantes) > 2:
+            itens = [pesos[i] for i in restantes]
+            if encher:
+                cabe = limite - corte
+                grupo = _subconjunto_mais_proximo(itens, cabe, custo=lambda g: (g > cabe, abs(g - cabe)))
+            else:
+                faltam = partes - len(grupos)
+                resto = sum(itens) + sobra + (faltam - 1) * corte
+                grupo = _subconjunto_mais_proximo(
+                    itens, resto // faltam - corte,
+                    custo=lambda g: max(g + corte, (resto - g - corte) / (faltam - 1)))
+            grupos.append([restantes[i] for i in grupo])
+            usados = set(grupos[-1])
+            restantes = [i for i in restantes if i not in usados]
+
+        if len(restantes) < 2:
+            grupos.append(restantes)
+            return grupos
+
+        # Pedaço com a sobra = g + sobra; o outro = total - g + corte.
+        # O maior dos dois é mínimo com g o mais perto possível do meio
+        total = sum(pesos[i] for i in restantes)
+        alvo = (total + corte - sobra) // 2
+        com_sobra = _subconjunto_mais_proximo([pesos[i] for i in restantes], alvo,
+                                              custo=lambda g: max(g + sobra, total - g + corte))
+        com_sobra = {restantes[i] for i in com_sobra}
+        grupos.append([i for i in restantes if i not in com_sobra])
+        grupos.append(sorted(com_sobra))
+        return grupos
+
+    @_instrumentado
+    def cortes_transporte(self, plano: PlanoCorte) -> List[Dict]:
+        """
+        calcular_corte_transporte para cada barra do plano, calculado uma vez
+        por padrão: barras com as mesmas peças dividem o mesmo dict. Os padrões
+        ficam num LRU que dura enquanto o otimizador existir.
+        """
+        cortes = []
+        calculados = 0
+        for i, barra in enumerate(plano):
+            chave = (tuple(sorted(barra)), plano.tamanho(i), self.espessura_corte,
+                     self.limite_transporte)
+            corte = self._cache_transporte.get(chave)
+            if corte is None:
+                self._avisar('Transporte', i, len(plano))
+                calculados += 1
+                corte = self.calcular_corte_transporte(barra, plano.tamanho(i))
+                self._cache_transporte[chave] = corte
+                if len(self._cache_transporte) > self.MAX_CACHE_TRANSPORTE:
+                    self._cache_transporte.popitem(last=False)
+            else:
+                self._cache_transporte.move_to_end(chave)
+            cortes.append(corte)
+        if self.instrumentacao is not None:
+            self.instrumentacao.contar(transporte_barras=len(cortes), transporte_calculados=calculados)
+        return cortes
+
+    @_instrumentado
+    def analisar_resultado(self, barras: Union[List[List[float]], PlanoCorte],
+                           limite_inferior: Optional[int] = None,
+                           com_transporte: bool = True) -> dict:
+        """
+        Retorna análise completa do resultado ('barras' vem como PlanoCorte).
+        'gap' é quantas barras o plano usa acima do limite inferior; com gap 0
+        o plano é comprovadamente ótimo. 'padroes' (padroes_do_plano) só vem
+        com com_transporte, a análise do resultado final; as comparações
+        entre métodos não precisam dele.
+        """
+        plano = barras
+        if not isinstance(plano, PlanoCorte):
+            plano = PlanoCorte.de_barras(barras, self.tamanho_barra, self.espessura_corte)
+        if limite_inferior is None:
+            limite_inferior = self.limite_inferior(Counter(plano.comprimentos))
 
-    def analisar_resultado(self, barras: List[List[float]]) -> dict:
-        """Retorna análise completa do resultado"""
-        sobras = [self.calcular_sobra(b) for b in barras]
-        material_usado = sum(sum(b) for b in barras)
-        material_total = len(barras) * self.tamanho_barra
+        sobras = plano.sobras()
+        material_usado = plano.material_usado()
+        material_total = plano.material_total()
 
         # Calcula cortes de transporte se limite definido
         cortes_transporte = []
-        if self.limite_transporte:
-            for barra in barras:
-                corte = self.calcular_corte_transporte(barra)
-                cortes_transporte.append(corte)
+        if self.limite_transporte and com_transporte:
+            cortes_transporte = self.cortes_transporte(plano)
 
         return {
-            'barras': barras,
-            'num_barras': len(barras),
+            'barras': plano,
+            'num_barras': len(plano),
             'sobras': sobras,
             'sobra_total': sum(sobras),
             'material_usado': material_usado,
             'material_total': material_total,
             'eficiencia': (material_usado / material_total * 100) if material_total > 0 else 0,
-            'cortes_transporte': cortes_transporte if cortes_transporte else None
+            'cortes_transporte': cortes_transporte if cortes_transporte else None,
+            'padroes': padroes_do_plano(plano, cortes_transporte) if com_transporte else None,
+            'limite_inferior': limite_inferior,
+            'gap': len(plano) - limite_inferior,
+            'otimo': len(plano) <= limite_inferior
         }
 
 
-class InterfaceGrafica:
-    """Interface gráfica com Tkinter"""
+class PlanoIncremental:
+    """
+    Último plano (barras de um tamanho só) mantido entre edições da lista de
+    peças, para não recalcular tudo a cada peça:
+    - peça nova entra na barra mais justa onde cabe (best fit pelo
+      _IndiceResiduos) ou abre uma barra
+    - peça retirada sai da barra mais vazia que a tem, e essa barra é
+      consertada: se o que ficou nela cabe nas outras, as peças mudam de
+      barra e ela é fechada
+    Cada peça custa O(log m) buscas no índice e o corte para transporte só
+    é refeito nas barras que mudaram. precisa_recalcular() avisa
+    quando o plano se afastou do limite inferior mais que o gap do último
+    cálculo completo + FOLGA barras.
+    """
+
+    FOLGA = 1
+
+    def __init__(self, otimizador: OtimizadorCorte, resultado: dict):
+        self.otimizador = otimizador
+        self.gap_base = resultado['gap']
+        self.demanda = Counter()
+        self._capacidade, self._corte = otimizador.capacidade, otimizador.corte
+        self._conteudo = []  # peças de cada barra; barra fechada fica []
+        self._residuo = []   # espaço livre de cada barra, em unidades
+        self._indice = _IndiceResiduos()
+        self._onde = {}      # medida -> Counter(barra -> quantas peças dessa medida)
+        self._cortes = []    # corte para transporte de cada barra; None = refazer
+        for barra in resultado['barras']:
+            self._abrir(barra)
+        if resultado['cortes_transporte']:
+            self._cortes = list(resultado['cortes_transporte'])
+
+    def _peso(self, medida: float) -> int:
+        return para_unidades(medida) + self._corte
+
+    def _abrir(self, pecas: List[float]):
+        b = len(self._conteudo)
+        self._conteudo.append(list(pecas))
+        self._residuo.append(self._capacidade - sum(self._peso(p) for p in pecas))
+        self._cortes.append(None)
+        self._indice.inserir(self._residuo[b], b)
+        for peca in pecas:
+            self._onde.setdefault(peca, Counter())[b] += 1
+            self.demanda[peca] += 1
+
+    def _colocar(self, peca: float, b: int):
+        self._indice.remover(self._residuo[b], b)
+        self._conteudo[b].append(peca)
+        self._residuo[b] -= self._peso(peca)
+        self._cortes[b] = None
+        self._indice.inserir(self._residuo[b], b)
+        self._onde.setdefault(peca, Counter())[b] += 1
+        self.demanda[peca] += 1
+
+    def _retirar(self, peca: float, b: int):
+        self._indice.remover(self._residuo[b], b)
+        self._conteudo[b].remove(peca)
+        self._residuo[b] += self._peso(peca)
+        self._cortes[b] = None
+        self._indice.inserir(self._residuo[b], b)
+        self._onde[peca][b] -= 1
+        if not self._onde[peca][b]:
+            del self._onde[peca][b]
+        self.demanda[peca] -= 1
+        if not self.demanda[peca]:
+            del self.demanda[peca]
+
+    def _consertar(self, b: int):
+        """Tenta passar as peças da barra b para as outras (best fit) e fechá-la"""
+        self._indice.remover(self._residuo[b], b)
+        movidas = []
+        for peca in sorted(self._conteudo[b], reverse=True):
+            pos = self._indice.posicao_minima(self._peso(peca))
+            if pos == len(self._indice):
+                # Não coube: desfaz e a barra continua aberta
+                for movida, destino in movidas:
+                    self._retirar(movida, destino)
+                self._indice.inserir(self._residuo[b], b)
+                return
+            destino = self._indice.chave(pos)[1]
+            self._colocar(peca, destino)
+            movidas.append((peca, destino))
+
+        # Coube tudo: as cópias já estão nas outras barras, b sai do plano
+        for peca in self._conteudo[b]:
+            self._onde[peca][b] -= 1
+            if not self._onde[peca][b]:
+                del self._onde[peca][b]
+            self.demanda[peca] -= 1
+        self._conteudo[b] = []
+        self._residuo[b] = self._capacidade
+
+    def adicionar(self, medida: float, quantidade: int = 1):
+        peso = self._peso(medida)
+        for _ in range(quantidade):
+            pos = self._indice.posicao_minima(peso)
+            if pos < len(self._indice):
+                self._colocar(medida, self._indice.chave(pos)[1])
+            else:
+                self._abrir([medida])
+
+    def remover(self, medida: float, quantidade: int = 1):
+        """ValueError se o plano não tem 'quantidade' peças de 'medida'"""
+        if self.demanda[medida] < quantidade:
+            raise ValueError(f"O plano só tem {self.demanda[medida]} peça(s) de {medida}cm")
+        for _ in range(quantidade):
+            b = max(self._onde[medida], key=lambda x: (self._residuo[x], x))
+            self._retirar(medida, b)
+            self._consertar(b)
+
+    def aplicar(self, demanda: Demanda) -> dict:
+        """
+        Leva o plano para a nova demanda (retira primeiro, para abrir espaço,
+        depois coloca) e retorna o resultado de analisar_resultado.
+        """
+        demanda = Counter(dict(demanda.items() if isinstance(demanda, dict) else demanda))
+        for medida, qtd in list((self.demanda - demanda).items()):
+            self.remover(medida, qtd)
+        for medida, qtd in sorted((demanda - self.demanda).items(), reverse=True):
+            self.adicionar(medida, qtd)
+        return self.resultado()
+
+    def resultado(self) -> dict:
+        otimizador = self.otimizador
+        abertas = [b for b, barra in enumerate(self._conteudo) if barra]
+        plano = PlanoCorte.de_barras([self._conteudo[b] for b in abertas],
+                                     otimizador.tamanho_barra, otimizador.espessura_corte)
+        resultado = otimizador.analisar_resultado(plano, otimizador.limite_inferior(self.demanda),
+                                                  com_transporte=False)
+        if otimizador.limite_transporte:
+            for i, b in enumerate(abertas):
+                if self._cortes[b] is None:
+                    self._cortes[b] = otimizador.calcular_corte_transporte(plano[i])
+            resultado['cortes_transporte'] = [self._cortes[b] for b in abertas] or None
+        resultado['padroes'] = padroes_do_plano(plano, resultado['cortes_transporte'])
+        return resultado
+
+    def precisa_recalcular(self, resultado: dict) -> bool:
+        return resultado['gap'] > self.gap_base + self.FOLGA
+
+
+def _executar_metodo_processo(config: Tuple, metodo: str, demanda: Dict[float, int],
+                              instrumentar: bool = False, prazo: Optional[float] = None
+                              ) -> Optional[Tuple[List[List[float]], Optional[float], bool, Optional[dict]]]:
+    """
+    Ponto de entrada dos processos do portfólio (precisa ser de módulo).
+    Retorna (barras, limite_lp, lp_exato, tempos e contadores ou None), ou
+    None se o método passou do prazo (time.time()): o processo para sozinho
+    no próximo aviso de progresso, sem ninguém precisar matá-lo.
+    """
+    instrumentacao = Instrumentacao() if instrumentar else None
+    progresso = (lambda _: time.time() < prazo) if prazo is not None else None
+    otimizador = OtimizadorCorte(*config, instrumentacao=instrumentacao, progresso=progresso)
+    try:
+        barras, limite_lp, lp_exato = otimizador.executar_metodo(metodo, demanda)
+    except CalculoCancelado:
+        return None
+    return barras, limite_lp, lp_exato, instrumentacao.para_dict() if instrumentacao else None
 
-    def __init__(self):
+
+class InterfaceGrafica:
+    """
+    Interface gráfica com Tkinter. Calcular e Melhorar rodam numa thread
+    (ver _em_segundo_plano): a janela continua respondendo, a lista de peças
+    pode ser editada enquanto isso (o cálculo usa uma cópia) e o botão
+    Cancelar interrompe o cálculo. Depois de um cálculo, editar a lista
+    ajusta o plano na hora (ver ajustar_resultado).
+    """
+
+    # De quanto em quanto tempo (ms) a janela consulta o cálculo em andamento
+    INTERVALO_CONSULTA_MS = 100
+
+    def __init__(self, perfilar: bool = False):
         self.root = tk.Tk()
         self.root.title("Otimizador de Corte de Barras de Alumínio v0.0.3")
         self.root.geometry("950x750")
         self.root.minsize(900, 700)
 
-        self.pecas = []
+        self.pecas = Counter()  # medida -> quantidade
         self.ultimo_resultado = None
+        self.cache = CacheCortes()
+        self.estoque = EstoqueRetalhos()
+        # --profile: cada cálculo guarda tempos, contadores e um cProfile,
+        # gravados junto do arquivo exportado
+        self.perfilar = perfilar
+        # Cálculo em segundo plano: sinal de cancelar e último aviso de progresso
+        self._cancelar = None
+        self._aviso = None
+        self._calculando = False
 
         self.criar_interface()
+        self.root.protocol("WM_DELETE_WINDOW", self.fechar)
 
     def criar_interface(self):
         # Frame principal com scroll
@@ -302,6 +2322,29 @@ class InterfaceGrafica:
         self.entry_espessura.insert(0, "3")
         self.entry_espessura.grid(row=0, column=3, padx=5)
 
+        ttk.Label(config_frame, text="Tempo máx. (s):").grid(row=0, column=4, padx=5)
+        self.entry_tempo = ttk.Entry(config_frame, width=6)
+        self.entry_tempo.insert(0, "10")
+        self.entry_tempo.grid(row=0, column=5, padx=5)
+
+        self.var_retalhos = tk.BooleanVar(value=False)
+        ttk.Checkbutton(config_frame, text="Usar estoque de retalhos",
+                        variable=self.var_retalhos).grid(row=1, column=0, padx=5, pady=(5, 0))
+
+        ttk.Label(config_frame, text="Perfil:").grid(row=1, column=2, padx=5, pady=(5, 0))
+        self.entry_perfil = ttk.Entry(config_frame, width=10)
+        self.entry_perfil.grid(row=1, column=3, padx=5, pady=(5, 0))
+
+        self.label_estoque = ttk.Label(config_frame, text="")
+        self.label_estoque.grid(row=1, column=4, columnspan=2, padx=5, pady=(5, 0))
+        self.atualizar_estoque()
+
+        ttk.Label(config_frame, text="Barras à venda (opcional):").grid(row=2, column=0, padx=5, pady=(5, 0))
+        self.entry_tipos = ttk.Entry(config_frame, width=30)
+        self.entry_tipos.grid(row=2, column=1, columnspan=3, sticky="ew", padx=5, pady=(5, 0))
+        ttk.Label(config_frame, text="(cm:R$/m[:qtd], ex: 600:45, 300:38:10)").grid(
+            row=2, column=4, columnspan=2, padx=5, pady=(5, 0))
+
         # === Transporte ===
         transporte_frame = ttk.LabelFrame(main_frame, text="Corte para Transporte (opcional)", padding="10")
         transporte_frame.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(0, 10))
@@ -366,11 +2409,32 @@ class InterfaceGrafica:
         btn_frame = ttk.Frame(main_frame)
         btn_frame.grid(row=4, column=1, sticky="n", pady=(0, 10))
 
-        ttk.Button(btn_frame, text="CALCULAR OTIMIZAÇÃO", command=self.calcular,
-                   style="Accent.TButton").grid(row=0, column=0, pady=10, ipady=10, ipadx=20)
+        self.btn_calcular = ttk.Button(btn_frame, text="CALCULAR OTIMIZAÇÃO", command=self.calcular,
+                                       style="Accent.TButton")
+        self.btn_calcular.grid(row=0, column=0, pady=10, ipady=10, ipadx=20)
 
         ttk.Button(btn_frame, text="Salvar Resultado (TXT)", command=self.salvar_txt).grid(row=1, column=0, pady=5)
         ttk.Button(btn_frame, text="Salvar Resultado (CSV)", command=self.salvar_csv).grid(row=2, column=0, pady=5)
+        ttk.Button(btn_frame, text="Exportar p/ Máquina", command=self.exportar_maquina).grid(row=3, column=0, pady=5)
+
+        melhorar_frame = ttk.Frame(btn_frame)
+        melhorar_frame.grid(row=4, column=0, pady=5)
+        self.btn_melhorar = ttk.Button(melhorar_frame, text="Melhorar Resultado", command=self.melhorar)
+        self.btn_melhorar.grid(row=0, column=0)
+        self.entry_melhorar = ttk.Entry(melhorar_frame, width=5)
+        self.entry_melhorar.insert(0, "10")
+        self.entry_melhorar.grid(row=0, column=1, padx=5)
+        ttk.Label(melhorar_frame, text="s").grid(row=0, column=2)
+
+        ttk.Button(btn_frame, text="Dar Baixa no Estoque", command=self.dar_baixa).grid(row=5, column=0, pady=5)
+
+        self.label_status = ttk.Label(btn_frame, text="")
+        self.label_status.grid(row=6, column=0, pady=5)
+
+        self.barra_progresso = ttk.Progressbar(btn_frame, mode='determinate', maximum=1.0, length=180)
+        self.barra_progresso.grid(row=7, column=0, pady=(0, 5))
+        self.btn_cancelar = ttk.Button(btn_frame, text="Cancelar", command=self.cancelar, state='disabled')
+        self.btn_cancelar.grid(row=8, column=0, pady=5)
 
         # === Resultado ===
         resultado_frame = ttk.LabelFrame(main_frame, text="Resultado da Otimização", padding="10")
@@ -378,13 +2442,34 @@ class InterfaceGrafica:
         resultado_frame.columnconfigure(0, weight=1)
         resultado_frame.rowconfigure(0, weight=1)
 
-        self.texto_resultado = tk.Text(resultado_frame, wrap=tk.WORD, width=80, height=18, font=('Consolas', 10))
+        # Só o cabeçalho e o resumo vão para o texto; as barras ficam na
+        # árvore, uma linha por padrão, e as barras e os pedaços de transporte
+        # de cada padrão só são criados quando ele é aberto
+        self.texto_resultado = tk.Text(resultado_frame, wrap=tk.WORD, width=80, height=12, font=('Consolas', 10))
         self.texto_resultado.grid(row=0, column=0, sticky="nsew")
 
         scrollbar_resultado = ttk.Scrollbar(resultado_frame, orient="vertical", command=self.texto_resultado.yview)
         scrollbar_resultado.grid(row=0, column=1, sticky="ns")
         self.texto_resultado.config(yscrollcommand=scrollbar_resultado.set)
 
+        colunas = ('qtd', 'pecas', 'usado', 'sobra', 'transporte')
+        self.arvore_resultado = ttk.Treeview(resultado_frame, columns=colunas, height=10)
+        self.arvore_resultado.heading('#0', text='Padrão / Barra')
+        self.arvore_resultado.column('#0', width=130, stretch=False)
+        for coluna, titulo, largura in [('qtd', 'Qtd', 50), ('pecas', 'Peças (cm)', 300),
+                                        ('usado', 'Usado (cm)', 80), ('sobra', 'Sobra (cm)', 80),
+                                        ('transporte', 'Transporte', 200)]:
+            self.arvore_resultado.heading(coluna, text=titulo)
+            self.arvore_resultado.column(coluna, width=largura, stretch=coluna in ('pecas', 'transporte'))
+        self.arvore_resultado.grid(row=1, column=0, sticky="nsew", pady=(5, 0))
+        self.arvore_resultado.bind('<<TreeviewOpen>>', self._abrir_item)
+        self._filhos_pendentes = {}  # item da árvore -> função que cria os filhos
+
+        scrollbar_arvore = ttk.Scrollbar(resultado_frame, orient="vertical", command=self.arvore_resultado.yview)
+        scrollbar_arvore.grid(row=1, column=1, sticky="ns", pady=(5, 0))
+        self.arvore_resultado.config(yscrollcommand=scrollbar_arvore.set)
+        resultado_frame.rowconfigure(1, weight=3)
+
         main_frame.rowconfigure(4, weight=1)
         main_frame.rowconfigure(5, weight=2)
 
@@ -407,10 +2492,10 @@ class InterfaceGrafica:
                 messagebox.showerror("Erro", "A quantidade deve ser maior que zero!")
                 return
 
-            for _ in range(quantidade):
-                self.pecas.append(medida)
+            self.pecas[medida] += quantidade
 
             self.atualizar_lista_pecas()
+            self.ajustar_resultado()
             self.entry_medida.delete(0, tk.END)
             self.entry_quantidade.delete(0, tk.END)
             self.entry_quantidade.insert(0, "1")
@@ -432,9 +2517,12 @@ class InterfaceGrafica:
                 if medida <= 0:
                     messagebox.showerror("Erro", "Todas as medidas devem ser maiores que zero!")
                     return
-                self.pecas.append(medida)
+
+            for medida in medidas:
+                self.pecas[medida] += 1
 
             self.atualizar_lista_pecas()
+            self.ajustar_resultado()
             self.entry_quadro.delete(0, tk.END)
 
         except ValueError:
@@ -446,24 +2534,27 @@ class InterfaceGrafica:
             texto = self.lista_pecas.get(selecao[0])
             if "cm x" in texto:
                 medida = float(texto.split('cm')[0].strip())
-                if medida in self.pecas:
-                    self.pecas.remove(medida)
+                if self.pecas[medida] > 0:
+                    self.pecas[medida] -= 1
+                    if self.pecas[medida] == 0:
+                        del self.pecas[medida]
                 self.atualizar_lista_pecas()
+                self.ajustar_resultado()
 
     def limpar_pecas(self):
-        self.pecas = []
+        self.pecas = Counter()
         self.atualizar_lista_pecas()
         self.texto_resultado.delete(1.0, tk.END)
+        self._limpar_arvore()
 
     def atualizar_lista_pecas(self):
         self.lista_pecas.delete(0, tk.END)
-        contagem = Counter(self.pecas)
-        for medida, qtd in sorted(contagem.items(), reverse=True):
+        for medida, qtd in sorted(self.pecas.items(), reverse=True):
             self.lista_pecas.insert(tk.END, f"{medida}cm x {qtd}")
 
-        total = sum(self.pecas)
+        total = sum(medida * qtd for medida, qtd in self.pecas.items())
         self.lista_pecas.insert(tk.END, "─" * 20)
-        self.lista_pecas.insert(tk.END, f"Total: {total}cm ({len(self.pecas)} peças)")
+        self.lista_pecas.insert(tk.END, f"Total: {total}cm ({sum(self.pecas.values())} peças)")
 
     def calcular(self):
         if not self.pecas:
@@ -474,19 +2565,23 @@ class InterfaceGrafica:
             tamanho_barra = float(self.entry_tamanho.get().replace(',', '.'))
             espessura_mm = float(self.entry_espessura.get().replace(',', '.'))
             espessura_cm = espessura_mm / 10
+            orcamento_s = float(self.entry_tempo.get().replace(',', '.'))
 
             limite_transporte = None
             if self.var_transporte.get():
                 limite_transporte = float(self.entry_limite.get().replace(',', '.'))
 
+            tipos = ler_tipos_barra(self.entry_tipos.get())
+
         except ValueError:
             messagebox.showerror("Erro", "Configurações inválidas!")
             return
 
         # Verifica se alguma peça é maior que a barra
+        maior_barra = max(c for c, _, _ in tipos) if tipos else tamanho_barra
         for peca in self.pecas:
-            if peca > tamanho_barra:
-                messagebox.showerror("Erro", f"Peça de {peca}cm é maior que a barra de {tamanho_barra}cm!")
+            if peca > maior_barra:
+                messagebox.showerror("Erro", f"Peça de {peca}cm é maior que a barra de {maior_barra}cm!")
                 return
 
         # Verifica se alguma peça é maior que o limite de transporte
@@ -497,32 +2592,62 @@ class InterfaceGrafica:
                         f"Peça de {peca}cm é maior que o limite de transporte ({limite_transporte}cm).\n"
                         "Você precisará de um veículo maior para esta peça.")
 
-        otimizador = OtimizadorCorte(tamanho_barra, espessura_cm, limite_transporte)
-
-        # Calcula com os 3 métodos
-        resultado_ffd = otimizador.analisar_resultado(otimizador.calcular_cortes_greedy(self.pecas))
-        resultado_bfd = otimizador.analisar_resultado(otimizador.calcular_cortes_best_fit(self.pecas))
-        resultado_otim = otimizador.analisar_resultado(otimizador.otimizar_para_maiores_sobras(self.pecas))
-
-        resultados = [
-            ('First Fit Decreasing', resultado_ffd),
-            ('Best Fit Decreasing', resultado_bfd),
-            ('Otimizado p/ Maiores Sobras', resultado_otim)
-        ]
-
-        melhor_nome, melhor = min(resultados, key=lambda x: (x[1]['num_barras'], -max(x[1]['sobras'])))
+        instrumentacao = Instrumentacao(perfilar=True) if self.perfilar else None
+        pecas = Counter(self.pecas)  # a lista pode mudar enquanto calcula
+        perfil = self.entry_perfil.get().strip()
+        usar_retalhos = self.var_retalhos.get()
+
+        # Compara os métodos em paralelo dentro do tempo máximo, parando cedo
+        # se um deles chegar no limite inferior
+        def trabalho(progresso):
+            otimizador = OtimizadorCorte(tamanho_barra, espessura_cm, limite_transporte, self.cache,
+                                         instrumentacao, progresso)
+            with instrumentacao.perfilando() if instrumentacao else _sem_perfil():
+                if usar_retalhos:
+                    return otimizador.resolver_com_retalhos(pecas, self.estoque, perfil, orcamento_s, tipos)
+                if tipos:
+                    return otimizador.resolver_estoque_variavel(pecas, tipos)
+                return otimizador.resolver_portfolio(pecas, orcamento_s)
+
+        def ao_terminar(resposta):
+            melhor_nome, melhor = resposta
+            self.ultimo_resultado = {
+                'tamanho_barra': tamanho_barra,
+                'espessura_corte': espessura_mm,
+                'limite_transporte': limite_transporte,
+                'perfil': perfil,
+                'baixado': False,
+                'pecas': pecas,
+                'metodo': melhor_nome,
+                'resultado': melhor,
+                'instrumentacao': instrumentacao,
+            }
+            self.mostrar_resultado()
+            self.label_status.config(text=f"Pronto: {melhor['num_barras']} barras")
+            self.ajustar_resultado()  # peças editadas durante o cálculo
 
-        self.ultimo_resultado = {
-            'tamanho_barra': tamanho_barra,
-            'espessura_corte': espessura_mm,
-            'limite_transporte': limite_transporte,
-            'pecas': self.pecas.copy(),
-            'metodo': melhor_nome,
-            'resultado': melhor
-        }
+        self._em_segundo_plano(trabalho, ao_terminar)
 
-        # Exibe resultado
+    def mostrar_resultado(self):
+        """Exibe self.ultimo_resultado: cabeçalho e resumo no texto, barras na árvore"""
         self.texto_resultado.delete(1.0, tk.END)
+        self.texto_resultado.insert(1.0, self._texto_cabecalho() + self._texto_resumo())
+        self._preencher_arvore()
+
+    def texto_relatorio(self) -> str:
+        """Relatório completo do último resultado, um bloco por padrão de barra (usado no TXT)"""
+        padroes = self.ultimo_resultado['resultado']['padroes']
+        partes = [self._texto_cabecalho(), f"PLANO DE CORTE ({len(padroes)} padrão(ões)):\n", "=" * 65 + "\n"]
+        partes.extend(self._texto_padrao(numero, padrao) for numero, padrao in enumerate(padroes, 1))
+        partes.append(self._texto_resumo())
+        return "".join(partes)
+
+    def _texto_cabecalho(self) -> str:
+        tamanho_barra = self.ultimo_resultado['tamanho_barra']
+        espessura_mm = self.ultimo_resultado['espessura_corte']
+        limite_transporte = self.ultimo_resultado['limite_transporte']
+        melhor_nome = self.ultimo_resultado['metodo']
+        melhor = self.ultimo_resultado['resultado']
 
         texto = "=" * 65 + "\n"
         texto += "RESULTADO DA OTIMIZAÇÃO\n"
@@ -533,67 +2658,337 @@ class InterfaceGrafica:
         texto += f"  • Espessura do corte: {espessura_mm}mm\n"
         if limite_transporte:
             texto += f"  • Limite transporte: {limite_transporte}cm\n"
-        texto += f"  • Total de peças: {len(self.pecas)}\n"
-        texto += f"  • Método usado: {melhor_nome}\n\n"
+        texto += f"  • Total de peças: {sum(self.ultimo_resultado['pecas'].values())}\n"
+        texto += f"  • Método usado: {melhor_nome}\n"
+        texto += f"  • Limite inferior: {melhor['limite_inferior']} barra(s)"
+        if melhor['limite_lp'] is not None:
+            # Sem convergir o LP, o valor é só o limite de Farley
+            rotulo = "LP" if melhor['lp_exato'] else "limite de Farley"
+            texto += f" ({rotulo} = {melhor['limite_lp']:.2f})"
+        texto += "\n"
+        if melhor['otimo']:
+            texto += "  • Plano comprovadamente ótimo (atingiu o limite inferior)\n\n"
+        else:
+            texto += f"  • Gap: {melhor['gap']} barra(s) acima do limite inferior\n\n"
+
+        plano = melhor['barras']
+        usados = len(plano.comprimentos_retalhos())
 
+        novas = plano.contagem_tamanhos()
         texto += "-" * 65 + "\n"
-        texto += f">>> VOCÊ PRECISARÁ DE {melhor['num_barras']} BARRA(S) DE {tamanho_barra}cm <<<\n"
+        if set(novas) <= {tamanho_barra}:
+            texto += f">>> VOCÊ PRECISARÁ DE {melhor['num_barras'] - usados} BARRA(S) DE {tamanho_barra}cm <<<\n"
+        else:
+            texto += ">>> VOCÊ PRECISARÁ DE "
+            texto += " + ".join(f"{qtd} BARRA(S) DE {t}cm" for t, qtd in sorted(novas.items(), reverse=True))
+            texto += " <<<\n"
+        if 'custo_total' in melhor:
+            texto += f">>> CUSTO: R$ {melhor['custo_total']:.2f} (mínimo possível: R$ {melhor['custo_minimo']:.2f}) <<<\n"
+        if usados:
+            texto += f">>> E DE {usados} RETALHO(S) DO ESTOQUE <<<\n"
         texto += "-" * 65 + "\n\n"
+        return texto
+
+    def _texto_padrao(self, numero: int, padrao: dict) -> str:
+        """Bloco de texto de um padrão (ver padroes_do_plano): peças, quantas barras e o corte para transporte"""
+        tamanho_barra = self.ultimo_resultado['tamanho_barra']
+        limite_transporte = self.ultimo_resultado['limite_transporte']
+        qtd = padrao['quantidade']
+
+        if padrao['retalho']:
+            texto = f"\n♻️  PADRÃO {numero}: {qtd} RETALHO(S) DE {padrao['tamanho']}cm"
+        elif padrao['tamanho'] != tamanho_barra:
+            texto = f"\n📦 PADRÃO {numero}: {qtd} BARRA(S) DE {padrao['tamanho']}cm"
+        else:
+            texto = f"\n📦 PADRÃO {numero}: {qtd} BARRA(S)"
+        texto += f" ({'barra' if qtd == 1 else 'barras'} {faixas_barras(padrao['barras'])})\n"
+        texto += f"   Peças: {' + '.join(f'{p}cm' for p in padrao['pecas'])}\n"
+        texto += f"   Usado: {padrao['usado']:.1f}cm | Sobra: {padrao['sobra']:.1f}cm por barra\n"
 
-        texto += "PLANO DE CORTE:\n"
-        texto += "=" * 65 + "\n"
-
-        for i, barra in enumerate(melhor['barras'], 1):
-            sobra = otimizador.calcular_sobra(barra)
-            pecas_str = " + ".join(f"{p}cm" for p in sorted(barra, reverse=True))
-
-            texto += f"\n📦 BARRA {i}:\n"
-            texto += f"   Peças: {pecas_str}\n"
-            texto += f"   Usado: {sum(barra):.1f}cm | Sobra: {sobra:.1f}cm\n"
-
-            # Mostra corte de transporte se habilitado
-            if melhor['cortes_transporte'] and melhor['cortes_transporte'][i-1]:
-                corte = melhor['cortes_transporte'][i-1]
+        # Mostra corte de transporte se habilitado
+        if padrao['corte_transporte']:
+            corte = padrao['corte_transporte']
 
-                if not corte.get('precisa_corte', True):
-                    texto += f"\n   🚗 TRANSPORTE: Cabe inteira no carro ({corte.get('pedaco_unico', 0):.1f}cm)\n"
-                else:
-                    texto += f"\n   🚗 CORTE PARA TRANSPORTE (limite {limite_transporte}cm):\n"
+            if not corte.get('precisa_corte', True):
+                texto += f"\n   🚗 TRANSPORTE: Cabe inteira no carro ({corte.get('pedaco_unico', 0):.1f}cm)\n"
+            else:
+                texto += f"\n   🚗 CORTE PARA TRANSPORTE (limite {limite_transporte}cm):\n"
 
-                    # Aviso se passa do limite
-                    if not corte.get('cabe_no_limite', True) and corte.get('excesso', 0) > 0:
-                        texto += f"   ⚠️  ATENÇÃO: Passa {corte['excesso']:.1f}cm do limite!\n"
+                # Aviso se passa do limite
+                if not corte['cabe_no_limite']:
+                    texto += f"   ⚠️  ATENÇÃO: Passa {corte['excesso']:.1f}cm do limite!\n"
 
-                    texto += f"   ✂️  Cortar em: {corte['ponto_corte']:.1f}cm da ponta\n"
+                pontos = corte['pontos_corte']
+                texto += f"   ✂️  Cortar em: {' e '.join(f'{p:.1f}cm' for p in pontos)} da ponta\n"
 
-                    texto += f"\n   Pedaço A ({corte['tamanho_pedaco_1']:.1f}cm)"
-                    if corte['tamanho_pedaco_1'] > limite_transporte:
-                        texto += f" ⚠️ +{corte['tamanho_pedaco_1'] - limite_transporte:.1f}cm"
+                for letra, pedaco in zip("ABCDEFGHIJ", corte['pedacos']):
+                    texto += f"\n   Pedaço {letra} ({pedaco['tamanho']:.1f}cm)"
+                    if pedaco['tamanho'] > limite_transporte:
+                        texto += f" ⚠️ +{pedaco['tamanho'] - limite_transporte:.1f}cm"
                     texto += ":\n"
-                    if 'pedaco_1' in corte:
-                        texto += f"      Peças: {' + '.join(f'{p}cm' for p in sorted(corte['pedaco_1'], reverse=True))}\n"
-                        if corte.get('sobra_fica_em') == 1 and corte.get('sobra', 0) > 0:
-                            texto += f"      + Sobra de {corte['sobra']:.1f}cm\n"
-
-                    texto += f"\n   Pedaço B ({corte['tamanho_pedaco_2']:.1f}cm)"
-                    if corte['tamanho_pedaco_2'] > limite_transporte:
-                        texto += f" ⚠️ +{corte['tamanho_pedaco_2'] - limite_transporte:.1f}cm"
-                    texto += ":\n"
-                    if 'pedaco_2' in corte:
-                        texto += f"      Peças: {' + '.join(f'{p}cm' for p in sorted(corte['pedaco_2'], reverse=True))}\n"
-                        if corte.get('sobra_fica_em') == 2 and corte.get('sobra', 0) > 0:
-                            texto += f"      + Sobra de {corte['sobra']:.1f}cm\n"
+                    texto += f"      Peças: {' + '.join(f'{p}cm' for p in pedaco['pecas'])}\n"
+                    if pedaco['tem_sobra'] and corte.get('sobra', 0) > 0:
+                        texto += f"      + Sobra de {corte['sobra']:.1f}cm\n"
 
-            texto += "\n" + "-" * 65 + "\n"
+        return texto + "\n" + "-" * 65 + "\n"
 
-        texto += "\nRESUMO:\n"
+    def _texto_resumo(self) -> str:
+        melhor = self.ultimo_resultado['resultado']
+        texto = "\nRESUMO:\n"
         texto += f"  • Material total: {melhor['material_total']:.1f}cm\n"
         texto += f"  • Material usado: {melhor['material_usado']:.1f}cm\n"
         texto += f"  • Sobra total: {melhor['sobra_total']:.1f}cm\n"
         texto += f"  • Eficiência: {melhor['eficiencia']:.1f}%\n"
-        texto += f"  • Sobras por barra: {[f'{s:.1f}cm' for s in sorted(melhor['sobras'], reverse=True)]}\n"
+        sobras = Counter(f"{s:.1f}cm" for s in sorted(melhor['sobras'], reverse=True))
+        texto += f"  • Sobras por barra: {', '.join(f'{s} × {qtd}' for s, qtd in sobras.items())}\n"
+
+        stats = self.cache.estatisticas()
+        texto += f"  • Cache: {stats['acertos_memoria'] + stats['acertos_disco']} acerto(s), {stats['falhas']} falha(s)\n"
+        return texto
+
+    def _limpar_arvore(self):
+        self.arvore_resultado.delete(*self.arvore_resultado.get_children())
+        self._filhos_pendentes = {}
+
+    def _adicionar_item(self, pai: str, texto: str, valores: Tuple, filhos: Optional[Callable[[str], None]] = None) -> str:
+        """Insere uma linha; com 'filhos', ela ganha um filho vazio e filhos(item) só roda ao abrir"""
+        item = self.arvore_resultado.insert(pai, 'end', text=texto, values=valores)
+        if filhos is not None:
+            self.arvore_resultado.insert(item, 'end', text='...')
+            self._filhos_pendentes[item] = filhos
+        return item
+
+    def _abrir_item(self, _evento=None):
+        item = self.arvore_resultado.focus()
+        filhos = self._filhos_pendentes.pop(item, None)
+        if filhos is not None:
+            self.arvore_resultado.delete(*self.arvore_resultado.get_children(item))
+            filhos(item)
+
+    def _preencher_arvore(self):
+        """Uma linha por padrão de barra (peças × quantidade); as barras entram ao abrir"""
+        self._limpar_arvore()
+        tamanho_barra = self.ultimo_resultado['tamanho_barra']
+
+        for numero, padrao in enumerate(self.ultimo_resultado['resultado']['padroes'], 1):
+            texto = f"Padrão {numero}"
+            if padrao['retalho']:
+                texto += f" (retalho {padrao['tamanho']}cm)"
+            elif padrao['tamanho'] != tamanho_barra:
+                texto += f" ({padrao['tamanho']}cm)"
+            corte = padrao['corte_transporte']
+            valores = (f"× {padrao['quantidade']}", " + ".join(str(p) for p in padrao['pecas']),
+                       f"{padrao['usado']:.1f}", f"{padrao['sobra']:.1f}", self._resumo_transporte(corte))
+            self._adicionar_item('', texto, valores,
+                                 lambda item, indices=padrao['barras'], corte=corte:
+                                 self._preencher_barras(item, indices, corte))
+
+    def _preencher_barras(self, pai: str, indices: List[int], corte: Optional[Dict]):
+        """Barras de um padrão; as que precisam de corte para transporte abrem nos pedaços"""
+        plano = self.ultimo_resultado['resultado']['barras']
+        pedacos = corte['pedacos'] if corte and corte.get('precisa_corte') else []
+        for i in indices:
+            valores = ('', '', f"{plano.usado_barra(i):.1f}", f"{plano.sobra(i):.1f}", self._resumo_transporte(corte))
+            self._adicionar_item(pai, f"Barra {i + 1}", valores,
+                                 (lambda item: self._preencher_pedacos(item, corte)) if pedacos else None)
+
+    def _preencher_pedacos(self, pai: str, corte: Dict):
+        limite_transporte = self.ultimo_resultado['limite_transporte']
+        for letra, pedaco in zip("ABCDEFGHIJ", corte['pedacos']):
+            aviso = ""
+            if pedaco['tamanho'] > limite_transporte:
+                aviso = f"⚠️ +{pedaco['tamanho'] - limite_transporte:.1f}cm"
+            sobra = f"{corte['sobra']:.1f}" if pedaco['tem_sobra'] and corte.get('sobra', 0) > 0 else ''
+            self._adicionar_item(pai, f"Pedaço {letra}", ('', " + ".join(str(p) for p in pedaco['pecas']),
+                                                          f"{pedaco['tamanho']:.1f}", sobra, aviso))
+
+    @staticmethod
+    def _resumo_transporte(corte: Optional[Dict]) -> str:
+        if not corte:
+            return "-"
+        if not corte.get('precisa_corte', True):
+            return f"inteira ({corte.get('pedaco_unico', 0):.1f}cm)"
+        pontos = corte['pontos_corte']
+        texto = f"cortar em {' e '.join(f'{p:.1f}' for p in pontos)}cm"
+        if not corte['cabe_no_limite']:
+            texto += f" ⚠️ +{corte['excesso']:.1f}cm"
+        return texto
+
+    def melhorar(self):
+        """Roda a busca local sobre o último resultado e fica com o melhor"""
+        if not self.ultimo_resultado:
+            messagebox.showwarning("Aviso", "Calcule a otimização primeiro!")
+            return
+        try:
+            segundos = float(self.entry_melhorar.get().replace(',', '.'))
+        except ValueError:
+            messagebox.showerror("Erro", "Tempo de melhoria inválido!")
+            return
 
-        self.texto_resultado.insert(1.0, texto)
+        resultado = self.ultimo_resultado
+        if not resultado['resultado']['barras'].tamanho_unico:
+            messagebox.showinfo("Aviso", "A melhoria só está disponível para planos com barras de um tamanho.")
+            return
+        instrumentacao = resultado.get('instrumentacao')
+        atual = resultado['resultado']
+
+        # Cancelar aqui só encerra a busca antes: fica o melhor plano até então
+        def trabalho(progresso):
+            otimizador = OtimizadorCorte(resultado['tamanho_barra'], resultado['espessura_corte'] / 10,
+                                         resultado['limite_transporte'], instrumentacao=instrumentacao)
+
+            def aviso(info):
+                return progresso({'etapa': f"{info['barras']} barras | maior sobra {info['maior_sobra']:.1f}cm",
+                                  'feitos': info['tempo'], 'total': segundos})
+
+            with instrumentacao.perfilando() if instrumentacao else _sem_perfil():
+                barras = otimizador.melhorar_plano(atual['barras'].barras(), segundos, aviso)
+                return otimizador.analisar_resultado(barras, atual['limite_inferior'])
+
+        def ao_terminar(novo):
+            if resultado is not self.ultimo_resultado:
+                return  # veio um cálculo novo enquanto isso
+            if chave_selecao(novo) < chave_selecao(atual):
+                novo['limite_lp'] = atual['limite_lp']
+                novo['lp_exato'] = atual['lp_exato']
+                novo['metodos_testados'] = atual['metodos_testados']
+                resultado['resultado'] = novo
+                resultado['metodo'] += ' + Busca Local'
+                resultado.pop('incremental', None)
+                self.mostrar_resultado()
+                self.label_status.config(text=f"Melhorado: {novo['num_barras']} barras")
+            else:
+                self.label_status.config(text="Nenhuma melhoria encontrada")
+            self.ajustar_resultado()
+
+        self._em_segundo_plano(trabalho, ao_terminar)
+
+    def ajustar_resultado(self):
+        """
+        Leva as edições da lista de peças para o último plano sem recalcular
+        tudo (PlanoIncremental). Se o plano ajustado passar do limite
+        inferior mais que o tolerado, chama calcular(). Planos com retalhos,
+        com barras de vários tamanhos ou já baixados no estoque só mudam
+        pelo Calcular.
+        """
+        resultado = self.ultimo_resultado
+        if (not resultado or self._calculando or not self.pecas or self.pecas == resultado['pecas']
+                or resultado['baixado'] or not resultado['resultado']['barras'].tamanho_unico
+                or 'custo_total' in resultado['resultado']
+                or max(self.pecas) > resultado['tamanho_barra']):
+            return
+
+        incremental = resultado.get('incremental')
+        if incremental is None:
+            otimizador = OtimizadorCorte(resultado['tamanho_barra'], resultado['espessura_corte'] / 10,
+                                         resultado['limite_transporte'],
+                                         instrumentacao=resultado.get('instrumentacao'))
+            incremental = resultado['incremental'] = PlanoIncremental(otimizador, resultado['resultado'])
+        novo = incremental.aplicar(self.pecas)
+        novo['limite_lp'] = None
+        novo['lp_exato'] = False
+        novo['metodos_testados'] = resultado['resultado']['metodos_testados']
+        resultado['resultado'] = novo
+        resultado['pecas'] = Counter(self.pecas)
+        if not resultado['metodo'].endswith(' + Ajuste'):
+            resultado['metodo'] += ' + Ajuste'
+        self.mostrar_resultado()
+
+        if incremental.precisa_recalcular(novo):
+            self.calcular()
+        else:
+            self.label_status.config(text=f"Plano ajustado: {novo['num_barras']} barras")
+
+    def _em_segundo_plano(self, trabalho: Callable[[Callable[[dict], bool]], object],
+                          ao_terminar: Callable[[object], None]):
+        """
+        Roda trabalho(progresso) numa thread. O Tk não pode ser tocado fora do
+        loop principal, então a thread só guarda o último aviso e põe o
+        resultado (ou a exceção) numa fila; _acompanhar consulta os dois pelo
+        root.after e chama ao_terminar(resultado) no loop principal.
+        progresso(dict com 'etapa', 'feitos', 'total') retorna False depois
+        de Cancelar.
+        """
+        cancelar = threading.Event()
+        fila = queue.Queue()
+        self._cancelar = cancelar
+        self._aviso = None
+
+        def progresso(info):
+            self._aviso = info
+            return not cancelar.is_set()
+
+        def rodar():
+            try:
+                fila.put((True, trabalho(progresso)))
+            except Exception as e:
+                fila.put((False, e))
+
+        self._ocupado(True)
+        threading.Thread(target=rodar, daemon=True).start()
+        self.root.after(self.INTERVALO_CONSULTA_MS, self._acompanhar, fila, ao_terminar)
+
+    def _acompanhar(self, fila: queue.Queue, ao_terminar: Callable[[object], None]):
+        try:
+            sucesso, valor = fila.get_nowait()
+        except queue.Empty:
+            aviso = self._aviso
+            if aviso is not None:
+                self.label_status.config(text=aviso['etapa'])
+                self.barra_progresso.config(value=aviso['feitos'] / aviso['total'] if aviso['total'] else 0)
+            self.root.after(self.INTERVALO_CONSULTA_MS, self._acompanhar, fila, ao_terminar)
+            return
+
+        self._ocupado(False)
+        if sucesso:
+            ao_terminar(valor)
+        elif isinstance(valor, CalculoCancelado):
+            self.label_status.config(text="Cálculo cancelado")
+        else:
+            self.label_status.config(text="")
+            messagebox.showerror("Erro", str(valor))
+
+    def _ocupado(self, ocupado: bool):
+        """Liga/desliga os botões de cálculo enquanto uma thread está rodando"""
+        self._calculando = ocupado
+        estado = 'disabled' if ocupado else 'normal'
+        self.btn_calcular.config(state=estado)
+        self.btn_melhorar.config(state=estado)
+        self.btn_cancelar.config(state='normal' if ocupado else 'disabled')
+        self.barra_progresso.config(value=0)
+        if ocupado:
+            self.label_status.config(text="Calculando...")
+
+    def cancelar(self):
+        if self._cancelar is not None:
+            self._cancelar.set()
+            self.label_status.config(text="Cancelando...")
+
+    def fechar(self):
+        """Fecha a janela cancelando o cálculo em andamento (encerra os processos do portfólio)"""
+        self.cancelar()
+        self.root.destroy()
+
+    def atualizar_estoque(self):
+        resumo = self.estoque.resumo()
+        quantidade = sum(qtd for qtd, _ in resumo.values())
+        self.label_estoque.config(text=f"({quantidade} retalhos em {len(resumo)} perfil(is))")
+
+    def dar_baixa(self):
+        """Retira do estoque os retalhos usados e guarda as sobras úteis do último plano"""
+        if not self.ultimo_resultado:
+            messagebox.showwarning("Aviso", "Calcule a otimização primeiro!")
+            return
+        if self.ultimo_resultado['baixado']:
+            messagebox.showwarning("Aviso", "Este plano já foi baixado no estoque!")
+            return
+        plano = self.ultimo_resultado['resultado']['barras']
+        usados = plano.comprimentos_retalhos()
+        guardados = self.estoque.dar_baixa(self.ultimo_resultado['perfil'], usados, plano.sobras())
+        self.ultimo_resultado['baixado'] = True
+        self.atualizar_estoque()
+        messagebox.showinfo("Sucesso", f"{len(usados)} retalho(s) retirado(s) e {guardados} sobra(s) "
+                                       f"de pelo menos {self.estoque.comprimento_minimo}cm guardada(s).")
 
     def salvar_txt(self):
         if not self.ultimo_resultado:
@@ -608,8 +3003,8 @@ class InterfaceGrafica:
 
         if filepath:
             with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(self.texto_resultado.get(1.0, tk.END))
-            messagebox.showinfo("Sucesso", f"Arquivo salvo em:\n{filepath}")
+                f.write(self.texto_relatorio())
+            messagebox.showinfo("Sucesso", f"Arquivo salvo em:\n{filepath}{self._gravar_perfil(filepath)}")
 
     def salvar_csv(self):
         if not self.ultimo_resultado:
@@ -643,37 +3038,72 @@ class InterfaceGrafica:
                     writer.writerow([medida, qtd])
                 writer.writerow([])
 
-                writer.writerow(['PLANO DE CORTE'])
-                writer.writerow(['Barra', 'Peças (cm)', 'Total Usado (cm)', 'Sobra (cm)', 'Corte Transporte (cm)'])
-
-                otimizador = OtimizadorCorte(resultado['tamanho_barra'], resultado['espessura_corte']/10,
-                                             resultado.get('limite_transporte'))
-
-                for i, barra in enumerate(resultado['resultado']['barras'], 1):
-                    pecas_str = ' + '.join(str(p) for p in sorted(barra, reverse=True))
-                    sobra = otimizador.calcular_sobra(barra)
+                writer.writerow(['PLANO DE CORTE (barras iguais agrupadas por padrão)'])
+                writer.writerow(['Padrão', 'Qtd Barras', 'Barras', 'Peças (cm)', 'Total Usado (cm)', 'Sobra (cm)',
+                                 'Corte Transporte (cm)'])
 
+                padroes = resultado['resultado']['padroes']
+                tamanho_barra = resultado['resultado']['barras'].tamanho_barra
+                for numero, padrao in enumerate(padroes, 1):
                     corte_str = '-'
-                    if resultado['resultado'].get('cortes_transporte'):
-                        corte = resultado['resultado']['cortes_transporte'][i-1]
-                        if corte and corte.get('precisa_corte'):
-                            corte_str = f"{corte.get('ponto_corte', 'N/A')}"
-
-                    writer.writerow([i, pecas_str, sum(barra), f'{sobra:.1f}', corte_str])
+                    corte = padrao['corte_transporte']
+                    if corte and corte.get('precisa_corte'):
+                        corte_str = ' e '.join(f"{p:.1f}" for p in corte['pontos_corte'])
+
+                    padrao_str = numero
+                    if padrao['retalho']:
+                        padrao_str = f"{numero} (retalho {padrao['tamanho']})"
+                    elif padrao['tamanho'] != tamanho_barra:
+                        padrao_str = f"{numero} ({padrao['tamanho']})"
+                    writer.writerow([padrao_str, padrao['quantidade'], faixas_barras(padrao['barras']),
+                                     ' + '.join(str(p) for p in padrao['pecas']), padrao['usado'],
+                                     f"{padrao['sobra']:.1f}", corte_str])
 
                 writer.writerow([])
                 writer.writerow(['RESUMO'])
                 writer.writerow(['Total de Barras', resultado['resultado']['num_barras']])
+                writer.writerow(['Total de Padrões', len(padroes)])
                 writer.writerow(['Eficiência', f"{resultado['resultado']['eficiencia']:.1f}%"])
+                writer.writerow(['Limite Inferior (barras)', resultado['resultado']['limite_inferior']])
+                writer.writerow(['Gap (barras)', resultado['resultado']['gap']])
+
+            messagebox.showinfo("Sucesso", f"Arquivo salvo em:\n{filepath}{self._gravar_perfil(filepath)}")
+
+    def exportar_maquina(self):
+        """Exporta o plano barra por barra para outros programas (ver exportar_plano)"""
+        from exportar_plano import exportar_arquivo  # exportar_plano importa este módulo
+
+        if not self.ultimo_resultado:
+            messagebox.showwarning("Aviso", "Calcule a otimização primeiro!")
+            return
 
-            messagebox.showinfo("Sucesso", f"Arquivo salvo em:\n{filepath}")
+        filepath = filedialog.asksaveasfilename(
+            defaultextension=".jsonl",
+            filetypes=[("JSON Lines", "*.jsonl"), ("CSV por barra", "*.csv"), ("Lista da serra", "*.txt")],
+            initialfilename=f"plano_corte_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+        )
+
+        if filepath:
+            resultado = self.ultimo_resultado
+            barras = exportar_arquivo(resultado['resultado'], filepath, metodo=resultado['metodo'],
+                                      limite_transporte=resultado['limite_transporte'],
+                                      perfil=resultado['perfil'] or None)
+            messagebox.showinfo("Sucesso", f"{barras} barra(s) exportada(s) em:\n{filepath}")
+
+    def _gravar_perfil(self, filepath: str) -> str:
+        """Com --profile, grava a instrumentação junto do arquivo; retorna o texto para a mensagem"""
+        instrumentacao = self.ultimo_resultado.get('instrumentacao')
+        if instrumentacao is None:
+            return ""
+        arquivos = instrumentacao.gravar(os.path.splitext(filepath)[0])
+        return "\n\nPerfil salvo em:\n" + "\n".join(arquivos)
 
     def executar(self):
         self.root.mainloop()
 
 
-def modo_terminal():
-    """Modo interativo via terminal"""
+def modo_terminal(perfilar: bool = False):
+    """Modo interativo via terminal; com perfilar, grava tempos e cProfile junto do arquivo salvo"""
     print("=" * 65)
     print("OTIMIZADOR DE CORTE DE BARRAS DE ALUMÍNIO v0.0.3")
     print("=" * 65)
@@ -689,56 +3119,81 @@ def modo_terminal():
     transporte_input = input("Limite do carro em cm (Enter para ignorar) [300]: ").strip()
     limite_transporte = float(transporte_input) if transporte_input else None
 
-    pecas = []
+    tempo_input = input("Tempo máximo de cálculo em s [10]: ").strip()
+    orcamento_s = float(tempo_input) if tempo_input else 10
+
+    tipos_input = input("Barras à venda, cm:R$/m[:qtd] (ex: 600:45,300:38:10) [só a barra acima]: ").strip()
+    tipos = ler_tipos_barra(tipos_input)
+
+    estoque, perfil = None, ''
+    if input("Usar estoque de retalhos? (s/n) [n]: ").strip().lower() == 's':
+        estoque = EstoqueRetalhos()
+        perfil = input("Perfil: ").strip()
+
+    itens = []  # (perfil, medida, quantidade); perfil '' = sem perfil
 
     print("\n--- Adicionar Peças ---")
     print("Digite as medidas em cm (ou 'q' para calcular)")
     print("Formato: medida ou medidaxquantidade (ex: 75 ou 75x4)")
-    print("Para quadros: 75x75x40x40 (4 medidas)\n")
+    print("Para quadros: 75x75x40x40 (4 medidas)")
+    print("Com perfil: PERFIL:medida (ex: SU079:75x4), cada perfil sai das suas barras\n")
 
     while True:
         entrada = input("Peça: ").strip().lower()
 
         if entrada == 'q' or entrada == '':
-            if pecas:
+            if itens:
                 break
             print("Adicione pelo menos uma peça!")
             continue
 
+        perfil_peca = ''
+        if ':' in entrada:
+            perfil_peca, entrada = entrada.split(':', 1)
+            perfil_peca = perfil_peca.strip().upper()
+
         try:
             partes = entrada.replace(',', '.').split('x')
 
             if len(partes) == 1:
-                pecas.append(float(partes[0]))
+                novos = [(perfil_peca, float(partes[0]), 1)]
             elif len(partes) == 2:
-                medida = float(partes[0])
-                qtd = int(partes[1])
-                pecas.extend([medida] * qtd)
+                novos = [(perfil_peca, float(partes[0]), int(partes[1]))]
             elif len(partes) == 4:
-                for p in partes:
-                    pecas.append(float(p))
+                novos = [(perfil_peca, float(p), 1) for p in partes]
             else:
                 print("Formato inválido!")
                 continue
 
-            print(f"  Adicionado! Total: {len(pecas)} peças ({sum(pecas)}cm)")
+            itens.extend(novos)
+            pecas = agrupar_por_perfil(itens).get(perfil_peca, Counter())
+            total = sum(medida * qtd for medida, qtd in pecas.items())
+            print(f"  Adicionado! Total{' ' + perfil_peca if perfil_peca else ''}: {sum(pecas.values())} peças ({total}cm)")
 
         except ValueError:
             print("Valor inválido!")
 
-    otimizador = OtimizadorCorte(tamanho_barra, espessura_cm, limite_transporte)
-
-    resultado_ffd = otimizador.analisar_resultado(otimizador.calcular_cortes_greedy(pecas))
-    resultado_bfd = otimizador.analisar_resultado(otimizador.calcular_cortes_best_fit(pecas))
-    resultado_otim = otimizador.analisar_resultado(otimizador.otimizar_para_maiores_sobras(pecas))
-
-    resultados = [
-        ('First Fit Decreasing', resultado_ffd),
-        ('Best Fit Decreasing', resultado_bfd),
-        ('Otimizado p/ Maiores Sobras', resultado_otim)
-    ]
-
-    melhor_nome, melhor = min(resultados, key=lambda x: (x[1]['num_barras'], -max(x[1]['sobras'])))
+    pecas_por_perfil = agrupar_por_perfil(itens)
+    if not pecas_por_perfil:
+        print("Nenhuma peça para cortar.")
+        return
+
+    instrumentacao = Instrumentacao(perfilar=True) if perfilar else None
+    otimizador = OtimizadorCorte(tamanho_barra, espessura_cm, limite_transporte, CacheCortes(),
+                                 instrumentacao)
+
+    if set(pecas_por_perfil) != {''}:
+        modo_terminal_perfis(otimizador, pecas_por_perfil, orcamento_s, estoque, perfil, tipos)
+        return
+    pecas = pecas_por_perfil['']
+
+    with instrumentacao.perfilando() if instrumentacao else _sem_perfil():
+        if estoque is not None:
+            melhor_nome, melhor = otimizador.resolver_com_retalhos(pecas, estoque, perfil, orcamento_s, tipos)
+        elif tipos:
+            melhor_nome, melhor = otimizador.resolver_estoque_variavel(pecas, tipos)
+        else:
+            melhor_nome, melhor = otimizador.resolver_portfolio(pecas, orcamento_s)
 
     print("\n" + "=" * 65)
     print("RESULTADO DA OTIMIZAÇÃO")
@@ -748,56 +3203,89 @@ def modo_terminal():
     if limite_transporte:
         print(f"Limite transporte: {limite_transporte}cm")
     print(f"Método: {melhor_nome}")
+    print(f"Limite inferior: {melhor['limite_inferior']} barra(s) | Gap: {melhor['gap']}"
+          + (" (ótimo comprovado)" if melhor['otimo'] else ""))
+
+    plano = melhor['barras']
+    usados = plano.comprimentos_retalhos()
 
     print("\n" + "-" * 65)
-    print(f">>> VOCÊ PRECISARÁ DE {melhor['num_barras']} BARRA(S) <<<")
+    if tipos:
+        novas = sorted(plano.contagem_tamanhos().items(), reverse=True)
+        print(f">>> VOCÊ PRECISARÁ DE {' + '.join(f'{qtd} x {t}cm' for t, qtd in novas)} <<<")
+        print(f">>> CUSTO: R$ {melhor['custo_total']:.2f} (mínimo possível: R$ {melhor['custo_minimo']:.2f}) <<<")
+    else:
+        print(f">>> VOCÊ PRECISARÁ DE {melhor['num_barras'] - len(usados)} BARRA(S) <<<")
+    if usados:
+        print(f">>> E DE {len(usados)} RETALHO(S) DO ESTOQUE <<<")
     print("-" * 65)
 
     print("\nPLANO DE CORTE:\n")
 
-    for i, barra in enumerate(melhor['barras'], 1):
-        sobra = otimizador.calcular_sobra(barra)
-        pecas_str = " + ".join(f"{p}cm" for p in sorted(barra, reverse=True))
-        print(f"BARRA {i}: {pecas_str}")
-        print(f"         Usado: {sum(barra):.1f}cm | Sobra: {sobra:.1f}cm")
+    for i in range(1, len(plano) + 1):
+        sobra = plano.sobra(i - 1)
+        pecas_str = " + ".join(f"{p}cm" for p in plano.pecas_barra(i - 1))
+        retalho_str = ""
+        if plano.retalho[i - 1]:
+            retalho_str = f" (retalho de {plano.tamanho(i - 1)}cm)"
+        elif plano.tamanho(i - 1) != tamanho_barra:
+            retalho_str = f" ({plano.tamanho(i - 1)}cm)"
+        print(f"BARRA {i}{retalho_str}: {pecas_str}")
+        print(f"         Usado: {plano.usado_barra(i - 1):.1f}cm | Sobra: {sobra:.1f}cm")
 
         if melhor['cortes_transporte'] and melhor['cortes_transporte'][i-1]:
             corte = melhor['cortes_transporte'][i-1]
             if not corte.get('precisa_corte', True):
                 print(f"         Transporte: Cabe inteira no carro")
-            elif 'ponto_corte' in corte:
-                if not corte.get('cabe_no_limite', True) and corte.get('excesso', 0) > 0:
+            else:
+                if not corte['cabe_no_limite']:
                     print(f"         ⚠️  ATENÇÃO: Passa {corte['excesso']:.1f}cm do limite!")
-                print(f"         Corte transporte: {corte['ponto_corte']:.1f}cm da ponta")
-                if 'pedaco_1' in corte:
-                    extra_a = f" (+{corte['tamanho_pedaco_1'] - limite_transporte:.1f}cm)" if corte['tamanho_pedaco_1'] > limite_transporte else ""
-                    extra_b = f" (+{corte['tamanho_pedaco_2'] - limite_transporte:.1f}cm)" if corte['tamanho_pedaco_2'] > limite_transporte else ""
-                    print(f"           Pedaço A ({corte['tamanho_pedaco_1']:.1f}cm){extra_a}: {' + '.join(f'{p}cm' for p in corte['pedaco_1'])}")
-                    print(f"           Pedaço B ({corte['tamanho_pedaco_2']:.1f}cm){extra_b}: {' + '.join(f'{p}cm' for p in corte['pedaco_2'])}")
+                pontos = corte['pontos_corte']
+                print(f"         Corte transporte: {' e '.join(f'{p:.1f}cm' for p in pontos)} da ponta")
+                for letra, pedaco in zip("ABCDEFGHIJ", corte['pedacos']):
+                    extra = f" (+{pedaco['tamanho'] - limite_transporte:.1f}cm)" if pedaco['tamanho'] > limite_transporte else ""
+                    print(f"           Pedaço {letra} ({pedaco['tamanho']:.1f}cm){extra}: {' + '.join(f'{p}cm' for p in pedaco['pecas'])}")
         print()
 
     print("-" * 65)
     print(f"Eficiência: {melhor['eficiencia']:.1f}%")
     print(f"Sobras: {[f'{s:.1f}cm' for s in sorted(melhor['sobras'], reverse=True)]}")
+    if instrumentacao is not None:
+        print("\n" + instrumentacao.relatorio())
 
-    salvar = input("\nSalvar resultado? (txt/csv/n): ").strip().lower()
+    if estoque is not None:
+        if input("\nDar baixa no estoque de retalhos? (s/n) [n]: ").strip().lower() == 's':
+            guardados = estoque.dar_baixa(perfil, usados, plano.sobras())
+            print(f"{len(usados)} retalho(s) retirado(s), {guardados} sobra(s) guardada(s).")
+
+    salvar = input("\nSalvar resultado? (txt/csv/n, ou jsonl/serra para máquina): ").strip().lower()
 
-    if salvar == 'txt':
+    if salvar in ('jsonl', 'serra'):
+        from exportar_plano import exportar_arquivo  # exportar_plano importa este módulo
+        extensao = '.jsonl' if salvar == 'jsonl' else '.txt'
+        nome = f"plano_corte_{datetime.now().strftime('%Y%m%d_%H%M%S')}{extensao}"
+        exportar_arquivo(melhor, nome, salvar, metodo=melhor_nome, limite_transporte=limite_transporte)
+        print(f"Salvo em: {nome}")
+
+    elif salvar == 'txt':
         nome = f"corte_aluminio_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
         with open(nome, 'w', encoding='utf-8') as f:
             f.write(f"OTIMIZADOR DE CORTE v0.0.3 - {datetime.now().strftime('%d/%m/%Y %H:%M')}\n")
             f.write(f"Barra: {tamanho_barra}cm | Corte: {espessura_mm}mm")
             if limite_transporte:
                 f.write(f" | Transporte: {limite_transporte}cm")
-            f.write(f"\nBarras necessárias: {melhor['num_barras']}\n\n")
-            for i, barra in enumerate(melhor['barras'], 1):
-                sobra = otimizador.calcular_sobra(barra)
-                f.write(f"Barra {i}: {' + '.join(f'{p}cm' for p in sorted(barra, reverse=True))}\n")
-                f.write(f"         Sobra: {sobra:.1f}cm\n")
-                if melhor['cortes_transporte'] and melhor['cortes_transporte'][i-1]:
-                    corte = melhor['cortes_transporte'][i-1]
-                    if corte.get('precisa_corte') and 'ponto_corte' in corte:
-                        f.write(f"         Corte transporte: {corte['ponto_corte']:.1f}cm\n")
+            f.write(f"\nBarras necessárias: {melhor['num_barras']} em {len(melhor['padroes'])} padrão(ões)\n\n")
+            for numero, padrao in enumerate(melhor['padroes'], 1):
+                tamanho_str = f" de {padrao['tamanho']}cm" if padrao['tamanho'] != tamanho_barra else ""
+                origem = "retalho(s)" if padrao['retalho'] else "barra(s)"
+                f.write(f"Padrão {numero}: {padrao['quantidade']} {origem}{tamanho_str}"
+                        f" ({'barra' if padrao['quantidade'] == 1 else 'barras'} {faixas_barras(padrao['barras'])})\n")
+                f.write(f"         {' + '.join(f'{p}cm' for p in padrao['pecas'])}\n")
+                f.write(f"         Sobra: {padrao['sobra']:.1f}cm por barra\n")
+                corte = padrao['corte_transporte']
+                if corte and corte['precisa_corte']:
+                    pontos = corte['pontos_corte']
+                    f.write(f"         Corte transporte: {' e '.join(f'{p:.1f}cm' for p in pontos)}\n")
                 f.write("\n")
         print(f"Salvo em: {nome}")
 
@@ -805,19 +3293,116 @@ def modo_terminal():
         nome = f"corte_aluminio_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         with open(nome, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f, delimiter=';')
-            writer.writerow(['Barra', 'Peças', 'Sobra (cm)', 'Corte Transporte (cm)'])
-            for i, barra in enumerate(melhor['barras'], 1):
-                sobra = otimizador.calcular_sobra(barra)
+            writer.writerow(['Padrão', 'Qtd Barras', 'Barras', 'Tamanho (cm)', 'Peças', 'Sobra (cm)',
+                             'Corte Transporte (cm)'])
+            for numero, padrao in enumerate(melhor['padroes'], 1):
                 corte_str = '-'
-                if melhor['cortes_transporte'] and melhor['cortes_transporte'][i-1]:
-                    corte = melhor['cortes_transporte'][i-1]
-                    if corte.get('precisa_corte') and 'ponto_corte' in corte:
-                        corte_str = f"{corte['ponto_corte']:.1f}"
-                writer.writerow([i, ' + '.join(str(p) for p in barra), f'{sobra:.1f}', corte_str])
+                corte = padrao['corte_transporte']
+                if corte and corte['precisa_corte']:
+                    corte_str = ' e '.join(f"{p:.1f}" for p in corte['pontos_corte'])
+                tamanho_str = f"{padrao['tamanho']} (retalho)" if padrao['retalho'] else padrao['tamanho']
+                writer.writerow([numero, padrao['quantidade'], faixas_barras(padrao['barras']), tamanho_str,
+                                 ' + '.join(str(p) for p in padrao['pecas']), f"{padrao['sobra']:.1f}", corte_str])
         print(f"Salvo em: {nome}")
 
+    if salvar in ('txt', 'csv', 'jsonl', 'serra') and instrumentacao is not None:
+        print(f"Perfil salvo em: {', '.join(instrumentacao.gravar(os.path.splitext(nome)[0]))}")
+
+
+def modo_terminal_perfis(otimizador: OtimizadorCorte, pecas_por_perfil: Dict[str, Counter],
+                         orcamento_s: float, estoque: Optional[EstoqueRetalhos] = None,
+                         perfil_estoque: str = '', tipos: Optional[List[TipoBarra]] = None):
+    """
+    Resultado do modo terminal quando as peças vêm com perfil. Com estoque de
+    retalhos ou barras à venda, cada perfil é resolvido em sequência com os
+    seus próprios retalhos; as peças sem perfil são do 'perfil_estoque'.
+    """
+    instrumentacao = otimizador.instrumentacao
+    with instrumentacao.perfilando() if instrumentacao else _sem_perfil():
+        if estoque is None and not tipos:
+            resumo = otimizador.resolver_perfis(pecas_por_perfil, orcamento_s)
+        else:
+            demandas = {}
+            for perfil, pecas in pecas_por_perfil.items():
+                if estoque is not None:
+                    perfil = perfil or perfil_estoque
+                demandas.setdefault(perfil, Counter()).update(pecas)
+            resultados = {}
+            for perfil, pecas in demandas.items():
+                if estoque is not None:
+                    resultados[perfil] = otimizador.resolver_com_retalhos(
+                        pecas, estoque, perfil, orcamento_s / len(demandas), tipos)
+                else:
+                    resultados[perfil] = otimizador.resolver_estoque_variavel(pecas, tipos)
+            resumo = resumir_perfis(resultados)
+
+    print("\n" + "=" * 65)
+    print("RESULTADO DA OTIMIZAÇÃO POR PERFIL")
+    print("=" * 65 + "\n")
+    print(relatorio_perfis(resumo))
+
+    for perfil, (_, melhor) in resumo['perfis'].items():
+        print(f"\n--- {perfil or 'Sem perfil'} ---")
+        plano = melhor['barras']
+        for i in range(len(plano)):
+            pecas_str = " + ".join(f"{p}cm" for p in plano.pecas_barra(i))
+            origem = ""
+            if plano.retalho[i]:
+                origem = f" (retalho de {plano.tamanho(i)}cm)"
+            elif plano.tamanho(i) != plano.tamanho_barra:
+                origem = f" ({plano.tamanho(i)}cm)"
+            print(f"BARRA {i + 1}{origem}: {pecas_str} | Sobra: {plano.sobra(i):.1f}cm")
+            corte = melhor['cortes_transporte'][i] if melhor['cortes_transporte'] else None
+            if corte and corte['precisa_corte']:
+                pontos = corte['pontos_corte']
+                print(f"         Corte transporte: {' e '.join(f'{p:.1f}cm' for p in pontos)} da ponta")
+
+    if instrumentacao is not None:
+        print("\n" + instrumentacao.relatorio())
+
+    if estoque is not None:
+        if input("\nDar baixa no estoque de retalhos? (s/n) [n]: ").strip().lower() == 's':
+            for perfil, (_, melhor) in resumo['perfis'].items():
+                plano = melhor['barras']
+                usados = plano.comprimentos_retalhos()
+                guardados = estoque.dar_baixa(perfil, usados, plano.sobras())
+                print(f"{perfil or 'Sem perfil'}: {len(usados)} retalho(s) retirado(s), "
+                      f"{guardados} sobra(s) guardada(s).")
+
+    salvar = input("\nSalvar resultado? (txt/csv/n): ").strip().lower()
+    if salvar not in ('txt', 'csv'):
+        return
+    nome = f"corte_aluminio_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{salvar}"
+    with open(nome, 'w', newline='', encoding='utf-8') as f:
+        if salvar == 'txt':
+            f.write(f"OTIMIZADOR DE CORTE v0.0.3 - {datetime.now().strftime('%d/%m/%Y %H:%M')}\n\n")
+            f.write(relatorio_perfis(resumo))
+            for perfil, (_, melhor) in resumo['perfis'].items():
+                f.write(f"\n{perfil or 'Sem perfil'}:\n")
+                for numero, padrao in enumerate(melhor['padroes'], 1):
+                    f.write(f"  Padrão {numero} ({padrao['quantidade']}x, "
+                            f"{'barra' if padrao['quantidade'] == 1 else 'barras'} {faixas_barras(padrao['barras'])}):"
+                            f" {' + '.join(f'{p}cm' for p in padrao['pecas'])}"
+                            f" | Sobra: {padrao['sobra']:.1f}cm\n")
+        else:
+            writer = csv.writer(f, delimiter=';')
+            writer.writerow(['Perfil', 'Padrão', 'Qtd Barras', 'Barras', 'Peças', 'Sobra (cm)'])
+            for perfil, (_, melhor) in resumo['perfis'].items():
+                for numero, padrao in enumerate(melhor['padroes'], 1):
+                    writer.writerow([perfil, numero, padrao['quantidade'], faixas_barras(padrao['barras']),
+                                     ' + '.join(str(p) for p in padrao['pecas']), f"{padrao['sobra']:.1f}"])
+    print(f"Salvo em: {nome}")
+    if instrumentacao is not None:
+        print(f"Perfil salvo em: {', '.join(instrumentacao.gravar(os.path.splitext(nome)[0]))}")
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Otimizador de corte de barras de alumínio")
+    parser.add_argument('--profile', action='store_true',
+                        help="mede tempos e contadores do otimizador e grava um cProfile "
+                             "junto do arquivo exportado")
+    args = parser.parse_args()
+
     print("Escolha o modo:")
     print("1 - Interface Gráfica")
     print("2 - Terminal")
@@ -825,9 +3410,9 @@ def main():
     escolha = input("\nOpção [1]: ").strip()
 
     if escolha == '2':
-        modo_terminal()
+        modo_terminal(args.profile)
     else:
-        app = InterfaceGrafica()
+        app = InterfaceGrafica(args.profile)
         app.executar()
 
 
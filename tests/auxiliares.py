@@ -0,0 +1,23 @@
+"""Funções comuns aos testes"""
+import random
+from collections import Counter
+
+from otimizador_corte import para_unidades
+
+
+def pecas_aleatorias(semente: int, n: int, minimo: float = 20, maximo: float = 300) -> list:
+    """n peças em cm (milímetros inteiros) entre minimo e maximo, sempre as mesmas para a semente"""
+    aleatorio = random.Random(semente)
+    return [aleatorio.randint(int(minimo * 10), int(maximo * 10)) / 10 for _ in range(n)]
+
+
+def verificar_plano(otimizador, barras, pecas):
+    """
+    O plano usa exatamente as peças pedidas e nenhuma barra com mais de uma
+    peça passa da capacidade, contando o corte de cada peça
+    """
+    assert Counter(p for barra in barras for p in barra) == Counter(pecas)
+    for barra in barras:
+        assert barra, "barra vazia no plano"
+        uso = sum(para_unidades(p) + otimizador.corte for p in barra)
+        assert len(barra) == 1 or uso <= otimizador.capacidade, barra
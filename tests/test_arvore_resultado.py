@@ -0,0 +1,105 @@
+import itertools
+
+from otimizador_corte import InterfaceGrafica, OtimizadorCorte, PlanoCorte
+
+
+class Arvore:
+    """O pedaço do ttk.Treeview que a árvore de resultado usa"""
+
+    def __init__(self):
+        self.filhos = {'': []}
+        self.linhas = {}
+        self.foco = ''
+        self._ids = itertools.count(1)
+
+    def insert(self, pai, _posicao, text='', values=()):
+        item = f"I{next(self._ids)}"
+        self.filhos[pai].append(item)
+        self.filhos[item] = []
+        self.linhas[item] = (text, values)
+        return item
+
+    def get_children(self, item=''):
+        return tuple(self.filhos[item])
+
+    def delete(self, *itens):
+        for item in itens:
+            self.delete(*self.filhos.pop(item))
+            del self.linhas[item]
+            for irmaos in self.filhos.values():
+                if item in irmaos:
+                    irmaos.remove(item)
+
+    def focus(self):
+        return self.foco
+
+    def textos(self, pai=''):
+        return [self.linhas[item][0] for item in self.filhos[pai]]
+
+
+def abrir(app, item):
+    app.arvore_resultado.foco = item
+    app._abrir_item()
+    return app.arvore_resultado.get_children(item)
+
+
+def montar(barras, limite_transporte=300, tamanhos=None, retalhos=None):
+    otimizador = OtimizadorCorte(600, 0.3, limite_transporte)
+    plano = PlanoCorte.de_barras(barras, 600, 0.3, tamanhos=tamanhos, retalhos=retalhos)
+    app = object.__new__(InterfaceGrafica)  # sem janela: só a árvore
+    app.arvore_resultado = Arvore()
+    app.ultimo_resultado = {'tamanho_barra': 600, 'limite_transporte': limite_transporte,
+                            'resultado': otimizador.analisar_resultado(plano)}
+    app._preencher_arvore()
+    return app
+
+
+def test_uma_linha_por_padrao_e_nada_mais():
+    app = montar([[250.0, 250.0]] * 1000 + [[500.0]] * 500 + [[120.0]])
+    arvore = app.arvore_resultado
+
+    assert arvore.textos() == ['Padrão 1', 'Padrão 2', 'Padrão 3']
+    assert [arvore.linhas[i][1][0] for i in arvore.get_children()] == ['× 1000', '× 500', '× 1']
+    # Só um filho vazio por padrão, até alguém abrir
+    assert len(arvore.linhas) == 6
+    assert all(arvore.textos(i) == ['...'] for i in arvore.get_children())
+
+
+def test_abrir_padrao_e_barra():
+    app = montar([[250.0, 200.0, 100.0]] * 3 + [[120.0]])
+    arvore = app.arvore_resultado
+    padrao, _ = arvore.get_children()
+
+    barras = abrir(app, padrao)
+    assert arvore.textos(padrao) == ['Barra 1', 'Barra 2', 'Barra 3']
+    assert arvore.linhas[barras[0]][1][4].startswith('cortar em')
+    # A barra que precisa de corte para transporte abre nos pedaços
+    pedacos = abrir(app, barras[1])
+    assert arvore.textos(barras[1]) == ['Pedaço A', 'Pedaço B']
+    pecas = [p for pedaco in pedacos for p in arvore.linhas[pedaco][1][1].split(' + ')]
+    assert sorted(pecas) == ['100.0', '200.0', '250.0']
+
+
+def test_sem_limite_de_transporte_a_barra_nao_abre():
+    app = montar([[250.0, 200.0, 100.0]] * 3, None)
+    (padrao,) = app.arvore_resultado.get_children()
+    barras = abrir(app, padrao)
+    assert all(app.arvore_resultado.textos(barra) == [] for barra in barras)
+    assert app.arvore_resultado.linhas[barras[0]][1][4] == '-'
+    assert app._filhos_pendentes == {}
+
+
+def test_abrir_de_novo_nao_duplica():
+    app = montar([[250.0, 250.0]] * 4)
+    (padrao,) = app.arvore_resultado.get_children()
+    primeira = abrir(app, padrao)
+    assert abrir(app, padrao) == primeira
+    assert padrao not in app._filhos_pendentes
+
+
+def test_retalho_e_tamanho_no_texto_do_padrao():
+    app = montar([[100.0], [100.0], [200.0]], None, tamanhos=[600, 250, 400], retalhos=[False, True, False])
+    assert app.arvore_resultado.textos() == ['Padrão 1', 'Padrão 2 (retalho 250.0cm)',
+                                           'Padrão 3 (400.0cm)']
+    app._limpar_arvore()
+    assert app.arvore_resultado.get_children() == () and app._filhos_pendentes == {}
@@ -0,0 +1,49 @@
+import pytest
+
+from auxiliares import pecas_aleatorias, verificar_plano
+from otimizador_corte import OtimizadorCorte
+
+
+@pytest.mark.parametrize("semente", range(10))
+def test_indexado_gera_o_mesmo_plano(semente):
+    otimizador = OtimizadorCorte(600, 0.3)
+    pecas = pecas_aleatorias(semente, 300)
+
+    original = otimizador.calcular_cortes_best_fit(list(pecas))
+    indexado = otimizador.calcular_cortes_best_fit_indexado(list(pecas))
+
+    verificar_plano(otimizador, indexado, pecas)
+    assert indexado == original
+
+
+@pytest.mark.parametrize("tamanho_barra, espessura, minimo, maximo", [
+    (600, 0.3, 5, 60),      # muitas peças por barra
+    (600, 0.5, 150, 350),   # uma ou duas peças por barra
+    (300, 0, 10, 300),      # sem corte, peça do tamanho da barra
+])
+def test_instancia_grande(tamanho_barra, espessura, minimo, maximo):
+    otimizador = OtimizadorCorte(tamanho_barra, espessura)
+    pecas = pecas_aleatorias(42, 3000, minimo, maximo)
+
+    original = otimizador.calcular_cortes_best_fit(list(pecas))
+    indexado = otimizador.calcular_cortes_best_fit_indexado(list(pecas))
+
+    verificar_plano(otimizador, indexado, pecas)
+    assert len(indexado) == len(original)
+    assert indexado == original
+
+
+def test_empate_vai_para_a_barra_de_menor_numero():
+    otimizador = OtimizadorCorte(100, 0)
+    # Duas barras com 40 livres; a peça de 40 vai na primeira, como no original
+    pecas = [60, 60, 40]
+    assert otimizador.calcular_cortes_best_fit_indexado(pecas) == [[60, 40], [60]]
+    assert otimizador.calcular_cortes_best_fit(pecas) == [[60, 40], [60]]
+
+
+def test_peca_maior_que_a_barra_fica_sozinha():
+    otimizador = OtimizadorCorte(100, 0.3)
+    pecas = [150, 30, 30]
+    barras = otimizador.calcular_cortes_best_fit_indexado(pecas)
+    verificar_plano(otimizador, barras, pecas)
+    assert [150] in barras
@@ -0,0 +1,101 @@
+import time
+
+import pytest
+
+import otimizador_corte
+from auxiliares import pecas_aleatorias, verificar_plano
+from otimizador_corte import OtimizadorCorte, para_unidades
+
+
+def quadrados(otimizador, barras):
+    """Soma dos quadrados do uso das barras: o desempate da busca local"""
+    return sum(sum(para_unidades(p) + otimizador.corte for p in barra) ** 2 for barra in barras)
+
+
+@pytest.mark.parametrize("semente", range(3))
+def test_nao_piora_o_plano(semente):
+    otimizador = OtimizadorCorte(600, 0.3)
+    pecas = pecas_aleatorias(semente, 200)
+    inicial = otimizador.calcular_cortes_greedy(list(pecas))
+
+    melhorado = otimizador.melhorar_plano(inicial, 0.3, semente=semente)
+
+    verificar_plano(otimizador, melhorado, pecas)
+    assert len(melhorado) < len(inicial) or (
+        len(melhorado) == len(inicial) and quadrados(otimizador, melhorado) >= quadrados(otimizador, inicial))
+
+
+def test_junta_barras_quase_vazias():
+    otimizador = OtimizadorCorte(600, 0.3)
+    inicial = [[50.0] for _ in range(22)]  # 11 peças de 50cm + corte cabem numa barra
+
+    melhorado = otimizador.melhorar_plano(inicial, 1.0, semente=1)
+
+    verificar_plano(otimizador, melhorado, [50.0] * 22)
+    assert len(melhorado) == 2
+
+
+def test_peca_maior_que_a_barra_fica_fixa():
+    otimizador = OtimizadorCorte(600, 0.3)
+    inicial = [[700.0], [100.0], [100.0]]
+    melhorado = otimizador.melhorar_plano(inicial, 0.2, semente=1)
+    verificar_plano(otimizador, melhorado, [700.0, 100.0, 100.0])
+    assert [700.0] in melhorado
+    assert len(melhorado) == 2
+
+
+def test_progresso_e_cancelamento():
+    otimizador = OtimizadorCorte(600, 0.3)
+    pecas = pecas_aleatorias(5, 300)
+    avisos = []
+
+    def progresso(info):
+        avisos.append(info)
+        return False  # para no primeiro aviso
+
+    inicio = time.monotonic()
+    melhorado = otimizador.melhorar_plano(otimizador.calcular_cortes_greedy(list(pecas)), 30,
+                                          progresso, semente=1)
+
+    assert time.monotonic() - inicio < 5
+    verificar_plano(otimizador, melhorado, pecas)
+    assert set(avisos[0]) == {'barras', 'maior_sobra', 'iteracoes', 'tempo'}
+    assert avisos[-1]['barras'] == len(melhorado)
+
+
+def test_plano_vazio():
+    assert OtimizadorCorte(600).melhorar_plano([], 1) == []
+
+
+class SempreRuina:
+    """Random que só escolhe ruína e sorteia as barras em rodízio: todas são arruinadas juntas"""
+
+    def __init__(self, semente=None):
+        self.sorteios = 0
+
+    def random(self):
+        return 0.0
+
+    def randint(self, a, b):
+        return b
+
+    def randrange(self, n):
+        self.sorteios += 1
+        return self.sorteios % n
+
+
+@pytest.mark.parametrize("tamanho_barra, inicial", [
+    (110, [[32.0, 24.0, 2.0, 42.0], [13.0, 20.0, 39.0, 28.0]]),
+    (100, [[30.0, 30.0], [30.0, 30.0]]),
+])
+def test_recriacao_com_pecas_na_barra_reaberta(monkeypatch, tamanho_barra, inicial):
+    # As duas barras são esvaziadas e a recriação coloca peças na barra que
+    # acabou de reabrir; a recriação é completa e deve ser aceita
+    monkeypatch.setattr(otimizador_corte.random, 'Random', SempreRuina)
+    otimizador = OtimizadorCorte(tamanho_barra, 0)
+
+    melhorado = otimizador.melhorar_plano([list(b) for b in inicial], 0.05)
+
+    verificar_plano(otimizador, melhorado, [p for barra in inicial for p in barra])
+    assert len(melhorado) == 2
+    assert quadrados(otimizador, melhorado) > quadrados(otimizador, inicial)
@@ -0,0 +1,78 @@
+from collections import Counter
+
+from cache_cortes import CacheCortes, chave_trabalho
+from otimizador_corte import OtimizadorCorte
+
+
+def test_chave_nao_depende_da_ordem_nem_do_formato():
+    a = chave_trabalho(600, 0.3, 300, {75: 2, 120.5: 1})
+    assert a == chave_trabalho(600.0, 0.3, 300.0, [(120.5, 1), (75.0, 1), (75, 1)])
+    assert a == chave_trabalho(600, 0.3, 300, {75: 2, 120.5: 1, 90: 0})
+
+
+def test_chave_muda_com_a_configuracao():
+    demanda = {75: 2}
+    chaves = {chave_trabalho(600, 0.3, 300, demanda), chave_trabalho(500, 0.3, 300, demanda),
+              chave_trabalho(600, 0.5, 300, demanda), chave_trabalho(600, 0.3, None, demanda),
+              chave_trabalho(600, 0.3, 300, {75: 3})}
+    assert len(chaves) == 5
+    # Sem limite de transporte, None e 0 são o mesmo pedido
+    assert chave_trabalho(600, 0.3, 0, demanda) == chave_trabalho(600, 0.3, None, demanda)
+
+
+def test_memoria_lru():
+    cache = CacheCortes(None, max_memoria=2)
+    cache.guardar('a', {'v': 1})
+    cache.guardar('b', {'v': 2})
+    assert cache.obter('a') == {'v': 1}  # 'a' passa a ser o mais recente
+    cache.guardar('c', {'v': 3})
+    assert cache.obter('b') is None
+    assert cache.obter('a') == {'v': 1}
+    assert cache.obter('c') == {'v': 3}
+    assert (cache.acertos_memoria, cache.falhas) == (3, 1)
+
+
+def test_disco_entre_sessoes(tmp_path):
+    caminho = str(tmp_path / 'cache.sqlite3')
+    cache = CacheCortes(caminho)
+    cache.guardar('a', {'barras': [[1.5, 2]]})
+    cache.fechar()
+
+    cache = CacheCortes(caminho)
+    assert cache.obter('a') == {'barras': [[1.5, 2]]}
+    assert cache.acertos_disco == 1
+    assert cache.obter('a') == {'barras': [[1.5, 2]]}
+    assert cache.acertos_memoria == 1
+    cache.fechar()
+
+
+def test_disco_apaga_os_menos_usados(tmp_path):
+    cache = CacheCortes(str(tmp_path / 'cache.sqlite3'), max_memoria=1, max_bytes=60)
+    cache.guardar('velho', {'x': 'a' * 20})
+    cache.guardar('novo', {'x': 'b' * 20})
+    cache.guardar('ultimo', {'x': 'c' * 20})
+    estatisticas = cache.estatisticas()
+    assert estatisticas['bytes_disco'] <= 60
+    assert cache.obter('velho') is None
+    assert cache.obter('ultimo') is not None
+    cache.fechar()
+
+
+def test_resolver_repetido_sai_do_cache(tmp_path):
+    cache = CacheCortes(str(tmp_path / 'cache.sqlite3'))
+    otimizador = OtimizadorCorte(600, 0.3, 300, cache)
+    demanda = Counter({250: 3, 120: 4, 75: 6})
+
+    nome, resultado = otimizador.resolver(demanda)
+    assert cache.acertos == 0
+
+    # Mesmo pedido em outra ordem, com outro otimizador
+    repetido_nome, repetido = OtimizadorCorte(600, 0.3, 300, cache).resolver(
+        Counter(dict(reversed(list(demanda.items())))))
+    assert cache.acertos == 1
+    assert repetido_nome == nome
+    assert repetido['barras'].barras() == resultado['barras'].barras()
+    # O transporte e os padrões são refeitos na volta do cache
+    assert repetido['cortes_transporte'] == resultado['cortes_transporte']
+    assert len(repetido['padroes']) == len(resultado['padroes'])
+    cache.fechar()
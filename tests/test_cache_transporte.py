@@ -0,0 +1,53 @@
+from otimizador_corte import Instrumentacao, OtimizadorCorte, PlanoCorte
+
+
+def plano_repetido():
+    barras = [[250.0, 200.0, 100.0]] * 40 + [[300.0, 280.0]] * 25 + [[120.0]]
+    return PlanoCorte.de_barras(barras, 600, 0.3)
+
+
+def test_um_calculo_por_padrao():
+    instrumentacao = Instrumentacao()
+    otimizador = OtimizadorCorte(600, 0.3, 300, instrumentacao=instrumentacao)
+    plano = plano_repetido()
+
+    cortes = otimizador.cortes_transporte(plano)
+
+    assert cortes == [otimizador.calcular_corte_transporte(barra) for barra in plano]
+    assert cortes[0] is cortes[39]
+    assert instrumentacao.contadores['transporte_barras'] == 66
+    assert instrumentacao.contadores['transporte_calculados'] == 3
+
+    # Outro plano com os mesmos padrões não recalcula nada
+    otimizador.cortes_transporte(PlanoCorte.de_barras([[100.0, 200.0, 250.0]], 600, 0.3))
+    assert instrumentacao.contadores['transporte_calculados'] == 3
+
+
+def test_retalho_nao_usa_o_corte_da_barra_inteira():
+    otimizador = OtimizadorCorte(600, 0.3, 300)
+    plano = PlanoCorte.de_barras([[250.0, 100.0], [250.0, 100.0]], 600, 0.3,
+                                 tamanhos=[600, 400], retalhos=[False, True])
+    inteira, retalho = otimizador.cortes_transporte(plano)
+    assert inteira == otimizador.calcular_corte_transporte([250.0, 100.0])
+    assert retalho == otimizador.calcular_corte_transporte([250.0, 100.0], tamanho=400)
+    assert inteira != retalho
+
+
+def test_mudar_o_limite_nao_reaproveita_o_antigo():
+    otimizador = OtimizadorCorte(600, 0.3, 300)
+    plano = PlanoCorte.de_barras([[200.0, 200.0, 150.0]], 600, 0.3)
+    antes = otimizador.cortes_transporte(plano)[0]
+    otimizador.limite_transporte = 220
+    depois = otimizador.cortes_transporte(plano)[0]
+    assert len(depois['pedacos']) == 3 != len(antes['pedacos'])
+
+
+def test_lru_limitado():
+    otimizador = OtimizadorCorte(600, 0, 300)
+    otimizador.MAX_CACHE_TRANSPORTE = 4
+    primeira = PlanoCorte.de_barras([[100.0, 100.0]], 600)
+    otimizador.cortes_transporte(primeira)
+    otimizador.cortes_transporte(PlanoCorte.de_barras([[100.0 + i, 50.0] for i in range(10)], 600))
+
+    assert len(otimizador._cache_transporte) == 4
+    assert ((100.0, 100.0), 600, 0, 300) not in otimizador._cache_transporte
@@ -0,0 +1,107 @@
+import itertools
+import random
+from collections import Counter
+
+import pytest
+
+from otimizador_corte import OtimizadorCorte, UNIDADES_POR_CM, para_unidades
+
+
+def menor_excesso_em_dois(otimizador, barra):
+    """Menor excesso (cm) de uma divisão em dois pedaços, testando todos os 2^n grupos"""
+    corte = otimizador.corte
+    pesos = [para_unidades(p) + corte for p in barra]
+    sobra = otimizador.capacidade - sum(pesos)
+    limite = para_unidades(otimizador.limite_transporte)
+    melhor = None
+    for tamanho in range(1, len(barra)):
+        for grupo in itertools.combinations(range(len(barra)), tamanho):
+            primeiro = sum(pesos[i] for i in grupo) + corte
+            segundo = sum(pesos) - sum(pesos[i] for i in grupo) + sobra
+            excesso = max(0, max(primeiro, segundo) - limite)
+            melhor = excesso if melhor is None else min(melhor, excesso)
+    return melhor / UNIDADES_POR_CM
+
+
+def conferir_divisao(otimizador, barra, divisao):
+    """Pedaços com as peças da barra, sobra no último e pontos de corte acumulados"""
+    assert Counter(p for pedaco in divisao['pedacos'] for p in pedaco['pecas']) == Counter(barra)
+    assert all(pedaco['pecas'] for pedaco in divisao['pedacos'])
+    assert [pedaco['tem_sobra'] for pedaco in divisao['pedacos']][-1]
+    posicao = 0
+    for pedaco, ponto in zip(divisao['pedacos'], divisao['pontos_corte']):
+        posicao += pedaco['tamanho']
+        assert ponto == pytest.approx(posicao)
+    # Os pedaços somam a barra mais um corte por corte de transporte
+    total = sum(pedaco['tamanho'] for pedaco in divisao['pedacos'])
+    assert total == pytest.approx(otimizador.tamanho_barra + (len(divisao['pedacos']) - 1) * otimizador.espessura_corte)
+    maior = max(pedaco['tamanho'] for pedaco in divisao['pedacos'])
+    assert divisao['excesso'] == pytest.approx(max(0, maior - otimizador.limite_transporte))
+    assert divisao['cabe_no_limite'] == (divisao['excesso'] == 0)
+
+
+@pytest.mark.parametrize("semente", range(40))
+def test_dois_pedacos_igual_a_forca_bruta(semente):
+    aleatorio = random.Random(semente)
+    otimizador = OtimizadorCorte(600, aleatorio.choice([0, 0.3]), aleatorio.choice([300, 320, 350]))
+    barra = []
+    while True:
+        peca = aleatorio.randint(100, 2500) / 10
+        if sum(barra) + peca + (len(barra) + 1) * otimizador.espessura_corte > 600 or len(barra) == 10:
+            break
+        barra.append(peca)
+    if len(barra) < 2:
+        barra = [250.0, 200.0]
+
+    divisao = otimizador.calcular_corte_transporte(barra)
+
+    conferir_divisao(otimizador, barra, divisao)
+    assert len(divisao['pedacos']) == 2
+    assert divisao['excesso'] == pytest.approx(menor_excesso_em_dois(otimizador, barra))
+
+
+def test_muitas_pecas_pequenas():
+    # 2^60 grupos seriam impossíveis de enumerar
+    otimizador = OtimizadorCorte(600, 0.3, 320)
+    barra = [9.5] * 60
+    divisao = otimizador.calcular_corte_transporte(barra)
+    conferir_divisao(otimizador, barra, divisao)
+    assert divisao['cabe_no_limite']
+
+
+def test_barra_maior_que_duas_vezes_o_limite():
+    otimizador = OtimizadorCorte(600, 0.3, 250)
+    barra = [150.0, 140.0, 120.0, 100.0, 80.0]
+    divisao = otimizador.calcular_corte_transporte(barra)
+    conferir_divisao(otimizador, barra, divisao)
+    assert len(divisao['pedacos']) >= 3
+    assert divisao['cabe_no_limite']
+
+
+def test_sem_corte_quando_cabe_inteira():
+    otimizador = OtimizadorCorte(300, 0.3, 300)
+    assert otimizador.calcular_corte_transporte([100.0, 100.0])['precisa_corte'] is False
+    assert OtimizadorCorte(600, 0.3).calcular_corte_transporte([100.0]) is None
+
+
+def test_retalho_usa_o_proprio_tamanho():
+    otimizador = OtimizadorCorte(600, 0.3, 300)
+    assert otimizador.calcular_corte_transporte([150.0, 100.0], tamanho=280)['precisa_corte'] is False
+    divisao = otimizador.calcular_corte_transporte([200.0, 150.0], tamanho=400)
+    assert sum(pedaco['tamanho'] for pedaco in divisao['pedacos']) == pytest.approx(400.3)
+
+
+@pytest.mark.parametrize("limite, peca, primeiro", [(320, 100.0, 300.15), (300, 450.0, 450.6)])
+def test_uma_peca_so_tem_o_mesmo_formato(limite, peca, primeiro):
+    otimizador = OtimizadorCorte(600, 0.3, limite)
+    divisao = otimizador.calcular_corte_transporte([peca])
+    duas = otimizador.calcular_corte_transporte([peca / 2, peca / 2])
+
+    assert set(divisao) == set(duas)
+    # Corte no meio, ou logo depois da peça quando ela passa do meio
+    assert divisao['pontos_corte'] == [primeiro] == [divisao['ponto_corte']]
+    assert [pedaco['pecas'] for pedaco in divisao['pedacos']] == [[peca], []]
+    assert divisao['pedacos'][0]['tamanho'] + divisao['pedacos'][1]['tamanho'] == pytest.approx(600.3)
+    assert divisao['sobra'] == pytest.approx(600 - peca - 0.3)
+    assert divisao['excesso'] == pytest.approx(max(0, primeiro - limite))
+    assert divisao['cabe_no_limite'] == (primeiro <= limite)
@@ -0,0 +1,36 @@
+import random
+from collections import Counter
+
+import pytest
+
+from otimizador_corte import OtimizadorCorte
+
+
+def test_mesmo_plano_que_o_ffd_peca_a_peca():
+    aleatorio = random.Random(2024)
+    for _ in range(400):
+        otimizador = OtimizadorCorte(aleatorio.choice([300, 600]), aleatorio.choice([0, 0.3, 0.5]))
+        medidas = [aleatorio.randint(50, 3500) / 10 for _ in range(aleatorio.randint(1, 8))]
+        demanda = Counter({m: aleatorio.randint(1, 30) for m in medidas})
+
+        esperado = otimizador.calcular_cortes_greedy(list(demanda.elements()))
+        assert otimizador.calcular_cortes_demanda(demanda) == esperado, (otimizador.tamanho_barra, demanda)
+
+
+@pytest.mark.parametrize("demanda", [
+    {100.0: 0, 250.0: 3},
+    [(250.0, 2), (100.0, 4), (250.0, 1)],  # medida repetida nos pares
+    {700.0: 2, 150.0: 5},                  # peça maior que a barra
+])
+def test_formas_de_demanda(demanda):
+    otimizador = OtimizadorCorte(600, 0.3)
+    itens = demanda.items() if isinstance(demanda, dict) else demanda
+    pecas = [medida for medida, qtd in itens for _ in range(qtd)]
+    assert otimizador.calcular_cortes_demanda(demanda) == otimizador.calcular_cortes_greedy(pecas)
+
+
+def test_muitas_pecas_iguais_em_blocos():
+    otimizador = OtimizadorCorte(600, 0)
+    barras = otimizador.calcular_cortes_demanda({200.0: 10_000, 150.0: 1})
+    assert len(barras) == 3334
+    assert barras[-1] == [200.0, 150.0]
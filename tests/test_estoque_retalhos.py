@@ -0,0 +1,84 @@
+from collections import Counter
+
+import pytest
+
+from auxiliares import verificar_plano
+from estoque_retalhos import EstoqueRetalhos
+from otimizador_corte import OtimizadorCorte
+
+
+@pytest.fixture
+def estoque(tmp_path):
+    estoque = EstoqueRetalhos(str(tmp_path / 'retalhos.sqlite3'))
+    yield estoque
+    estoque.fechar()
+
+
+def comprimentos(estoque, perfil):
+    return sorted(c for _, _, c in estoque.listar(perfil))
+
+
+def test_melhor_encaixe_e_o_menor_que_serve(estoque):
+    for comprimento in (300, 120, 250, 120.5):
+        estoque.adicionar('SU079', comprimento)
+    estoque.adicionar('SU080', 121)
+
+    assert estoque.melhor_encaixe('SU079', 120.2)[1] == 120.5
+    assert estoque.melhor_encaixe('SU079', 120)[1] == 120
+    assert estoque.melhor_encaixe('SU079', 301) is None
+    assert estoque.melhor_encaixe('SU081', 10) is None
+
+
+def test_simulacao_desfaz_tudo(estoque):
+    id_retalho = estoque.adicionar('SU079', 200)
+    with estoque.simulacao():
+        estoque.retirar(id_retalho)
+        estoque.adicionar('SU079', 90)
+        assert comprimentos(estoque, 'SU079') == [90]
+    assert comprimentos(estoque, 'SU079') == [200]
+
+
+def test_dar_baixa_retira_usados_e_guarda_sobras_uteis(estoque):
+    for comprimento in (200, 200, 150):
+        estoque.adicionar('SU079', comprimento)
+    estoque.adicionar('SU080', 200)
+
+    guardados = estoque.dar_baixa('SU079', [200, 150], [45.5, 12, 30])
+
+    assert guardados == 2  # 12cm fica abaixo do mínimo de 30cm
+    assert comprimentos(estoque, 'SU079') == [30, 45.5, 200]
+    assert comprimentos(estoque, 'SU080') == [200]
+
+
+def test_persistente(tmp_path):
+    caminho = str(tmp_path / 'retalhos.sqlite3')
+    estoque = EstoqueRetalhos(caminho)
+    estoque.adicionar('SU079', 180)
+    estoque.fechar()
+
+    estoque = EstoqueRetalhos(caminho)
+    assert estoque.resumo() == {'SU079': (1, 180)}
+    estoque.fechar()
+
+
+def test_resolver_com_retalhos_so_planeja(estoque):
+    estoque.adicionar('SU079', 250)
+    estoque.adicionar('SU079', 130)
+    estoque.adicionar('SU080', 500)
+    otimizador = OtimizadorCorte(600, 0.3)
+    demanda = Counter({240: 1, 120: 2, 300: 2})
+
+    _, resultado = otimizador.resolver_com_retalhos(demanda, estoque, 'SU079', orcamento_s=5)
+
+    plano = resultado['barras']
+    verificar_plano(otimizador, plano.barras(), list(demanda.elements()))
+    assert sorted(plano.comprimentos_retalhos()) == [130, 250]
+    for i in range(len(plano)):
+        if plano.retalho[i]:
+            assert plano.sobra(i) >= 0
+    # Nada sai do estoque antes de dar baixa, e o retalho de outro perfil não é usado
+    assert comprimentos(estoque, 'SU079') == [130, 250]
+    assert comprimentos(estoque, 'SU080') == [500]
+
+    estoque.dar_baixa('SU079', plano.comprimentos_retalhos(), plano.sobras())
+    assert 250 not in comprimentos(estoque, 'SU079')
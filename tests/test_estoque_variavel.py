@@ -0,0 +1,52 @@
+import random
+from collections import Counter
+
+import pytest
+
+from otimizador_corte import OtimizadorCorte, custo_barra, ler_tipos_barra, para_unidades
+
+
+def test_ler_tipos_barra():
+    assert ler_tipos_barra("600:45, 500:40:10; 300:38") == [(600, 45, None), (500, 40, 10), (300, 38, None)]
+    assert ler_tipos_barra("  ") == []
+    for invalido in ("600", "600:45:1:2", "0:45", "600:-1", "600:45:-2", "abc:1"):
+        with pytest.raises(ValueError):
+            ler_tipos_barra(invalido)
+
+
+@pytest.mark.parametrize("semente", range(8))
+def test_plano_cabe_em_cada_barra_e_respeita_o_estoque(semente):
+    aleatorio = random.Random(semente)
+    otimizador = OtimizadorCorte(600, 0.3)
+    tipos = [(600, 45, None), (500, 40, aleatorio.randint(0, 5)), (300, 38, aleatorio.randint(0, 5))]
+    pecas = [aleatorio.randint(300, 2900) / 10 for _ in range(aleatorio.randint(5, 80))]
+
+    barras = otimizador.calcular_cortes_estoque_variavel(list(pecas), tipos)
+
+    assert Counter(p for _, barra in barras for p in barra) == Counter(pecas)
+    for comprimento, barra in barras:
+        assert sum(para_unidades(p) + otimizador.corte for p in barra) <= para_unidades(comprimento)
+    usadas = Counter(comprimento for comprimento, _ in barras)
+    for comprimento, _, disponivel in tipos:
+        assert disponivel is None or usadas[comprimento] <= disponivel
+
+
+def test_prefere_a_barra_mais_barata_por_metro():
+    otimizador = OtimizadorCorte(600, 0.3)
+    nome, resultado = otimizador.resolver_estoque_variavel({140.0: 10}, [(600, 50, None), (300, 40, None)])
+
+    plano = resultado['barras']
+    assert plano.contagem_tamanhos() == {300: 5}
+    assert resultado['custo_total'] == pytest.approx(5 * custo_barra(300, 40))
+    assert resultado['custo_minimo'] <= resultado['custo_total']
+    assert resultado['metodos_testados'] == ['Estoque Variável']
+    assert resultado['limite_inferior'] == 3  # limite em barras do maior comprimento
+
+
+def test_sem_barra_onde_a_peca_caiba():
+    otimizador = OtimizadorCorte(600, 0.3)
+    with pytest.raises(ValueError):
+        otimizador.calcular_cortes_estoque_variavel([450.0], [(400, 30, None)])
+    # O estoque de 500 acaba antes das peças
+    with pytest.raises(ValueError):
+        otimizador.calcular_cortes_estoque_variavel([450.0, 450.0, 450.0], [(500, 30, 2), (300, 20, None)])
@@ -0,0 +1,108 @@
+import csv
+import io
+import json
+from collections import Counter
+
+import pytest
+
+from exportar_plano import (barras_do_plano, exportar_arquivo, exportar_csv, exportar_jsonl,
+                            exportar_lista_serra, formato_do_caminho)
+from otimizador_corte import OtimizadorCorte, PlanoCorte
+
+
+@pytest.fixture
+def resultado():
+    # A peça de 500 sozinha passa do carro de 300: a barra dela é dividida
+    # pelo caminho de uma peça só de calcular_corte_transporte
+    _, resultado = OtimizadorCorte(600, 0.3, 300).resolver({500.0: 1, 100.0: 3})
+    return resultado
+
+
+def registros_da_serra(texto):
+    """Lista da serra -> [(comprimento, [(tipo, campos...)])] por barra"""
+    barras = []
+    for linha in texto.splitlines():
+        if linha.startswith('#'):
+            continue
+        campos = linha.split(';')
+        if campos[0] == 'B':
+            barras.append((float(campos[2]), []))
+        else:
+            barras[-1][1].append(campos)
+    return barras
+
+
+def test_csv(resultado):
+    saida = io.StringIO()
+    assert exportar_csv(resultado, saida) == 2
+
+    linhas = list(csv.DictReader(io.StringIO(saida.getvalue()), delimiter=';'))
+    assert [linha['pecas_cm'] for linha in linhas] == ['500.0', '100.0 + 100.0 + 100.0']
+    assert linhas[0]['cortes_transporte_cm'] == '500.6'
+    assert [float(linha['sobra_cm']) for linha in linhas] == resultado['sobras']
+
+
+def test_jsonl(resultado):
+    saida = io.StringIO()
+    exportar_jsonl(resultado, saida, metodo='FFD', limite_transporte=300)
+
+    cabecalho, *barras = map(json.loads, saida.getvalue().splitlines())
+    assert cabecalho['tipo'] == 'plano' and cabecalho['metodo'] == 'FFD'
+    assert cabecalho['num_barras'] == len(barras) == 2
+    grande = barras[0]
+    assert grande['pecas'] == [500.0]
+    assert grande['pedacos'] == [[500.0], []]
+    assert grande['cortes_transporte'] == resultado['cortes_transporte'][0]['pontos_corte']
+
+
+def test_lista_da_serra(resultado):
+    saida = io.StringIO()
+    exportar_lista_serra(resultado, saida)
+
+    barras = registros_da_serra(saida.getvalue())
+    assert len(barras) == 2
+    for i, (comprimento, registros) in enumerate(barras):
+        medidas = [float(r[2]) / 10 for r in registros if r[0] == 'P']
+        assert Counter(medidas) == Counter(resultado['barras'].pecas_barra(i))
+        pontos = [float(r[1]) / 10 for r in registros if r[0] == 'T']
+        assert pontos == pytest.approx(resultado['cortes_transporte'][i]['pontos_corte'])
+        posicoes = [float(r[3]) for r in registros if r[0] == 'P']
+        assert posicoes == sorted(posicoes) and posicoes[-1] <= comprimento
+        assert registros[-1][0] == 'S'
+
+
+def test_corte_sem_pedacos_nao_derruba_a_exportacao(resultado):
+    # Cortes calculados antes do formato com 'pedacos'
+    antigos = []
+    for corte in resultado['cortes_transporte']:
+        corte = dict(corte)
+        del corte['pedacos']
+        del corte['pontos_corte']
+        antigos.append(corte)
+    resultado = dict(resultado, cortes_transporte=antigos)
+
+    barras = list(barras_do_plano(resultado))
+    assert barras[0]['pedacos'] == [[500.0], []]
+    assert barras[0]['cortes_transporte'] == [antigos[0]['ponto_corte']]
+    for exportador in (exportar_csv, exportar_jsonl, exportar_lista_serra):
+        assert exportador(resultado, io.StringIO()) == 2
+
+    # Sem divisão nenhuma, a barra inteira sai como um pedaço
+    for corte in antigos:
+        del corte['pedaco_1'], corte['pedaco_2']
+    assert [b['pedacos'] for b in barras_do_plano(resultado)] == [[[500.0]], [[100.0, 100.0, 100.0]]]
+
+
+def test_sem_transporte_e_com_retalho(tmp_path):
+    otimizador = OtimizadorCorte(600, 0.3)
+    plano = PlanoCorte.de_barras([[250.0, 250.0], [120.0]], 600, 0.3, tamanhos=[600, 150], retalhos=[False, True])
+    resultado = otimizador.analisar_resultado(plano)
+
+    caminho = tmp_path / 'plano.txt'
+    assert formato_do_caminho(str(caminho)) == 'serra'
+    assert exportar_arquivo(resultado, str(caminho)) == 2
+    texto = caminho.read_text(encoding='utf-8')
+    assert texto.splitlines()[1:] == ['B;1;6000.0;N', 'P;1;2500.0;2503.0', 'P;2;2500.0;5006.0', 'S;994.0',
+                                      'B;2;1500.0;R', 'P;1;1200.0;1203.0', 'S;297.0']
+
+    assert all(b['pedacos'] is None and b['cortes_transporte'] == [] for b in barras_do_plano(resultado))
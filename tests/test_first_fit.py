@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from auxiliares import pecas_aleatorias, verificar_plano
+from otimizador_corte import OtimizadorCorte, _ArvoreUsoMinimo
+
+
+@pytest.mark.parametrize("semente", range(10))
+def test_indexado_gera_o_mesmo_plano(semente):
+    otimizador = OtimizadorCorte(600, 0.3)
+    pecas = pecas_aleatorias(semente, 300)
+
+    original = otimizador.calcular_cortes_greedy(list(pecas))
+    indexado = otimizador.calcular_cortes_greedy_indexado(list(pecas))
+
+    verificar_plano(otimizador, indexado, pecas)
+    assert indexado == original
+
+
+@pytest.mark.parametrize("tamanho_barra, espessura, minimo, maximo", [
+    (600, 0.3, 5, 60),
+    (600, 0.5, 150, 350),
+    (300, 0, 10, 300),
+])
+def test_instancia_grande(tamanho_barra, espessura, minimo, maximo):
+    otimizador = OtimizadorCorte(tamanho_barra, espessura)
+    pecas = pecas_aleatorias(7, 3000, minimo, maximo)
+
+    original = otimizador.calcular_cortes_greedy(list(pecas))
+    indexado = otimizador.calcular_cortes_greedy_indexado(list(pecas))
+
+    verificar_plano(otimizador, indexado, pecas)
+    assert indexado == original
+
+
+def test_arvore_acha_a_primeira_barra_onde_cabe():
+    aleatorio = random.Random(3)
+    barras = 37  # não é potência de 2
+    arvore = _ArvoreUsoMinimo(barras)
+    usados = [None] * barras  # None = barra ainda não aberta
+    for _ in range(2000):
+        barra = aleatorio.randrange(barras)
+        usados[barra] = aleatorio.randint(0, 100)
+        arvore.atualizar(barra, usados[barra])
+
+        espaco = aleatorio.randint(0, 100)
+        esperado = next((i for i, u in enumerate(usados) if u is not None and u + espaco <= 100), -1)
+        assert arvore.primeira_que_cabe(espaco, 100) == esperado
+
+
+def test_arvore_vazia_nao_tem_onde_caber():
+    assert _ArvoreUsoMinimo(8).primeira_que_cabe(0, 100) == -1
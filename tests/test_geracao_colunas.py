@@ -0,0 +1,90 @@
+import itertools
+import random
+import sys
+
+import pytest
+
+import otimizador_corte
+from auxiliares import pecas_aleatorias, verificar_plano
+from otimizador_corte import OtimizadorCorte, _mochila_limitada
+
+
+@pytest.mark.parametrize("semente", range(100))
+def test_mochila_igual_a_forca_bruta(semente):
+    aleatorio = random.Random(semente)
+    n = aleatorio.randint(1, 5)
+    valores = [aleatorio.choice([0.0, -0.5, aleatorio.random() * 3]) for _ in range(n)]
+    pesos = [aleatorio.randint(1, 30) for _ in range(n)]
+    limites = [aleatorio.randint(0, 4) for _ in range(n)]
+    capacidade = aleatorio.randint(5, 60)
+
+    valor, quantidades = _mochila_limitada(valores, pesos, limites, capacidade)
+
+    melhor = max(sum(a * v for a, v in zip(qtds, valores))
+                 for qtds in itertools.product(*(range(limite + 1) for limite in limites))
+                 if sum(a * w for a, w in zip(qtds, pesos)) <= capacidade)
+    assert valor == pytest.approx(max(melhor, 0))
+    assert all(0 <= a <= limite for a, limite in zip(quantidades, limites))
+    assert sum(a * w for a, w in zip(quantidades, pesos)) <= capacidade
+    assert sum(a * v for a, v in zip(quantidades, valores)) == pytest.approx(valor)
+
+
+@pytest.mark.parametrize("semente", range(3))
+def test_plano_valido_e_limite_abaixo_do_plano(semente):
+    otimizador = OtimizadorCorte(600, 0.3)
+    medidas = pecas_aleatorias(semente, 25)
+    pecas = [m for m in medidas for _ in range(1 + int(m) % 7)]
+
+    barras, limite_lp, exato = otimizador.calcular_cortes_geracao_colunas(list(pecas))
+
+    verificar_plano(otimizador, barras, pecas)
+    assert exato
+    assert 0 < limite_lp <= len(barras) + 1e-6
+
+
+def test_muitas_medidas_distintas():
+    otimizador = OtimizadorCorte(600, 0.3)
+    pecas = pecas_aleatorias(11, 100, 160, 310)
+    barras, limite_lp, _ = otimizador.calcular_cortes_geracao_colunas(list(pecas))
+    verificar_plano(otimizador, barras, pecas)
+    assert limite_lp <= len(barras) + 1e-6
+
+
+def test_limite_vale_mesmo_sem_o_lp_convergir(monkeypatch):
+    otimizador = OtimizadorCorte(600, 0.3)
+    aleatorio = random.Random(5)
+    medidas = aleatorio.sample([x / 10 for x in range(200, 3000)], 40)
+    pecas = [m for m in medidas for _ in range(aleatorio.randint(1, 20))]
+    _, valor_lp, exato = otimizador.calcular_cortes_geracao_colunas(list(pecas))
+    assert exato
+
+    # Simplex cortado em poucas iterações: o valor do mestre não é ótimo,
+    # mas o limite exportado (Farley) ainda não pode passar do valor do LP
+    otimizar = otimizador_corte._MestreCobertura.otimizar
+    for iteracoes in (1, 3):
+        monkeypatch.setattr(otimizador_corte._MestreCobertura, 'otimizar',
+                            lambda self, max_iteracoes=0, n=iteracoes: otimizar(self, n))
+        _, limite, exato = otimizador.calcular_cortes_geracao_colunas(list(pecas))
+        assert not exato
+        assert 0 < limite <= valor_lp + 1e-6
+
+
+def test_mestre_avisa_se_convergiu():
+    mestre = otimizador_corte._MestreCobertura([[1, 0], [0, 1]], [5, 7])
+    mestre.adicionar_coluna([1, 1])
+    # Um pivô (a coluna nova entra) e o limite acaba antes de provar o ótimo
+    assert mestre.otimizar(max_iteracoes=1) is False
+    assert mestre.otimizar() is True
+    assert sum(mestre.solucao()) == pytest.approx(7)
+
+
+def test_sem_numpy(monkeypatch):
+    monkeypatch.setattr(otimizador_corte, 'TEM_NUMPY', False)
+    monkeypatch.setitem(sys.modules, 'numpy', None)  # import numpy passa a falhar
+    otimizador = OtimizadorCorte(600, 0.3)
+    pecas = pecas_aleatorias(4, 60)
+
+    barras, limite_lp, exato = otimizador.calcular_cortes_geracao_colunas(list(pecas))
+
+    assert barras == otimizador.otimizar_para_maiores_sobras(list(pecas))
+    assert limite_lp is None and not exato
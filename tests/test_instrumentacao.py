@@ -0,0 +1,98 @@
+import pstats
+import sys
+import time
+from collections import Counter
+
+import benchmark_corte
+import otimizador_corte
+from auxiliares import pecas_aleatorias
+from otimizador_corte import Instrumentacao, OtimizadorCorte
+
+
+def test_tempos_e_contadores_do_resolver():
+    instrumentacao = Instrumentacao()
+    otimizador = OtimizadorCorte(600, 0.3, 300, instrumentacao=instrumentacao)
+    pecas = pecas_aleatorias(3, 200, 50, 400)
+
+    otimizador.resolver(Counter(pecas))
+    barras = otimizador.calcular_cortes_greedy(pecas)
+
+    assert instrumentacao.tempos['resolver'][0] == 1
+    assert instrumentacao.tempos['calcular_cortes_greedy'][0] == 1
+    assert instrumentacao.tempos['limites_inferiores'][0] >= 1
+    assert all(segundos >= 0 for _, segundos in instrumentacao.tempos.values())
+    # Uma passada do FFD simples olha no máximo todas as barras por peça
+    assert len(pecas) <= instrumentacao.contadores['barras_varridas'] <= len(pecas) * len(barras)
+    assert instrumentacao.contadores['transporte_barras'] > 0
+    assert 'resolver' in instrumentacao.relatorio()
+
+
+def test_desligada_nao_guarda_nada():
+    otimizador = OtimizadorCorte(600, 0.3)
+    assert otimizador.calcular_cortes_greedy([100.0, 200.0]) == [[200.0, 100.0]]
+    assert otimizador.calcular_cortes_greedy.__name__ == 'calcular_cortes_greedy'
+
+
+def test_juntar_soma_o_que_veio_de_outro_processo():
+    principal, outro = Instrumentacao(), Instrumentacao()
+    principal.tempos['resolver'] = [1, 0.5]
+    principal.contar(barras_varridas=10)
+    outro.tempos['resolver'] = [2, 0.25]
+    outro.tempos['otimizar_para_maiores_sobras'] = [1, 1.0]
+    outro.contar(barras_varridas=5, tabelas_enchimento=3)
+
+    principal.juntar(outro.para_dict())
+
+    assert principal.tempos == {'resolver': [3, 0.75], 'otimizar_para_maiores_sobras': [1, 1.0]}
+    assert principal.contadores == {'barras_varridas': 15, 'tabelas_enchimento': 3}
+
+
+def test_portfolio_traz_as_medicoes_dos_processos():
+    instrumentacao = Instrumentacao()
+    otimizador = OtimizadorCorte(600, 0.3, instrumentacao=instrumentacao)
+    demanda = Counter(pecas_aleatorias(0, 40, 100, 350))  # o FFD não chega no limite inferior
+    otimizador.resolver_portfolio(demanda, orcamento_s=60, max_processos=1)
+    # O FFD roda aqui; o Best Fit, num processo do portfólio
+    assert instrumentacao.tempos['calcular_cortes_demanda'][0] == 1
+    assert instrumentacao.tempos['calcular_cortes_best_fit_indexado'][0] == 1
+    assert instrumentacao.contadores['buscas_indice'] == 40
+
+
+def test_gravar_perfil(tmp_path):
+    instrumentacao = Instrumentacao(perfilar=True)
+    otimizador = OtimizadorCorte(600, 0.3, instrumentacao=instrumentacao)
+    with instrumentacao.perfilando():
+        otimizador.calcular_cortes_best_fit(pecas_aleatorias(1, 100))
+
+    arquivos = instrumentacao.gravar(str(tmp_path / 'corte'))
+
+    assert arquivos == [str(tmp_path / 'corte_perfil.txt'), str(tmp_path / 'corte.prof')]
+    texto = (tmp_path / 'corte_perfil.txt').read_text(encoding='utf-8')
+    assert 'calcular_cortes_best_fit' in texto and 'cumulative' in texto
+    assert pstats.Stats(str(tmp_path / 'corte.prof')).total_calls > 0
+    # Sem perfilar só vai o relatório
+    assert Instrumentacao().gravar(str(tmp_path / 'outro')) == [str(tmp_path / 'outro_perfil.txt')]
+
+
+def test_opcao_profile(monkeypatch):
+    chamadas = []
+    monkeypatch.setattr(otimizador_corte, 'modo_terminal', chamadas.append)
+    monkeypatch.setattr('builtins.input', lambda _='': '2')
+    for argv, esperado in ((['otimizador_corte.py', '--profile'], True), (['otimizador_corte.py'], False)):
+        monkeypatch.setattr(sys, 'argv', argv)
+        otimizador_corte.main()
+    assert chamadas == [True, False]
+
+
+def test_benchmark_prepara_fora_do_tempo(monkeypatch):
+    def preparar_devagar(otimizador, pecas):
+        time.sleep(0.3)
+        return benchmark_corte._plano_ffd(otimizador, pecas)
+
+    monkeypatch.setitem(benchmark_corte.PREPARACAO, 'transporte', preparar_devagar)
+    pecas = benchmark_corte.gerar_uniforme(50)
+    medicao = benchmark_corte.medir('transporte', pecas, repeticoes=2, com_memoria=False)
+
+    assert medicao['tempo_s'] < 0.3
+    assert medicao['barras'] == len(OtimizadorCorte(600, 0.3).calcular_cortes_demanda(Counter(pecas)))
+    assert medicao['memoria_pico_kb'] is None
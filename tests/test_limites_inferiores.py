@@ -0,0 +1,73 @@
+import random
+from collections import Counter
+
+import pytest
+
+from otimizador_corte import OtimizadorCorte, para_unidades
+
+
+def otimo_exato(otimizador, pecas):
+    """Menor número de barras por busca exaustiva (só para poucas peças)"""
+    pesos = sorted((para_unidades(p) + otimizador.corte for p in pecas), reverse=True)
+    melhor = [len(pesos)]
+
+    def colocar(i, usados):
+        if len(usados) >= melhor[0]:
+            return
+        if i == len(pesos):
+            melhor[0] = len(usados)
+            return
+        vistos = set()
+        for b, usado in enumerate(usados):
+            if usado + pesos[i] <= otimizador.capacidade and usado not in vistos:
+                vistos.add(usado)
+                usados[b] += pesos[i]
+                colocar(i + 1, usados)
+                usados[b] -= pesos[i]
+        colocar(i + 1, usados + [pesos[i]])
+
+    colocar(0, [])
+    return melhor[0]
+
+
+@pytest.mark.parametrize("semente", range(60))
+def test_limites_nunca_passam_do_otimo(semente):
+    aleatorio = random.Random(semente)
+    otimizador = OtimizadorCorte(600, aleatorio.choice([0, 0.3]))
+    pecas = [aleatorio.randint(500, 5000) / 10 for _ in range(aleatorio.randint(1, 9))]
+
+    limites = otimizador.limites_inferiores(Counter(pecas))
+
+    assert limites['l1'] <= limites['l2'] <= otimo_exato(otimizador, pecas)
+
+
+def test_l2_enxerga_pecas_maiores_que_meia_barra():
+    otimizador = OtimizadorCorte(600, 0)
+    # Sete peças de 310: o comprimento total cabe em 4 barras, mas nenhuma
+    # barra leva duas
+    assert otimizador.limites_inferiores({310: 7}) == {'l1': 4, 'l2': 7}
+    assert otimizador.limite_inferior({310: 7, 250: 7}) == 7
+    assert otimizador.limites_inferiores({}) == {'l1': 0, 'l2': 0}
+
+
+def test_peca_maior_que_a_barra_conta_uma_barra():
+    otimizador = OtimizadorCorte(600, 0.3)
+    assert otimizador.limite_inferior([(700, 2), (100, 1)]) == 3
+
+
+def test_para_cedo_quando_chega_no_limite():
+    otimizador = OtimizadorCorte(600, 0)
+    nome, resultado = otimizador.resolver({300: 10})
+
+    assert nome == 'First Fit Decreasing'
+    assert resultado['metodos_testados'] == ['First Fit Decreasing']
+    assert resultado['gap'] == 0 and resultado['otimo']
+
+
+def test_gap_quando_o_plano_passa_do_limite():
+    otimizador = OtimizadorCorte(600, 0)
+    demanda = {250: 5, 200: 5, 150: 4}
+    resultado = otimizador.analisar_resultado([[250, 250], [250, 250], [250, 200], [200, 200],
+                                               [200, 200], [150, 150, 150, 150]])
+    assert resultado['limite_inferior'] == otimizador.limite_inferior(demanda) == 5
+    assert resultado['gap'] == 1 and not resultado['otimo']
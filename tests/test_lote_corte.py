@@ -0,0 +1,72 @@
+import io
+import json
+import time
+from collections import Counter
+
+from auxiliares import verificar_plano
+from cache_cortes import CacheCortes
+from lote_corte import Pedido, ler_json, ler_pedidos, processar_lote
+from otimizador_corte import OtimizadorCorte
+
+
+def linhas(saida):
+    return {linha['id']: linha for linha in map(json.loads, saida.getvalue().splitlines())}
+
+
+def test_lote_com_cache_e_erros(tmp_path):
+    arquivo = tmp_path / 'pedidos.json'
+    arquivo.write_text(json.dumps([
+        {'id': 'a', 'limite_transporte': 300, 'pecas': [{'medida': 250, 'quantidade': 3}, [120, 4]]},
+        {'id': 'b', 'pecas': {'75': 6}},
+        {'id': 'c', 'pecas': [[700, 1]]},
+    ]), encoding='utf-8')
+    padrao = {'tamanho_barra': 600, 'espessura_mm': 3, 'limite_transporte': None}
+    cache = CacheCortes(str(tmp_path / 'cache.sqlite3'))
+
+    primeira = io.StringIO()
+    resumo = processar_lote(ler_json(str(arquivo), padrao), primeira, 1, cache, orcamento_s=5)
+    assert (resumo['pedidos'], resumo['erros'], resumo['do_cache']) == (3, 1, 0)
+    resultado = linhas(primeira)
+    assert 'não cabe' in resultado['c']['erro']
+    pecas_a = [250] * 3 + [120] * 4
+    verificar_plano(OtimizadorCorte(600, 0.3), resultado['a']['barras'], pecas_a)
+    assert resultado['a']['cortes_transporte']
+
+    segunda = io.StringIO()
+    resumo = processar_lote(ler_json(str(arquivo), padrao), segunda, 1, cache, orcamento_s=5)
+    assert resumo['do_cache'] == 2
+    repetido = linhas(segunda)
+    for id_pedido in ('a', 'b'):
+        assert repetido[id_pedido]['barras'] == resultado[id_pedido]['barras']
+        assert repetido[id_pedido]['cortes_transporte'] == resultado[id_pedido]['cortes_transporte']
+        assert repetido[id_pedido]['padroes'] == resultado[id_pedido]['padroes']
+    cache.fechar()
+
+
+def test_orcamento_por_pedido():
+    pecas = Counter({(200 + 7 * i) / 10: 1 + i % 5 for i in range(300)})
+    pedido = Pedido('grande', 'teste', 600, 3, None, pecas)
+
+    saida = io.StringIO()
+    inicio = time.monotonic()
+    resumo = processar_lote(iter([pedido]), saida, 1, orcamento_s=1)
+
+    assert time.monotonic() - inicio < 15
+    assert resumo['erros'] == 0
+    verificar_plano(OtimizadorCorte(600, 0.3), linhas(saida)['grande']['barras'], list(pecas.elements()))
+
+
+def test_arquivo_com_formato_errado_nao_para_o_lote(tmp_path):
+    padrao = {'tamanho_barra': 600, 'espessura_mm': 3, 'limite_transporte': None}
+    (tmp_path / 'a_numero.json').write_text('42', encoding='utf-8')
+    (tmp_path / 'b_texto.json').write_text('"75x4"', encoding='utf-8')
+    (tmp_path / 'c_pedidos.json').write_text('{"pedidos": {"pecas": [[75, 4]]}}', encoding='utf-8')
+    (tmp_path / 'd_bom.json').write_text('{"id": "ok", "pecas": [[75, 4]]}', encoding='utf-8')
+
+    pedidos = list(ler_pedidos(str(tmp_path), padrao))
+
+    assert [p.id for p in pedidos] == ['', '', '', 'ok']
+    for pedido, nome in zip(pedidos, ['a_numero', 'b_texto', 'c_pedidos']):
+        assert pedido.erro.startswith('ValueError: ') and f'{nome}.json' in pedido.erro
+    resumo = processar_lote(iter(pedidos), io.StringIO(), 1)
+    assert (resumo['pedidos'], resumo['erros']) == (4, 3)
@@ -0,0 +1,56 @@
+import itertools
+import random
+from collections import Counter
+
+import pytest
+
+from auxiliares import pecas_aleatorias, verificar_plano
+from otimizador_corte import OtimizadorCorte, para_unidades
+
+
+def maior_enchimento(restantes, capacidade, corte):
+    """Maior uso que cabe em 'capacidade', por força bruta sobre as quantidades"""
+    medidas = list(restantes)
+    melhor = 0
+    for qtds in itertools.product(*(range(restantes[m] + 1) for m in medidas)):
+        uso = sum(q * (para_unidades(m) + corte) for q, m in zip(qtds, medidas))
+        if melhor < uso <= capacidade:
+            melhor = uso
+    return melhor
+
+
+@pytest.mark.parametrize("semente", range(40))
+def test_enchimento_igual_a_forca_bruta(semente):
+    aleatorio = random.Random(semente)
+    otimizador = OtimizadorCorte(600, aleatorio.choice([0, 0.3, 0.5]))
+    restantes = Counter({aleatorio.randint(200, 2500) / 10: aleatorio.randint(1, 4)
+                         for _ in range(aleatorio.randint(1, 5))})
+    capacidade = aleatorio.randint(1000, otimizador.capacidade)
+
+    padrao = otimizador._melhor_enchimento(restantes, capacidade, otimizador.corte)
+
+    assert all(padrao[m] <= restantes[m] for m in padrao)
+    uso = sum(q * (para_unidades(m) + otimizador.corte) for m, q in padrao.items())
+    assert uso == maior_enchimento(restantes, capacidade, otimizador.corte)
+
+
+@pytest.mark.parametrize("semente", range(5))
+def test_plano_valido(semente):
+    otimizador = OtimizadorCorte(600, 0.3)
+    pecas = pecas_aleatorias(semente, 400)
+    verificar_plano(otimizador, otimizador.otimizar_para_maiores_sobras(list(pecas)), pecas)
+
+
+def test_medidas_inteiras_nao_erram_no_encaixe_exato():
+    # Em float 1.1 + 2.2 > 3.3; em unidades inteiras as duas cabem na barra
+    assert OtimizadorCorte(3.3, 0).otimizar_para_maiores_sobras([1.1, 2.2]) == [[2.2, 1.1]]
+    # Três peças que enchem a barra exatamente, contando o corte de cada uma
+    assert OtimizadorCorte(600, 0.3).otimizar_para_maiores_sobras([199.7] * 3) == [[199.7] * 3]
+
+
+def test_sobras_concentradas():
+    otimizador = OtimizadorCorte(600, 0)
+    # A primeira barra sai cheia (300 + 300) e a sobra fica toda na outra
+    barras = otimizador.otimizar_para_maiores_sobras([300, 300, 250, 100, 100])
+    sobras = sorted(600 - sum(barra) for barra in barras)
+    assert sobras == [0, 150]
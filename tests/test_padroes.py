@@ -0,0 +1,59 @@
+from collections import Counter
+
+import pytest
+
+from auxiliares import pecas_aleatorias
+from otimizador_corte import OtimizadorCorte, PlanoCorte, faixas_barras, padroes_do_plano
+
+
+@pytest.mark.parametrize("indices, texto", [
+    ([], ""),
+    ([4], "5"),
+    ([0, 1, 2, 5], "1-3, 6"),
+    ([0, 2, 4], "1, 3, 5"),
+    ([3, 4, 9, 10, 11, 20], "4-5, 10-12, 21"),
+])
+def test_faixas_barras(indices, texto):
+    assert faixas_barras(indices) == texto
+
+
+def test_barras_iguais_viram_um_padrao():
+    # A ordem das peças dentro da barra não muda o padrão
+    plano = PlanoCorte.de_barras([[250.0, 200.0], [120.0], [200.0, 250.0], [250.0, 200.0]], 600, 0.3)
+    padroes = padroes_do_plano(plano)
+
+    assert [(p['pecas'], p['quantidade'], p['barras']) for p in padroes] == [
+        ([250.0, 200.0], 3, [0, 2, 3]),
+        ([120.0], 1, [1]),
+    ]
+    assert padroes[0]['sobra'] == plano.sobra(0) == 149.4
+    assert padroes[0]['usado'] == plano.usado_barra(0)
+    assert padroes[0]['corte_transporte'] is None
+
+
+def test_retalho_e_barra_menor_nao_se_juntam_com_a_inteira():
+    plano = PlanoCorte.de_barras([[100.0], [100.0], [100.0], [100.0]], 600, 0,
+                                 tamanhos=[600, 300, 600, 300], retalhos=[False, True, False, False])
+    padroes = padroes_do_plano(plano)
+    assert [(p['tamanho'], p['retalho'], p['barras']) for p in padroes] == [
+        (600, False, [0, 2]), (300, True, [1]), (300, False, [3])]
+    assert [p['sobra'] for p in padroes] == [500, 200, 200]
+
+
+@pytest.mark.parametrize("semente", range(4))
+def test_padroes_cobrem_o_plano(semente):
+    # Poucas medidas com muita repetição, como numa obra de janelas
+    medidas = pecas_aleatorias(semente, 6, 50, 300)
+    demanda = Counter({medida: 10 * (i + 1) for i, medida in enumerate(medidas)})
+    otimizador = OtimizadorCorte(600, 0.3, 300)
+    resultado = otimizador.analisar_resultado(otimizador.calcular_cortes_demanda(demanda))
+    plano = resultado['barras']
+
+    padroes = resultado['padroes']
+    assert sorted(i for p in padroes for i in p['barras']) == list(range(len(plano)))
+    assert sum(p['quantidade'] for p in padroes) == resultado['num_barras']
+    assert sum(p['sobra'] * p['quantidade'] for p in padroes) == pytest.approx(resultado['sobra_total'])
+    for p in padroes:
+        assert all(plano.pecas_barra(i) == p['pecas'] for i in p['barras'])
+        assert p['corte_transporte'] == resultado['cortes_transporte'][p['barras'][0]]
+    assert len(padroes) * 3 < len(plano)
@@ -0,0 +1,111 @@
+import multiprocessing
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+import otimizador_corte
+from auxiliares import pecas_aleatorias, verificar_plano
+from cache_cortes import CacheCortes
+from estoque_retalhos import EstoqueRetalhos
+from otimizador_corte import OtimizadorCorte, agrupar_por_perfil
+
+
+class PecaJanela(SimpleNamespace):
+    """Como janela_maxim_ar_suprema.modelos.Peca: medida em mm"""
+
+    def medida(self, com_contramarco=True):
+        return self.mm + (20 if com_contramarco else 0)
+
+
+def test_agrupar_por_perfil():
+    demandas = agrupar_por_perfil([
+        ('SU079', 75),
+        ('SU079', 75, 3),
+        ('SU080', 120.5, 2),
+        ('SU080', 10, 0),
+        ('Vidro', 70, 1),
+        PecaJanela(perfil='SU080', mm=1185),
+    ])
+    assert demandas == {'SU079': Counter({75.0: 4}), 'SU080': Counter({120.5: 3})}
+    assert agrupar_por_perfil([PecaJanela(perfil='SU079', mm=500)], com_contramarco=False) == {
+        'SU079': Counter({50.0: 1})}
+    assert agrupar_por_perfil([('Vidro', 70)]) == {}
+
+
+def test_cada_perfil_sai_das_suas_barras():
+    otimizador = OtimizadorCorte(600, 0.3)
+    demandas = {perfil: Counter(pecas_aleatorias(semente, 40, 50, 350))
+                for semente, perfil in enumerate(['SU079', 'SU080', 'SU081'])}
+
+    resumo = otimizador.resolver_perfis(demandas, orcamento_s=60, max_processos=2)
+
+    assert list(resumo['perfis']) == sorted(demandas)
+    for perfil, (_, resultado) in resumo['perfis'].items():
+        verificar_plano(otimizador, resultado['barras'].barras(), list(demandas[perfil].elements()))
+        _, sozinho = otimizador.resolver(demandas[perfil])
+        assert resultado['num_barras'] == sozinho['num_barras']
+    assert resumo['num_barras'] == sum(r['num_barras'] for _, r in resumo['perfis'].values())
+    assert resumo['limite_inferior'] == sum(otimizador.limite_inferior(d) for d in demandas.values())
+
+
+def test_perfil_repetido_sai_do_cache():
+    otimizador = OtimizadorCorte(600, 0.3, cache=CacheCortes(None))
+    demanda = Counter(pecas_aleatorias(4, 30, 50, 350))
+    primeiro = otimizador.resolver_perfis({'SU079': demanda}, orcamento_s=60, max_processos=1)
+    segundo = otimizador.resolver_perfis({'SU080': demanda, 'SU081': {290.0: 2}}, orcamento_s=60)
+
+    assert segundo['perfis']['SU080'][1]['num_barras'] == primeiro['num_barras']
+    assert segundo['perfis']['SU081'][1]['num_barras'] == 1
+
+
+def test_processos_param_sozinhos_no_fim_do_orcamento():
+    # Peças que a geração de colunas não resolve em meio segundo
+    demanda = Counter(pecas_aleatorias(0, 500, 100, 300))
+    inicio = time.monotonic()
+    OtimizadorCorte(600, 0.3).resolver_perfis({'SU079': demanda}, orcamento_s=0.5, max_processos=1)
+    assert time.monotonic() - inicio < 5
+
+    # Ninguém mata os processos: eles terminam no próximo aviso depois do prazo
+    while multiprocessing.active_children() and time.monotonic() - inicio < 10:
+        time.sleep(0.1)
+    assert not multiprocessing.active_children()
+
+
+def test_trabalho_que_passa_do_prazo_volta_none():
+    config = (600, 0.3, None)
+    demanda = Counter(pecas_aleatorias(1, 60, 100, 300))
+    assert otimizador_corte._executar_metodo_processo(
+        config, 'otimizar_para_maiores_sobras', demanda, prazo=time.time() - 1) is None
+    barras, _, _, medicoes = otimizador_corte._executar_metodo_processo(
+        config, 'otimizar_para_maiores_sobras', demanda, prazo=time.time() + 60)
+    assert Counter(p for barra in barras for p in barra) == demanda and medicoes is None
+
+
+def test_terminal_com_estoque_e_perfis(tmp_path, monkeypatch, capsys):
+    """As peças sem perfil usam os retalhos do perfil escolhido para o estoque"""
+    caminho = str(tmp_path / 'retalhos.sqlite3')
+    estoque = EstoqueRetalhos(caminho)
+    estoque.adicionar('SU079', 300)
+    estoque.adicionar('SU079', 300)
+    estoque.fechar()
+
+    respostas = iter(['', '', '', '5', '', 's', 'SU079',
+                      '280x2', 'SU080:280x2', 'q',
+                      's', 'n'])
+    monkeypatch.setattr('builtins.input', lambda _='': next(respostas))
+    monkeypatch.setattr(otimizador_corte, 'EstoqueRetalhos', lambda: EstoqueRetalhos(caminho))
+    monkeypatch.setattr(otimizador_corte, 'CacheCortes', lambda: CacheCortes(None))
+
+    otimizador_corte.modo_terminal()
+
+    saida = capsys.readouterr().out
+    assert 'RESULTADO DA OTIMIZAÇÃO POR PERFIL' in saida
+    assert 'retalho de 300' in saida
+    estoque = EstoqueRetalhos(caminho)
+    try:
+        # Os dois retalhos de 300 foram para as peças sem perfil; a sobra da
+        # barra nova do SU080 ficou no SU080
+        assert [c for _, _, c in estoque.listar('SU079')] == []
+        assert [round(c, 1) for _, _, c in estoque.listar('SU080')] == [39.4]
+    finally:
+        estoque.fechar()
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from auxiliares import pecas_aleatorias
+from otimizador_corte import OtimizadorCorte, PlanoCorte, resultado_de_dict, resultado_para_dict
+
+
+def test_comporta_como_lista_de_barras():
+    barras = [[120.5, 300.0], [599.7], [10.0, 10.0, 45.2]]
+    plano = PlanoCorte.de_barras(barras, 600, 0.3)
+
+    assert len(plano) == plano.num_barras == 3
+    assert plano.num_pecas == 6
+    assert plano[0] == [300.0, 120.5]  # maior primeiro
+    assert plano[-1] == [45.2, 10.0, 10.0]
+    assert plano.barras() == [sorted(b, reverse=True) for b in barras]
+    assert [plano.quantidade_pecas(i) for i in range(3)] == [2, 1, 3]
+    assert list(plano.barra_da_peca) == [0, 0, 1, 2, 2, 2]
+
+
+def test_sobras_exatas_em_unidades():
+    # Em float, 600 - 3 * (0.1 + 0.3) não dá exatamente 598.8
+    plano = PlanoCorte.de_barras([[0.1, 0.1, 0.1], [599.7]], 600, 0.3)
+    assert plano.sobra(0) == 598.8
+    assert plano.sobra(1) == 0
+    assert plano.usado_barra(0) == 0.3
+    assert plano.material_usado() == 600
+    assert plano.material_total() == 1200
+
+
+@pytest.mark.parametrize("semente", range(3))
+def test_analise_igual_a_feita_nas_listas(semente):
+    otimizador = OtimizadorCorte(600, 0.3, 300)
+    barras = otimizador.calcular_cortes_greedy(pecas_aleatorias(semente, 120))
+    resultado = otimizador.analisar_resultado(barras)
+
+    assert resultado['sobras'] == [otimizador.calcular_sobra(b) for b in barras]
+    assert resultado['material_usado'] == pytest.approx(sum(map(sum, barras)))
+    assert resultado['cortes_transporte'] == [otimizador.calcular_corte_transporte(b) for b in barras]
+
+
+def test_retalhos_e_tamanhos():
+    plano = PlanoCorte.de_barras([[200.0], [100.0], [300.0]], 600, 0,
+                                 tamanhos=[600, 250, 500], retalhos=[False, True, False])
+    assert plano.tem_retalhos and not plano.tamanho_unico
+    assert plano.comprimentos_retalhos() == [250]
+    assert plano.contagem_tamanhos() == {600: 1, 500: 1}
+    assert plano.sobras() == [400, 150, 200]
+
+
+def test_ida_e_volta_pelo_json():
+    otimizador = OtimizadorCorte(600, 0.3)
+    plano = PlanoCorte.de_barras([[250.0, 250.0], [130.0]], 600, 0.3, tamanhos=[600, 140], retalhos=[False, True])
+    dados = json.loads(json.dumps(resultado_para_dict('FFD', otimizador.analisar_resultado(plano))))
+
+    nome, resultado = resultado_de_dict(dados)
+    volta = resultado['barras']
+    assert nome == 'FFD'
+    assert volta.barras() == plano.barras()
+    assert list(volta.tamanhos) == [600, 140]
+    assert list(volta.retalho) == [0, 1]
+    assert volta.sobras() == plano.sobras()
@@ -0,0 +1,71 @@
+import random
+from collections import Counter
+
+import pytest
+
+from auxiliares import verificar_plano
+from otimizador_corte import OtimizadorCorte, PlanoIncremental
+
+
+def plano_de(otimizador, barras):
+    resultado = otimizador.analisar_resultado(barras)
+    return PlanoIncremental(otimizador, resultado)
+
+
+def test_peca_nova_vai_na_barra_mais_justa():
+    otimizador = OtimizadorCorte(600, 0)
+    incremental = plano_de(otimizador, [[400], [500], [300]])
+    resultado = incremental.aplicar({400: 1, 500: 1, 300: 1, 90: 1})
+    assert sorted(map(sorted, resultado['barras'].barras())) == [[90, 500], [300], [400]]
+
+
+def test_barra_que_esvazia_tem_as_pecas_passadas_para_as_outras():
+    otimizador = OtimizadorCorte(600, 0)
+    incremental = plano_de(otimizador, [[300, 200], [250, 100]])
+    resultado = incremental.aplicar({300: 1, 200: 1, 100: 1})
+    assert resultado['barras'].barras() == [[300, 200, 100]]
+
+
+def test_remover_peca_que_nao_existe():
+    incremental = plano_de(OtimizadorCorte(600, 0), [[300]])
+    with pytest.raises(ValueError):
+        incremental.remover(300, 2)
+    with pytest.raises(ValueError):
+        incremental.remover(150)
+
+
+@pytest.mark.parametrize("semente", range(5))
+def test_edicoes_aleatorias(semente):
+    aleatorio = random.Random(semente)
+    otimizador = OtimizadorCorte(600, 0.3, 300)
+    medidas = [aleatorio.randint(200, 2800) / 10 for _ in range(12)]
+    demanda = Counter({m: aleatorio.randint(1, 6) for m in medidas})
+    _, inicial = otimizador.resolver(demanda)
+    incremental = PlanoIncremental(otimizador, inicial)
+
+    for _ in range(30):
+        medida = aleatorio.choice(medidas)
+        demanda[medida] = max(0, demanda[medida] + aleatorio.choice([-3, -1, 1, 2]))
+        demanda = +demanda
+        if not demanda:
+            demanda[medida] = 1
+
+        resultado = incremental.aplicar(demanda)
+
+        barras = resultado['barras'].barras()
+        verificar_plano(otimizador, barras, list(demanda.elements()))
+        assert resultado['limite_inferior'] == otimizador.limite_inferior(demanda)
+        # O transporte guardado por barra é igual ao recalculado do zero
+        assert resultado['cortes_transporte'] == [otimizador.calcular_corte_transporte(b) for b in barras]
+        assert sum(p['quantidade'] for p in resultado['padroes']) == len(barras)
+
+
+def test_precisa_recalcular():
+    otimizador = OtimizadorCorte(600, 0)
+    incremental = plano_de(otimizador, [[300, 300]])
+    assert incremental.gap_base == 0
+    # Cada peça de 350 abre uma barra, mas o limite inferior também sobe para 3
+    resultado = incremental.aplicar({300: 2, 350: 2})
+    assert not incremental.precisa_recalcular(resultado)
+    resultado['gap'] = incremental.gap_base + incremental.FOLGA + 1
+    assert incremental.precisa_recalcular(resultado)
@@ -0,0 +1,74 @@
+import random
+import sys
+from collections import Counter
+
+import numpy as np
+import pytest
+
+import otimizador_corte
+from auxiliares import pecas_aleatorias
+from otimizador_corte import (OtimizadorCorte, chave_selecao, codificar_planos, ordem_selecao,
+                              pontuar_planos)
+
+
+def candidatos(otimizador, pecas, semente):
+    """Planos dos métodos e variações embaralhadas deles (mesmas peças)"""
+    planos = [otimizador.executar_metodo(metodo, Counter(pecas))[0] for _, metodo in otimizador.METODOS]
+    aleatorio = random.Random(semente)
+    for _ in range(6):
+        barras = [list(b) for b in aleatorio.choice(planos)]
+        # Junta duas barras quando cabe ou separa uma peça numa barra nova
+        i, j = aleatorio.sample(range(len(barras)), 2)
+        if otimizador.calcular_sobra(barras[i] + barras[j]) >= 0:
+            barras[i] += barras.pop(j)
+        else:
+            barras.append([barras[i].pop()])
+        planos.append([b for b in barras if b])
+    return planos
+
+
+@pytest.mark.parametrize("semente", range(10))
+def test_mesma_escolha_que_chave_selecao(semente):
+    otimizador = OtimizadorCorte(600, random.Random(semente).choice([0, 0.3]))
+    planos = candidatos(otimizador, pecas_aleatorias(semente, 40, 30, 400), semente)
+    analises = [otimizador.analisar_resultado(plano) for plano in planos]
+
+    barras, pesos = codificar_planos(planos)
+    pontos = pontuar_planos(barras, pesos, otimizador.capacidade, otimizador.corte)
+
+    assert ordem_selecao(pontos) == sorted(range(len(planos)), key=lambda k: chave_selecao(analises[k]))
+    for k, analise in enumerate(analises):
+        assert pontos['num_barras'][k] == analise['num_barras']
+        assert pontos['sobra_total'][k] == pytest.approx(analise['sobra_total'])
+        assert pontos['eficiencia'][k] == pytest.approx(analise['eficiencia'])
+        assert sorted(pontos['sobras'][k][pontos['abertas'][k]]) == pytest.approx(sorted(analise['sobras']))
+
+
+def test_plano_que_passa_da_barra_vai_para_o_fim():
+    barras, pesos = codificar_planos([[[400.0, 300.0]], [[400.0], [300.0]]])
+    pontos = pontuar_planos(barras, pesos, 60000, 30)
+    assert pontos['validos'].tolist() == [False, True]
+    assert ordem_selecao(pontos) == [1, 0]
+    # Peça maior que a barra, sozinha, é aceita
+    assert pontuar_planos(*codificar_planos([[[700.0]]]), 60000)['validos'].tolist() == [True]
+
+
+def test_planos_com_pecas_diferentes():
+    with pytest.raises(ValueError):
+        codificar_planos([[[100.0, 200.0]], [[100.0], [250.0]]])
+    barras, pesos = codificar_planos([])
+    assert barras.shape == (0, 0) and pesos.dtype == np.int64
+
+
+def test_resolver_sem_numpy(monkeypatch):
+    monkeypatch.setattr(otimizador_corte, 'TEM_NUMPY', False)
+    monkeypatch.setitem(sys.modules, 'numpy', None)  # import numpy passa a falhar
+    otimizador = OtimizadorCorte(600, 0.3)
+    demanda = Counter(pecas_aleatorias(2, 80, 60, 350))
+
+    nome, resultado = otimizador.resolver(demanda)
+
+    planos = {nome: otimizador.executar_metodo(metodo, demanda)[0] for nome, metodo in otimizador.METODOS
+              if nome in resultado['metodos_testados']}
+    assert nome == min(planos, key=lambda n: chave_selecao(otimizador.analisar_resultado(planos[n])))
+    assert resultado['limite_lp'] is None
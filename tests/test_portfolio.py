@@ -0,0 +1,56 @@
+import random
+import time
+from collections import Counter
+
+import pytest
+
+from auxiliares import pecas_aleatorias, verificar_plano
+from otimizador_corte import CalculoCancelado, OtimizadorCorte
+
+
+def pedido_dificil():
+    """Muitas medidas entre 1/6 e 1/2 barra: a geração de colunas leva bem mais de um segundo"""
+    aleatorio = random.Random(0)
+    return Counter({aleatorio.randint(1000, 3000) / 10: aleatorio.randint(1, 3) for _ in range(250)})
+
+
+@pytest.mark.parametrize("semente", range(3))
+def test_mesmo_resultado_que_resolver(semente):
+    otimizador = OtimizadorCorte(600, 0.3)
+    demanda = Counter(pecas_aleatorias(semente, 80, 60, 350))
+
+    _, serial = otimizador.resolver(demanda)
+    _, paralelo = otimizador.resolver_portfolio(demanda, orcamento_s=60, max_processos=2)
+
+    verificar_plano(otimizador, paralelo['barras'].barras(), list(demanda.elements()))
+    assert paralelo['num_barras'] == serial['num_barras']
+    assert paralelo['limite_inferior'] >= otimizador.limite_inferior(demanda)
+
+
+def test_orcamento_corta_os_metodos_lentos():
+    otimizador = OtimizadorCorte(600, 0.3)
+    demanda = pedido_dificil()
+
+    inicio = time.monotonic()
+    nome, resultado = otimizador.resolver_portfolio(demanda, orcamento_s=0.5)
+
+    assert time.monotonic() - inicio < 5
+    assert resultado['metodos_testados'][0] == 'First Fit Decreasing'
+    assert 'Geração de Colunas (LP)' not in resultado['metodos_testados']
+    assert nome in resultado['metodos_testados']
+    verificar_plano(otimizador, resultado['barras'].barras(), list(demanda.elements()))
+
+
+def test_cancelar_pelo_progresso():
+    avisos = []
+
+    def progresso(info):
+        avisos.append(info)
+        return len(avisos) < 3
+
+    otimizador = OtimizadorCorte(600, 0.3, progresso=progresso)
+    inicio = time.monotonic()
+    with pytest.raises(CalculoCancelado):
+        otimizador.resolver_portfolio(pedido_dificil(), orcamento_s=60)
+    assert time.monotonic() - inicio < 5
+    assert all(aviso['etapa'] == 'Comparando métodos' for aviso in avisos)
@@ -0,0 +1,98 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+import otimizador_corte
+from otimizador_corte import CalculoCancelado, InterfaceGrafica
+
+
+class Widget:
+    def __init__(self):
+        self.opcoes = {}
+
+    def config(self, **opcoes):
+        self.opcoes.update(opcoes)
+
+
+class Raiz:
+    """Guarda os root.after em vez de rodar um loop do Tk"""
+
+    def __init__(self):
+        self.agendados = []
+
+    def after(self, _ms, funcao, *args):
+        self.agendados.append((funcao, args))
+
+    def rodar(self, ate, limite_s=5):
+        """Roda os after agendados até ate() ou até o limite de tempo"""
+        fim = time.monotonic() + limite_s
+        while not ate() and self.agendados and time.monotonic() < fim:
+            funcao, args = self.agendados.pop(0)
+            funcao(*args)
+            time.sleep(0.01)
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(otimizador_corte, 'messagebox', mock.MagicMock())
+    app = object.__new__(InterfaceGrafica)  # sem janela: só o que _em_segundo_plano usa
+    app.root = Raiz()
+    for nome in ('btn_calcular', 'btn_melhorar', 'btn_cancelar', 'barra_progresso', 'label_status'):
+        setattr(app, nome, Widget())
+    app._cancelar = None
+    return app
+
+
+def test_aviso_da_thread_chega_na_janela(app):
+    continuar = threading.Event()
+    resultados = []
+
+    def trabalho(progresso):
+        progresso({'etapa': 'Comparando métodos', 'feitos': 1, 'total': 4})
+        continuar.wait(5)
+        return 42
+
+    app._em_segundo_plano(trabalho, resultados.append)
+    assert app._calculando and app.btn_calcular.opcoes['state'] == 'disabled'
+
+    app.root.rodar(lambda: app.label_status.opcoes['text'] == 'Comparando métodos')
+    assert app.barra_progresso.opcoes['value'] == 0.25
+    assert resultados == []
+
+    continuar.set()
+    app.root.rodar(lambda: resultados)
+    assert resultados == [42]
+    assert not app._calculando and app.btn_calcular.opcoes['state'] == 'normal'
+    assert app.btn_cancelar.opcoes['state'] == 'disabled'
+    assert app.root.agendados == []  # parou de consultar
+
+
+def test_cancelar(app):
+    resultados = []
+
+    def trabalho(progresso):
+        while progresso({'etapa': 'Geração de colunas', 'feitos': 0, 'total': 0}):
+            time.sleep(0.01)
+        raise CalculoCancelado('Geração de colunas')
+
+    app._em_segundo_plano(trabalho, resultados.append)
+    app.cancelar()
+    assert app.label_status.opcoes['text'] == 'Cancelando...'
+    app.root.rodar(lambda: not app._calculando)
+
+    assert resultados == []
+    assert app.label_status.opcoes['text'] == 'Cálculo cancelado'
+    otimizador_corte.messagebox.showerror.assert_not_called()
+
+
+def test_erro_na_thread_vira_mensagem(app):
+    def trabalho(_progresso):
+        raise ValueError("peça de 700cm não cabe")
+
+    app._em_segundo_plano(trabalho, pytest.fail)
+    app.root.rodar(lambda: not app._calculando)
+
+    otimizador_corte.messagebox.showerror.assert_called_once_with("Erro", "peça de 700cm não cabe")
+    assert app.label_status.opcoes['text'] == ''
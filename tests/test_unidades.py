@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from otimizador_corte import OtimizadorCorte, PlanoCorte, para_unidades
+
+
+# Em float, 259.8 + 0.1 + 299.4 + 0.1 + 40.5 + 0.1 dá 600.0000000000001
+JUSTAS = [259.8, 299.4, 40.5]
+
+
+def test_para_unidades():
+    assert para_unidades(0.3) == 30  # 0.3 * 100 = 30.000000000000004
+    assert para_unidades(3 / 10) == 30
+    assert para_unidades(199.9) == 19990
+    assert para_unidades(0.07) == 7
+    assert para_unidades(600) == 60000
+    assert sum(para_unidades(p) + para_unidades(0.1) for p in JUSTAS) == para_unidades(600)
+
+
+@pytest.mark.parametrize("metodo", [metodo for _, metodo in OtimizadorCorte.METODOS])
+def test_encaixe_exato_em_todos_os_metodos(metodo):
+    otimizador = OtimizadorCorte(600, 0.1)
+    barras, _, _ = otimizador.executar_metodo(metodo, {p: 1 for p in JUSTAS})
+
+    assert barras == [sorted(JUSTAS, reverse=True)]
+    assert otimizador.calcular_sobra(barras[0]) == 0
+    assert PlanoCorte.de_barras(barras, 600, 0.1).sobra(0) == 0
+
+
+@pytest.mark.parametrize("metodo", [metodo for _, metodo in OtimizadorCorte.METODOS])
+def test_um_decimo_de_milimetro_a_mais_nao_cabe(metodo):
+    otimizador = OtimizadorCorte(600, 0.1)
+    barras, _, _ = otimizador.executar_metodo(metodo, {259.8: 1, 299.4: 1, 40.51: 1})
+    assert len(barras) == 2
+
+
+def test_transporte_no_limite_exato():
+    # 259.8 + 0.1 + 40.5 + 0.1 = 300.5: o pedaço maior cabe no carro de 300.5
+    # e passa exatamente 0.1 do de 300.4
+    corte = OtimizadorCorte(600, 0.1, 300.5).calcular_corte_transporte(JUSTAS)
+    assert corte['cabe_no_limite'] and corte['excesso'] == 0
+    assert [pedaco['tamanho'] for pedaco in corte['pedacos']] == [299.6, 300.5]
+
+    corte = OtimizadorCorte(600, 0.1, 300.4).calcular_corte_transporte(JUSTAS)
+    assert not corte['cabe_no_limite'] and corte['excesso'] == 0.1
+
+
+def test_mesmo_plano_em_qualquer_ordem():
+    otimizador = OtimizadorCorte(600, 0.3)
+    aleatorio = random.Random(7)
+    pecas = [aleatorio.randint(300, 3000) / 10 for _ in range(60)]
+    esperado = otimizador.calcular_cortes_greedy(list(pecas))
+    for _ in range(5):
+        aleatorio.shuffle(pecas)
+        assert otimizador.calcular_cortes_greedy(list(pecas)) == esperado
+        assert otimizador.otimizar_para_maiores_sobras(list(pecas)) == otimizador.otimizar_para_maiores_sobras(
+            sorted(pecas))